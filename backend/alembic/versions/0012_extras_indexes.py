@@ -0,0 +1,53 @@
+"""indexes for hot extras keys
+
+Revision ID: 0012_extras_indexes
+Revises: 0011_domain_events
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0012_extras_indexes"
+down_revision = "0011_domain_events"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_documents_extras_status", "documents", [sa.text("(extras ->> 'status')")]
+    )
+    op.create_index("ix_documents_extras_kind", "documents", [sa.text("(extras ->> 'kind')")])
+    op.create_index("ix_properties_extras_tag", "properties", [sa.text("(extras ->> 'tag')")])
+    op.create_index(
+        "ix_documents_extras_gin",
+        "documents",
+        ["extras"],
+        postgresql_using="gin",
+        postgresql_ops={"extras": "jsonb_path_ops"},
+    )
+    op.create_index(
+        "ix_properties_extras_gin",
+        "properties",
+        ["extras"],
+        postgresql_using="gin",
+        postgresql_ops={"extras": "jsonb_path_ops"},
+    )
+    op.create_index("ix_documents_property_id", "documents", ["property_id"])
+    op.create_index("ix_properties_owner_user_id", "properties", ["owner_user_id"])
+    op.create_index(
+        "ix_document_extractions_document_id", "document_extractions", ["document_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_document_extractions_document_id", table_name="document_extractions")
+    op.drop_index("ix_properties_owner_user_id", table_name="properties")
+    op.drop_index("ix_documents_property_id", table_name="documents")
+    op.drop_index("ix_properties_extras_gin", table_name="properties")
+    op.drop_index("ix_documents_extras_gin", table_name="documents")
+    op.drop_index("ix_properties_extras_tag", table_name="properties")
+    op.drop_index("ix_documents_extras_kind", table_name="documents")
+    op.drop_index("ix_documents_extras_status", table_name="documents")
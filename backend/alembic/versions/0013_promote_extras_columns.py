@@ -0,0 +1,106 @@
+"""promote hot extras keys to columns
+
+Revision ID: 0013_promote_extras_columns
+Revises: 0012_extras_indexes
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0013_promote_extras_columns"
+down_revision = "0012_extras_indexes"
+branch_labels = None
+depends_on = None
+
+
+BATCH_SIZE = 5000
+
+INT_PATTERN = r"'^-?\d{1,9}$'"
+
+# Python truthiness of the JSON value, the rule models.property_columns applies on every write.
+IS_RENTED = """CASE jsonb_typeof(extras -> 'is_rented')
+        WHEN 'boolean' THEN (extras -> 'is_rented')::boolean
+        WHEN 'number' THEN (extras -> 'is_rented')::numeric <> 0
+        WHEN 'string' THEN extras ->> 'is_rented' <> ''
+        WHEN 'array' THEN jsonb_array_length(extras -> 'is_rented') > 0
+        WHEN 'object' THEN extras -> 'is_rented' <> '{}'::jsonb
+        ELSE false
+    END"""
+
+PROPERTY_BACKFILL = f"""
+    tag = coalesce(nullif(extras ->> 'tag', ''), extras ->> 'label'),
+    property_address = extras ->> 'property_address',
+    is_rented = {IS_RENTED},
+    desired_rent_value = CASE WHEN extras ->> 'desired_rent_value' ~ {INT_PATTERN}
+        THEN (extras ->> 'desired_rent_value')::integer END,
+    current_rent_value = CASE WHEN extras ->> 'current_rent_value' ~ {INT_PATTERN}
+        THEN (extras ->> 'current_rent_value')::integer END
+"""
+
+DOCUMENT_BACKFILL = f"""
+    status = extras ->> 'status',
+    name = extras ->> 'name',
+    path = extras ->> 'path',
+    doc_type = extras ->> 'doc_type',
+    confidence = CASE WHEN jsonb_typeof(extras -> 'confidence') = 'number'
+        THEN (extras ->> 'confidence')::double precision END,
+    extraction_id = CASE WHEN extras ->> 'extraction_id' ~ {INT_PATTERN}
+        THEN (extras ->> 'extraction_id')::integer END
+"""
+
+
+def _backfill(table: str, assignments: str) -> None:
+    conn = op.get_bind()
+    max_id = conn.execute(sa.text(f"SELECT coalesce(max(id), 0) FROM {table}")).scalar()
+    for start in range(0, max_id, BATCH_SIZE):
+        conn.execute(
+            sa.text(f"UPDATE {table} SET {assignments} WHERE id > :start AND id <= :end"),
+            {"start": start, "end": start + BATCH_SIZE},
+        )
+
+
+def upgrade() -> None:
+    op.add_column("properties", sa.Column("tag", sa.String(length=160), nullable=True))
+    op.add_column(
+        "properties", sa.Column("property_address", sa.String(length=255), nullable=True)
+    )
+    op.add_column("properties", sa.Column("is_rented", sa.Boolean(), nullable=True))
+    op.add_column("properties", sa.Column("desired_rent_value", sa.Integer(), nullable=True))
+    op.add_column("properties", sa.Column("current_rent_value", sa.Integer(), nullable=True))
+
+    op.add_column("documents", sa.Column("status", sa.String(length=40), nullable=True))
+    op.add_column("documents", sa.Column("name", sa.String(length=255), nullable=True))
+    op.add_column("documents", sa.Column("path", sa.String(length=512), nullable=True))
+    op.add_column("documents", sa.Column("doc_type", sa.String(length=40), nullable=True))
+    op.add_column("documents", sa.Column("confidence", sa.Float(), nullable=True))
+    op.add_column("documents", sa.Column("extraction_id", sa.Integer(), nullable=True))
+
+    _backfill("properties", PROPERTY_BACKFILL)
+    _backfill("documents", DOCUMENT_BACKFILL)
+
+    op.create_index("ix_properties_tag", "properties", ["tag"])
+    op.create_index("ix_documents_status", "documents", ["status"])
+    # Filters read the promoted columns now; the 0012 expression indexes are write overhead.
+    op.drop_index("ix_properties_extras_tag", table_name="properties")
+    op.drop_index("ix_documents_extras_status", table_name="documents")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_documents_extras_status", "documents", [sa.text("(extras ->> 'status')")]
+    )
+    op.create_index("ix_properties_extras_tag", "properties", [sa.text("(extras ->> 'tag')")])
+    op.drop_index("ix_documents_status", table_name="documents")
+    op.drop_index("ix_properties_tag", table_name="properties")
+    for column in ("extraction_id", "confidence", "doc_type", "path", "name", "status"):
+        op.drop_column("documents", column)
+    for column in (
+        "current_rent_value",
+        "desired_rent_value",
+        "is_rented",
+        "property_address",
+        "tag",
+    ):
+        op.drop_column("properties", column)
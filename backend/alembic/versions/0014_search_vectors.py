@@ -0,0 +1,77 @@
+"""full-text search vectors
+
+Revision ID: 0014_search_vectors
+Revises: 0013_promote_extras_columns
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+
+# revision identifiers, used by Alembic.
+revision = "0014_search_vectors"
+down_revision = "0013_promote_extras_columns"
+branch_labels = None
+depends_on = None
+
+
+BATCH_SIZE = 2000
+
+WORK_ORDER_VECTOR = (
+    "setweight(to_tsvector('portuguese', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('portuguese', coalesce(description, '')), 'B')"
+)
+PROPERTY_VECTOR = (
+    "setweight(to_tsvector('portuguese', coalesce(tag, '')), 'A') || "
+    "setweight(to_tsvector('portuguese', coalesce(property_address, '')), 'B')"
+)
+EXTRACTION_VECTOR = (
+    "setweight(to_tsvector('portuguese', coalesce(d.name, '')), 'A') || "
+    "setweight(to_tsvector('portuguese', coalesce(e.extras ->> 'text', '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    op.add_column(
+        "work_orders",
+        sa.Column("search_vector", TSVECTOR(), sa.Computed(WORK_ORDER_VECTOR, persisted=True)),
+    )
+    op.add_column(
+        "properties",
+        sa.Column("search_vector", TSVECTOR(), sa.Computed(PROPERTY_VECTOR, persisted=True)),
+    )
+    op.add_column("document_extractions", sa.Column("search_vector", TSVECTOR(), nullable=True))
+
+    conn = op.get_bind()
+    max_id = conn.execute(sa.text("SELECT coalesce(max(id), 0) FROM document_extractions")).scalar()
+    for start in range(0, max_id, BATCH_SIZE):
+        conn.execute(
+            sa.text(
+                f"UPDATE document_extractions e SET search_vector = {EXTRACTION_VECTOR} "
+                "FROM documents d WHERE d.id = e.document_id AND e.id > :start AND e.id <= :end"
+            ),
+            {"start": start, "end": start + BATCH_SIZE},
+        )
+
+    op.create_index(
+        "ix_work_orders_search_vector", "work_orders", ["search_vector"], postgresql_using="gin"
+    )
+    op.create_index(
+        "ix_properties_search_vector", "properties", ["search_vector"], postgresql_using="gin"
+    )
+    op.create_index(
+        "ix_document_extractions_search_vector",
+        "document_extractions",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_document_extractions_search_vector", table_name="document_extractions")
+    op.drop_index("ix_properties_search_vector", table_name="properties")
+    op.drop_index("ix_work_orders_search_vector", table_name="work_orders")
+    op.drop_column("document_extractions", "search_vector")
+    op.drop_column("properties", "search_vector")
+    op.drop_column("work_orders", "search_vector")
@@ -0,0 +1,99 @@
+"""compressed extraction text store
+
+Revision ID: 0015_extraction_text_store
+Revises: 0014_search_vectors
+Create Date: 2026-10-19 00:00:00.000000
+"""
+import gzip
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0015_extraction_text_store"
+down_revision = "0014_search_vectors"
+branch_labels = None
+depends_on = None
+
+
+BATCH_SIZE = 500
+
+
+def _decompress(encoding: str, data: bytes) -> str:
+    if encoding == "zstd":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    return gzip.decompress(data).decode("utf-8")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_extraction_texts",
+        sa.Column(
+            "extraction_id",
+            sa.Integer(),
+            sa.ForeignKey("document_extractions.id"),
+            primary_key=True,
+        ),
+        sa.Column("encoding", sa.String(length=10), nullable=False),
+        sa.Column("char_count", sa.Integer(), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+    )
+    # Payload is already compressed; skip pglz and store it out of line as-is.
+    op.execute("ALTER TABLE document_extraction_texts ALTER COLUMN data SET STORAGE EXTERNAL")
+
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                "SELECT id, extras ->> 'text' AS text FROM document_extractions "
+                "WHERE id > :last_id AND extras ? 'text' ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            sa.text(
+                "INSERT INTO document_extraction_texts (extraction_id, encoding, char_count, data) "
+                "VALUES (:id, 'gzip', :chars, :data)"
+            ),
+            [
+                {
+                    "id": row.id,
+                    "chars": len(row.text or ""),
+                    "data": gzip.compress((row.text or "").encode("utf-8"), compresslevel=6),
+                }
+                for row in rows
+            ],
+        )
+        conn.execute(
+            sa.text(
+                "UPDATE document_extractions "
+                "SET extras = (extras - 'text') || jsonb_build_object('text_chars', "
+                "coalesce(length(extras ->> 'text'), 0)) "
+                "WHERE id = ANY(:ids)"
+            ),
+            {"ids": [row.id for row in rows]},
+        )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.text("SELECT extraction_id, encoding, data FROM document_extraction_texts")
+    ).all()
+    for row in rows:
+        conn.execute(
+            sa.text(
+                "UPDATE document_extractions "
+                "SET extras = (extras - 'text_chars') || jsonb_build_object('text', CAST(:text AS text)) "
+                "WHERE id = :id"
+            ),
+            {"id": row.extraction_id, "text": _decompress(row.encoding, row.data)},
+        )
+    op.drop_table("document_extraction_texts")
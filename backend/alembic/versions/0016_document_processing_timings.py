@@ -0,0 +1,58 @@
+"""per-stage document processing timings
+
+Revision ID: 0016_document_processing_timings
+Revises: 0015_extraction_text_store
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0016_document_processing_timings"
+down_revision = "0015_extraction_text_store"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_processing_timings",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "document_id",
+            sa.Integer(),
+            sa.ForeignKey("documents.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "extraction_id",
+            sa.Integer(),
+            sa.ForeignKey("document_extractions.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("doc_type", sa.String(length=40), nullable=True),
+        sa.Column("outcome", sa.String(length=40), nullable=False),
+        sa.Column("queue_wait_ms", sa.Float(), nullable=True),
+        sa.Column("extract_ms", sa.Float(), nullable=True),
+        sa.Column("prepare_ms", sa.Float(), nullable=True),
+        sa.Column("llm_ms", sa.Float(), nullable=True),
+        sa.Column("persist_ms", sa.Float(), nullable=True),
+        sa.Column("total_ms", sa.Float(), nullable=False),
+        sa.Column("input_tokens", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("output_tokens", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("cost_usd", sa.Numeric(12, 6), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_document_processing_timings_created_at",
+        "document_processing_timings",
+        ["created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_document_processing_timings_created_at", table_name="document_processing_timings"
+    )
+    op.drop_table("document_processing_timings")
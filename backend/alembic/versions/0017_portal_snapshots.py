@@ -0,0 +1,50 @@
+"""rendered portal view per token
+
+Revision ID: 0017_portal_snapshots
+Revises: 0016_document_processing_timings
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0017_portal_snapshots"
+down_revision = "0016_document_processing_timings"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing tokens get their snapshot on the first portal read.
+    op.create_table(
+        "work_order_portal_snapshots",
+        sa.Column(
+            "token_id",
+            sa.Integer(),
+            sa.ForeignKey("work_order_tokens.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "work_order_id",
+            sa.Integer(),
+            sa.ForeignKey("work_orders.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("body", sa.Text(), nullable=False),
+        sa.Column("etag", sa.String(length=64), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_work_order_portal_snapshots_work_order_id",
+        "work_order_portal_snapshots",
+        ["work_order_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_work_order_portal_snapshots_work_order_id", table_name="work_order_portal_snapshots"
+    )
+    op.drop_table("work_order_portal_snapshots")
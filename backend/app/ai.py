@@ -1,5 +1,6 @@
 import json
 import os
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
@@ -8,6 +9,8 @@ import re
 
 from pydantic import BaseModel, Field
 
+from app.metrics import observe_llm
+
 
 CONTRACT_FIELDS = [
     # Canonical rental contract fields (English).
@@ -110,6 +113,14 @@ def _llm_input_max_chars() -> int:
     return int(os.getenv("AI_LLM_INPUT_MAX_CHARS", "12000"))
 
 
+def _openai_timeout() -> float:
+    return float(os.getenv("OPENAI_TIMEOUT", "30"))
+
+
+def _openai_max_retries() -> int:
+    return int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+
+
 def prepare_llm_input(text: str) -> tuple[str, dict[str, Any]]:
     max_chars = _llm_input_max_chars()
     if len(text) <= max_chars:
@@ -205,6 +216,29 @@ def _default_mock_result(text: str, filename: str) -> ExtractionResult:
     )
 
 
+def _usage(message: Any) -> dict | None:
+    return getattr(message, "usage_metadata", None)
+
+
+def _add_usage(total: dict | None, message: Any) -> None:
+    if total is None:
+        return
+    reported = _usage(message) or {}
+    for key in ("input_tokens", "output_tokens"):
+        total[key] = total.get(key, 0) + int(reported.get(key) or 0)
+
+
+def estimate_llm_cost(usage: dict) -> float:
+    """USD estimate from token counts; prices per 1K tokens (defaults: gpt-4o list prices)."""
+    input_price = float(os.getenv("LLM_PRICE_INPUT_PER_1K", "0.0025"))
+    output_price = float(os.getenv("LLM_PRICE_OUTPUT_PER_1K", "0.01"))
+    return round(
+        usage.get("input_tokens", 0) / 1000 * input_price
+        + usage.get("output_tokens", 0) / 1000 * output_price,
+        6,
+    )
+
+
 def _model_prompt_context(real_estate_name: str | None) -> tuple[str, list[str]]:
     hint = ""
     if real_estate_name:
@@ -218,10 +252,16 @@ def run_llm_extraction(
     real_estate_name: str | None = None,
     model_fields: list[str] | None = None,
     model_prompt: str | None = None,
+    usage: dict | None = None,
 ) -> ExtractionResult:
+    """Extract fields with the LLM; token counts of every call are added to ``usage`` if given."""
     ai_mode = os.getenv("AI_MODE", "live").lower()
     if ai_mode == "mock":
         return _default_mock_result(text, filename)
+    if ai_mode == "simulated":
+        from app.llm_sim import simulate_extraction
+
+        return ExtractionResult.model_validate(simulate_extraction(text, filename, usage))
 
     from langchain_core.prompts import ChatPromptTemplate
     from langchain_openai import ChatOpenAI
@@ -267,29 +307,52 @@ def run_llm_extraction(
         model=model_name,
         temperature=temperature,
         max_tokens=max_tokens,
-        timeout=30,
-        max_retries=2,
+        timeout=_openai_timeout(),
+        max_retries=_openai_max_retries(),
+        base_url=os.getenv("OPENAI_BASE_URL") or None,
+    )
+    structured_llm = llm.with_structured_output(
+        ExtractionResult, method="json_mode", include_raw=True
     )
-    structured_llm = llm.with_structured_output(ExtractionResult, method="json_mode")
+    started = time.perf_counter()
     try:
-        return structured_llm.invoke(prompt.format(filename=filename, text=text))
+        output = structured_llm.invoke(prompt.format(filename=filename, text=text))
     except Exception:
-        fallback_prompt = ChatPromptTemplate.from_messages(
-            [
-                (
-                    "system",
-                    "Return a valid JSON object only. Do not include markdown or extra text. "
-                    "Keep summary <= 50 words and alerts <= 5 short strings.",
-                ),
-                ("human", "Filename: {filename}\n\nText:\n{text}"),
-            ]
-        )
+        output = {"raw": None, "parsed": None}
+    if output["parsed"] is not None:
+        outcome = "ok"
+    else:
+        outcome = "error" if output["raw"] is None else "parse_error"
+    observe_llm(
+        "extract", model_name, outcome, time.perf_counter() - started, _usage(output["raw"])
+    )
+    _add_usage(usage, output["raw"])
+    if output["parsed"] is not None:
+        return output["parsed"]
+
+    fallback_prompt = ChatPromptTemplate.from_messages(
+        [
+            (
+                "system",
+                "Return a valid JSON object only. Do not include markdown or extra text. "
+                "Keep summary <= 50 words and alerts <= 5 short strings.",
+            ),
+            ("human", "Filename: {filename}\n\nText:\n{text}"),
+        ]
+    )
+    started = time.perf_counter()
+    try:
         raw = llm.invoke(
             fallback_prompt.format(filename=filename, text=text),
             response_format={"type": "json_object"},
         )
-        payload = json.loads(raw.content)
-        return ExtractionResult.model_validate(payload)
+    except Exception:
+        observe_llm("extract_fallback", model_name, "error", time.perf_counter() - started, None)
+        raise
+    observe_llm("extract_fallback", model_name, "ok", time.perf_counter() - started, _usage(raw))
+    _add_usage(usage, raw)
+    payload = json.loads(raw.content)
+    return ExtractionResult.model_validate(payload)
 
 
 def quick_extract_contract_fields(text: str) -> dict[str, Any]:
@@ -322,6 +385,10 @@ def summarize_property(payload: dict[str, Any]) -> str:
         tag = payload.get("tag") or payload.get("label") or "Property"
         address = payload.get("property_address") or "address not provided"
         return f"{tag} located at {address}."
+    if ai_mode == "simulated":
+        from app.llm_sim import simulate_summary
+
+        return simulate_summary(payload)
 
     from langchain_core.prompts import ChatPromptTemplate
     from langchain_openai import ChatOpenAI
@@ -352,11 +419,15 @@ def summarize_property(payload: dict[str, Any]) -> str:
         model=model_name,
         temperature=temperature,
         max_tokens=max_tokens,
-        timeout=30,
-        max_retries=2,
+        timeout=_openai_timeout(),
+        max_retries=_openai_max_retries(),
+        base_url=os.getenv("OPENAI_BASE_URL") or None,
     )
+    started = time.perf_counter()
     try:
         result = llm.invoke(prompt.format(payload=json.dumps(payload, ensure_ascii=False)))
-        return (result.content or "").strip()
     except Exception:
+        observe_llm("summarize", model_name, "error", time.perf_counter() - started, None)
         return ""
+    observe_llm("summarize", model_name, "ok", time.perf_counter() - started, _usage(result))
+    return (result.content or "").strip()
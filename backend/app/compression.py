@@ -0,0 +1,222 @@
+import gzip
+import hashlib
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "image/svg+xml",
+    "text/",
+)
+MAX_BUFFER_BYTES = 8 * 1024 * 1024
+
+
+def _brotli():
+    try:
+        import brotli
+    except Exception:
+        return None
+    return brotli
+
+
+def compression_min_bytes() -> int:
+    return int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+
+
+def weak_etag(body: bytes) -> str:
+    return f'W/"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {tag.strip() for tag in if_none_match.split(",")}
+    # Weak comparison: W/"x" and "x" name the same representation.
+    return "*" in tags or etag in tags or etag.removeprefix("W/") in tags
+
+
+def _quality(params: str) -> float:
+    key, _, value = params.replace(" ", "").partition("=")
+    if key != "q":
+        return 1.0
+    try:
+        return float(value)
+    except ValueError:
+        return 1.0
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    offered = set()
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.partition(";")
+        if _quality(params) == 0:
+            continue
+        offered.add(name.strip().lower())
+    if "br" in offered and _brotli() is not None:
+        return "br"
+    if "gzip" in offered:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return _brotli().compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+class CompressionMiddleware:
+    """Compress large text responses and add weak ETags (304 on match) to GET 200s."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int | None = None) -> None:
+        self.app = app
+        self.minimum_size = compression_min_bytes() if minimum_size is None else minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        responder = _BufferedResponder(
+            send,
+            method=scope["method"],
+            encoding=choose_encoding(request_headers.get("accept-encoding")),
+            if_none_match=request_headers.get("if-none-match"),
+            minimum_size=self.minimum_size,
+        )
+        await self.app(scope, receive, responder)
+
+
+class _BufferedResponder:
+    def __init__(
+        self,
+        send: Send,
+        method: str,
+        encoding: str | None,
+        if_none_match: str | None,
+        minimum_size: int,
+    ) -> None:
+        self.send = send
+        self.method = method
+        self.encoding = encoding
+        self.if_none_match = if_none_match
+        self.minimum_size = minimum_size
+        self.start: Message | None = None
+        self.chunks: list[bytes] = []
+        self.size = 0
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            if self.passthrough:
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        self.chunks.append(body)
+        self.size += len(body)
+        if message.get("more_body", False):
+            if self.size > MAX_BUFFER_BYTES:
+                # Too big to hold in memory: flush unmodified and stream the rest.
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send(
+                    {"type": "http.response.body", "body": b"".join(self.chunks), "more_body": True}
+                )
+            return
+        await self._finish(b"".join(self.chunks))
+
+    async def _finish(self, body: bytes) -> None:
+        start = self.start
+        headers = MutableHeaders(raw=start["headers"])
+        if self.method == "GET" and start["status"] == 200:
+            etag = headers.get("etag") or weak_etag(body)
+            headers["ETag"] = etag
+            if etag_matches(self.if_none_match, etag):
+                del headers["content-length"]
+                if "content-type" in headers:
+                    del headers["content-type"]
+                await self.send(
+                    {"type": "http.response.start", "status": 304, "headers": headers.raw}
+                )
+                await self.send({"type": "http.response.body", "body": b""})
+                return
+        if self.encoding and len(body) >= self.minimum_size:
+            body = compress(body, self.encoding)
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+        headers["Content-Length"] = str(len(body))
+        await self.send(
+            {"type": "http.response.start", "status": start["status"], "headers": headers.raw}
+        )
+        await self.send({"type": "http.response.body", "body": body})
+
+
+@dataclass
+class StaticAsset:
+    body: bytes
+    media_type: str
+    etag: str
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path, media_type: str) -> "StaticAsset":
+        body = path.read_bytes()
+        asset = cls(body=body, media_type=media_type, etag=weak_etag(body))
+        asset.encoded["gzip"] = compress(body, "gzip")
+        if _brotli() is not None:
+            asset.encoded["br"] = compress(body, "br")
+        return asset
+
+    def response(self, request_headers: Headers) -> Response:
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": "public, no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(request_headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=headers)
+        encoding = choose_encoding(request_headers.get("accept-encoding"))
+        if encoding in self.encoded:
+            headers["Content-Encoding"] = encoding
+            return Response(self.encoded[encoding], media_type=self.media_type, headers=headers)
+        return Response(self.body, media_type=self.media_type, headers=headers)
+
+
+def load_static_assets(directory: Path, media_types: dict[str, str]) -> dict[str, StaticAsset]:
+    """Read and precompress the given files once, at startup."""
+    return {
+        name: StaticAsset.load(directory / name, media_type)
+        for name, media_type in media_types.items()
+    }
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that serves preloaded assets from memory and the rest from disk."""
+
+    def __init__(self, *args, assets: dict[str, StaticAsset], **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.assets = assets
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        asset = self.assets.get(path)
+        if asset is not None and scope["method"] in {"GET", "HEAD"}:
+            return asset.response(Headers(scope=scope))
+        return await super().get_response(path, scope)
@@ -1,10 +1,85 @@
 import os
 
 from sqlalchemy import create_engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.instrumentation import install_query_timing
+from app.pool import TimedAsyncQueuePool, TimedQueuePool, install_idle_validation, pool_options
+from app.replica import REPLICA_LAG_SQL, ReplicaRouter
 
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql+psycopg2://postgres:postgres@db:5432/app")
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL") or None
+
+
+def _async_url(url: str) -> str:
+    scheme, _, rest = url.partition("://")
+    return f"postgresql+asyncpg://{rest}" if scheme.startswith("postgresql") else url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL)
+
+
+def _sync_engine(url: str):
+    engine = create_engine(url, poolclass=TimedQueuePool, **pool_options())
+    install_idle_validation(engine)
+    install_query_timing(engine)
+    return engine
+
+
+def _async_engine(url: str):
+    # ASYNC_DB_POOL=null opens a connection per session; needed when each request runs on its own
+    # event loop (TestClient) since pooled asyncpg connections are bound to the loop that made them.
+    if os.getenv("ASYNC_DB_POOL", "queue") == "null":
+        engine = create_async_engine(url, poolclass=NullPool)
+    else:
+        engine = create_async_engine(url, poolclass=TimedAsyncQueuePool, **pool_options())
+        install_idle_validation(engine.sync_engine)
+    install_query_timing(engine.sync_engine)
+    return engine
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+
+engine = _sync_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+async_engine = _async_engine(ASYNC_DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+# Without DATABASE_READ_URL the read engines are the primary ones.
+read_engine = _sync_engine(DATABASE_READ_URL) if DATABASE_READ_URL else engine
+async_read_engine = (
+    _async_engine(_async_url(DATABASE_READ_URL)) if DATABASE_READ_URL else async_engine
+)
+replica = ReplicaRouter()
+
+
+def read_bind():
+    """Engine for a read-only request: the replica while its lag is within bounds."""
+    if read_engine is engine:
+        return engine
+    if replica.claim_check():
+        try:
+            with read_engine.connect() as conn:
+                replica.record(conn.execute(REPLICA_LAG_SQL).scalar())
+        except SQLAlchemyError:
+            replica.record(None)
+    return read_engine if replica.use_replica() else engine
+
+
+async def async_read_bind():
+    if async_read_engine is async_engine:
+        return async_engine
+    if replica.claim_check():
+        try:
+            async with async_read_engine.connect() as conn:
+                replica.record((await conn.execute(REPLICA_LAG_SQL)).scalar())
+        except (SQLAlchemyError, OSError):
+            replica.record(None)
+    return async_read_engine if replica.use_replica() else async_engine
+
+
 Base = declarative_base()
@@ -2,12 +2,21 @@ from datetime import datetime, timezone
 
 from fastapi import Depends, HTTPException, Request
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.auth import cookie_name
-from app.db import SessionLocal
+from app.db import (
+    AsyncSessionLocal,
+    SessionLocal,
+    async_engine,
+    async_read_bind,
+    engine,
+    read_bind,
+)
 from app.models import Session as UserSession
 from app.models import User
+from app.replica import READ_PRIMARY_COOKIE
 
 
 def get_db():
@@ -18,6 +27,37 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _pinned_to_primary(request: Request) -> bool:
+    return request.cookies.get(READ_PRIMARY_COOKIE) == "1"
+
+
+def get_read_db(request: Request):
+    """Session for read-only routes; may be served by the read replica."""
+    db = SessionLocal(bind=engine if _pinned_to_primary(request) else read_bind())
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    bind = async_engine if _pinned_to_primary(request) else await async_read_bind()
+    async with AsyncSessionLocal(bind=bind) as db:
+        yield db
+
+
+def _check_session(session: UserSession | None) -> None:
+    if session is None or session.revoked_at is not None:
+        raise HTTPException(status_code=401, detail="session_invalid")
+    if session.expires_at < datetime.now(timezone.utc):
+        raise HTTPException(status_code=401, detail="session_expired")
+
+
 def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
     session_id = request.cookies.get(cookie_name())
     if not session_id:
@@ -25,10 +65,7 @@ def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
     session = db.execute(
         select(UserSession).where(UserSession.id == session_id)
     ).scalar_one_or_none()
-    if session is None or session.revoked_at is not None:
-        raise HTTPException(status_code=401, detail="session_invalid")
-    if session.expires_at < datetime.now(timezone.utc):
-        raise HTTPException(status_code=401, detail="session_expired")
+    _check_session(session)
     user = db.get(User, session.user_id)
     if user is None:
         raise HTTPException(status_code=401, detail="user_not_found")
@@ -53,3 +90,28 @@ def require_admin(user: User = Depends(get_current_user)) -> User:
     if user.role != "admin":
         raise HTTPException(status_code=403, detail="forbidden")
     return user
+
+
+async def get_current_user_async(
+    request: Request, db: AsyncSession = Depends(get_async_read_db)
+) -> User:
+    """For the async read routes: the session lookup shares the route's read session, so a
+    request holds one pooled connection. Logout is a write, so it pins the browser to the
+    primary and the revoked session is seen there."""
+    session_id = request.cookies.get(cookie_name())
+    if not session_id:
+        raise HTTPException(status_code=401, detail="not_authenticated")
+    session = (
+        await db.execute(select(UserSession).where(UserSession.id == session_id))
+    ).scalar_one_or_none()
+    _check_session(session)
+    user = await db.get(User, session.user_id)
+    if user is None:
+        raise HTTPException(status_code=401, detail="user_not_found")
+    return user
+
+
+async def require_admin_async(user: User = Depends(get_current_user_async)) -> User:
+    if user.role != "admin":
+        raise HTTPException(status_code=403, detail="forbidden")
+    return user
@@ -0,0 +1,67 @@
+from sqlalchemy import DateTime, Text, case, cast, func, literal
+
+EXTRAS_PREFIX = "extras."
+
+
+def parse_fields(
+    raw: str,
+    columns: dict,
+    extras=None,
+    extras_columns: dict | None = None,
+) -> tuple[dict, dict] | None:
+    """Map ``id,extras.tag`` to SQL expressions; None when a name is not allowed.
+
+    Keys in ``extras_columns`` come from promoted columns so the JSONB is not read.
+    """
+    extras_columns = extras_columns or {}
+    top: dict = {}
+    nested: dict = {}
+    for name in (item.strip() for item in raw.split(",")):
+        if not name:
+            continue
+        if name.startswith(EXTRAS_PREFIX):
+            key = name[len(EXTRAS_PREFIX):]
+            if key in extras_columns:
+                nested[key] = extras_columns[key]
+            elif extras is not None and key:
+                nested[key] = extras[key]
+            else:
+                return None
+        elif name in columns:
+            top[name] = columns[name]
+        else:
+            return None
+    if not top and not nested:
+        return None
+    return top, nested
+
+
+def _json_value(expr):
+    """Datetimes as Pydantic writes them (UTC, "Z", fraction only when non-zero), not as
+    Postgres would format them in the session time zone."""
+    if not isinstance(getattr(expr, "type", None), DateTime):
+        return expr
+    utc = func.timezone("UTC", expr)
+    fraction = case(
+        (func.date_trunc("second", utc) != utc, func.to_char(utc, ".US")),
+        else_="",
+    )
+    return func.to_char(utc, 'YYYY-MM-DD"T"HH24:MI:SS').op("||")(fraction).op("||")("Z")
+
+
+def fieldset_statement(stmt, fieldset: tuple[dict, dict]):
+    """Project ``stmt`` onto the fieldset; each row is built as JSON text in Postgres."""
+    top, nested = fieldset
+    pairs = []
+    for name, expr in top.items():
+        pairs.extend([literal(name), _json_value(expr)])
+    if nested:
+        inner = []
+        for key, expr in nested.items():
+            inner.extend([literal(key), _json_value(expr)])
+        pairs.extend([literal("extras"), func.json_build_object(*inner)])
+    return stmt.with_only_columns(cast(func.json_build_object(*pairs), Text))
+
+
+def json_array(rows: list[str]) -> str:
+    return "[" + ",".join(rows) + "]"
@@ -0,0 +1,303 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from functools import partial
+from http.cookies import SimpleCookie
+from typing import Any
+
+import anyio
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.auth import cookie_name
+from app.metrics import IDEMPOTENCY_REQUESTS
+
+# Idempotency-Key support for submissions that providers and users retry on flaky connections.
+# The first request with a key claims it; once it answers (any status below 500) the response is
+# stored for IDEMPOTENCY_TTL_SECONDS and replayed to retries with "Idempotency-Replayed: true",
+# without running the route again. A retry that arrives while the first request is still running
+# gets 409 idempotency_in_progress. Keys are scoped to the path and the session cookie, so the same
+# key on another token, property or account is a different request. The claim also records a
+# fingerprint of the query string and body; reusing a key with a different one answers 422
+# idempotency_key_reused instead of replaying a response for a submission that never ran.
+# IDEMPOTENCY_BACKEND is redis, memory or off.
+KEY_PREFIX = "idempotency"
+HEADER = "idempotency-key"
+MAX_KEY_LENGTH = 255
+# How long a claim survives a request that never finishes (worker killed mid-request).
+LOCK_SECONDS = 300
+MEMORY_MAX_ENTRIES = 10_000
+IDEMPOTENT_ROUTES = (
+    re.compile(r"^/portal/work-orders/[^/]+/(quote|interest|submit-proof)$"),
+    re.compile(r"^/documents/upload$"),
+    re.compile(r"^/properties/\d+/photos$"),
+)
+# Per-response headers that must not be replayed.
+SKIPPED_HEADERS = {b"content-length", b"date", b"server", b"set-cookie"}
+BOUNDARY_RE = re.compile(r'boundary="?([^";]+)"?', re.IGNORECASE)
+
+logger = logging.getLogger("app.idempotency")
+
+
+def _ttl_seconds() -> int:
+    return int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+
+
+class MemoryIdempotencyStore:
+    blocking = False
+
+    def __init__(self, max_entries: int = MEMORY_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: dict[str, tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+
+    def begin(self, key: str, fingerprint: str, lock_seconds: int) -> dict | None:
+        """The pending claim or stored response for the key, or None when this call claimed it."""
+        now = time.monotonic()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[0] > now:
+                return item[1]
+            if len(self._entries) >= self.max_entries:
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+            self._entries[key] = (now + lock_seconds, {"fingerprint": fingerprint})
+            return None
+
+    def finish(self, key: str, response: dict, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, response)
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisIdempotencyStore:
+    blocking = True
+
+    def __init__(self, url: str) -> None:
+        from redis import Redis
+
+        self.redis = Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def begin(self, key: str, fingerprint: str, lock_seconds: int) -> dict | None:
+        name = f"{KEY_PREFIX}:{key}"
+        claim = {"fingerprint": fingerprint}
+        if self.redis.set(name, json.dumps(claim), nx=True, ex=lock_seconds):
+            return None
+        raw = self.redis.get(name)
+        if raw is None:
+            # Released between the two calls; answer as in progress so the client retries.
+            return claim
+        return json.loads(raw)
+
+    def finish(self, key: str, response: dict, ttl: int) -> None:
+        self.redis.set(f"{KEY_PREFIX}:{key}", json.dumps(response), ex=ttl)
+
+    def release(self, key: str) -> None:
+        self.redis.delete(f"{KEY_PREFIX}:{key}")
+
+    def clear(self) -> None:
+        keys = list(self.redis.scan_iter(f"{KEY_PREFIX}:*"))
+        if keys:
+            self.redis.delete(*keys)
+
+
+_store: MemoryIdempotencyStore | RedisIdempotencyStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_idempotency_store() -> MemoryIdempotencyStore | RedisIdempotencyStore | None:
+    """Backend from IDEMPOTENCY_BACKEND; defaults to memory with QUEUE_MODE=inline, else redis."""
+    global _store
+    from app.queue import get_redis_url, is_inline_mode
+
+    backend = os.getenv("IDEMPOTENCY_BACKEND", "memory" if is_inline_mode() else "redis").lower()
+    if backend == "off":
+        return None
+    with _store_lock:
+        if backend == "memory" and not isinstance(_store, MemoryIdempotencyStore):
+            _store = MemoryIdempotencyStore()
+        elif backend == "redis" and not isinstance(_store, RedisIdempotencyStore):
+            _store = RedisIdempotencyStore(get_redis_url())
+        return _store
+
+
+async def _run(store, method: str, *args) -> Any:
+    call = partial(getattr(store, method), *args)
+    if store.blocking:
+        return await anyio.to_thread.run_sync(call)
+    return call()
+
+
+def _header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _scoped_key(scope: Scope, key: str) -> str:
+    session = ""
+    cookies = _header(scope, b"cookie")
+    if cookies:
+        morsel = SimpleCookie(cookies).get(cookie_name())
+        session = morsel.value if morsel else ""
+    raw = "\0".join([scope["method"], scope["path"], session, key])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _fingerprint(scope: Scope, body: bytes) -> str:
+    """Hash of the query string, media type and body a key was first used with."""
+    content_type = _header(scope, b"content-type") or ""
+    media_type, _, params = content_type.partition(";")
+    boundary = BOUNDARY_RE.search(params)
+    if boundary:
+        # Clients pick a new multipart boundary per attempt; only the parts have to match.
+        body = body.replace(boundary.group(1).encode("latin-1"), b"")
+    digest = hashlib.sha256(scope.get("query_string", b""))
+    digest.update(b"\0" + media_type.strip().lower().encode("latin-1") + b"\0")
+    digest.update(body)
+    return digest.hexdigest()
+
+
+async def _read_body(receive: Receive) -> list[Message]:
+    messages = []
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request" or not message.get("more_body"):
+            return messages
+
+
+async def _send_json(send: Send, status: int, body: dict, headers: list | None = None) -> None:
+    data = json.dumps(body).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(data)).encode()),
+                *(headers or []),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": data})
+
+
+async def _release(store, key: str) -> None:
+    try:
+        await _run(store, "release", key)
+    except Exception as exc:
+        logger.warning("idempotency_store_unavailable %s", exc)
+
+
+async def _replay(send: Send, response: dict) -> None:
+    body = base64.b64decode(response["body"])
+    headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in response["headers"]]
+    headers += [
+        (b"content-length", str(len(body)).encode()),
+        (b"idempotency-replayed", b"true"),
+    ]
+    await send({"type": "http.response.start", "status": response["status"], "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """Replay the stored response for a repeated ``Idempotency-Key`` on the listed routes."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        key = None
+        if scope["type"] == "http" and scope["method"] == "POST":
+            if any(route.match(scope["path"]) for route in IDEMPOTENT_ROUTES):
+                key = _header(scope, HEADER.encode())
+        store = get_idempotency_store() if key is not None else None
+        if store is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH or not key.isprintable():
+            await _send_json(send, 422, {"detail": "invalid_idempotency_key"})
+            return
+
+        # The body is buffered to fingerprint it, then handed to the route unchanged.
+        messages = await _read_body(receive)
+
+        async def replay_receive() -> Message:
+            if messages:
+                return messages.pop(0)
+            return await receive()
+
+        body = b"".join(m.get("body", b"") for m in messages if m["type"] == "http.request")
+        fingerprint = _fingerprint(scope, body)
+        scoped = _scoped_key(scope, key)
+        try:
+            existing = await _run(store, "begin", scoped, fingerprint, LOCK_SECONDS)
+        except Exception as exc:
+            # Fail open: without the store the request runs as if no key had been sent.
+            logger.warning("idempotency_store_unavailable %s", exc)
+            await self.app(scope, replay_receive, send)
+            return
+        if existing is not None and existing.get("fingerprint") != fingerprint:
+            IDEMPOTENCY_REQUESTS.labels("mismatch").inc()
+            await _send_json(send, 422, {"detail": "idempotency_key_reused"})
+            return
+        if existing is not None and "status" not in existing:
+            IDEMPOTENCY_REQUESTS.labels("in_progress").inc()
+            await _send_json(
+                send, 409, {"detail": "idempotency_in_progress"}, [(b"retry-after", b"1")]
+            )
+            return
+        if existing is not None:
+            IDEMPOTENCY_REQUESTS.labels("replayed").inc()
+            await _replay(send, existing)
+            return
+
+        start: Message | None = None
+        chunks: list[bytes] = []
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, send_wrapper)
+        except Exception:
+            await _release(store, scoped)
+            raise
+        if start is None or start["status"] >= 500:
+            # Failed requests may be retried with the same key.
+            await _release(store, scoped)
+            return
+        response = {
+            "fingerprint": fingerprint,
+            "status": start["status"],
+            "headers": [
+                (k.decode("latin-1"), v.decode("latin-1"))
+                for k, v in start.get("headers", [])
+                if k.lower() not in SKIPPED_HEADERS
+            ],
+            "body": base64.b64encode(b"".join(chunks)).decode(),
+        }
+        try:
+            await _run(store, "finish", scoped, response, _ttl_seconds())
+        except Exception as exc:
+            logger.warning("idempotency_store_unavailable %s", exc)
+            await _release(store, scoped)
+            return
+        IDEMPOTENCY_REQUESTS.labels("stored").inc()
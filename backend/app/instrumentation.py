@@ -0,0 +1,134 @@
+import json
+import logging
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger("app.requests")
+
+# Set per request by RequestTimingMiddleware; the threadpool copies the context, so sync routes
+# and dependencies record into the same object.
+_current: ContextVar["RequestStats | None"] = ContextVar("request_stats", default=None)
+
+
+def server_timing_enabled() -> bool:
+    return os.getenv("SERVER_TIMING", "true").lower() == "true"
+
+
+def slow_request_ms() -> float:
+    return float(os.getenv("SLOW_REQUEST_MS", "500"))
+
+
+def slow_request_queries() -> int:
+    return int(os.getenv("SLOW_REQUEST_QUERIES", "20"))
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_ms: float = 0.0
+    slowest_ms: float = 0.0
+    slowest_sql: str | None = None
+
+    def record_query(self, statement: str, elapsed_ms: float) -> None:
+        self.queries += 1
+        self.db_ms += elapsed_ms
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_sql = statement
+
+    def server_timing(self, total_ms: float) -> str:
+        return (
+            f'app;dur={total_ms:.1f}, db;dur={self.db_ms:.1f};desc="{self.queries} queries", '
+            f"db-slowest;dur={self.slowest_ms:.1f}"
+        )
+
+
+def current_stats() -> RequestStats | None:
+    return _current.get()
+
+
+def install_query_timing(engine) -> None:
+    """Count and time every statement run on ``engine`` inside a timed request."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany) -> None:
+        started = conn.info["query_started"].pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.record_query(statement, (time.perf_counter() - started) * 1000)
+
+
+def _route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or scope["path"]
+
+
+class RequestTimingMiddleware:
+    """Add ``Server-Timing`` (total, DB time, query count) and log slow requests."""
+
+    def __init__(self, app: ASGIApp, observe: Callable | None = None) -> None:
+        self.app = app
+        # Called as observe(scope, status, seconds, stats) after every request (metrics).
+        self.observe = observe
+        self.server_timing = server_timing_enabled()
+        self.slow_ms = slow_request_ms()
+        self.slow_queries = slow_request_queries()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    total_ms = (time.perf_counter() - started) * 1000
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing", stats.server_timing(total_ms)
+                    )
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            total_ms = (time.perf_counter() - started) * 1000
+            if self.observe is not None:
+                self.observe(scope, status, total_ms / 1000, stats)
+            if total_ms >= self.slow_ms or stats.queries >= self.slow_queries:
+                logger.warning(
+                    "slow_request %s",
+                    json.dumps(
+                        {
+                            "method": scope["method"],
+                            "route": _route_template(scope),
+                            "status": status,
+                            "total_ms": round(total_ms, 1),
+                            "queries": stats.queries,
+                            "db_ms": round(stats.db_ms, 1),
+                            "slowest_ms": round(stats.slowest_ms, 1),
+                            "slowest_sql": (stats.slowest_sql or "")[:300],
+                            "bytes": size,
+                        }
+                    ),
+                )
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Any
+
+from app.metrics import observe_llm
+
+# AI_MODE=simulated: behaves like a slow, occasionally failing provider without network access.
+# Latency, failures and 429s are random (AI_SIM_SEED fixes the sequence per process); extracted
+# fields are derived from the text only, so the same document always yields the same result.
+SIM_MODEL = "simulated"
+DOC_TYPE_KEYWORDS = [
+    ("invoice", ("nota fiscal", "fatura", "invoice", "boleto")),
+    ("receipt", ("recibo", "comprovante", "receipt")),
+    ("work_order", ("ordem de servico", "orcamento", "work order")),
+    ("contract", ("contrato", "locacao", "locação", "locador", "locatario", "locatário")),
+]
+RENT_RE = re.compile(r"R\$\s*[\d.]+,\d{2}")
+ADMIN_FEE_RE = re.compile(
+    r"administra\w*[^%\n]{0,40}?(\d{1,2}(?:[.,]\d{1,2})?)\s*%", re.IGNORECASE
+)
+CPF_RE = re.compile(r"\b\d{3}\.\d{3}\.\d{3}-\d{2}\b")
+DATE_RE = re.compile(r"\b\d{2}/\d{2}/\d{4}\b")
+PAYMENT_DAY_RE = re.compile(r"\bdia\s+(\d{1,2})\b", re.IGNORECASE)
+TERM_RE = re.compile(r"\b(\d{1,3})\s*meses\b", re.IGNORECASE)
+# System prompt sizes added to the input when estimating prompt tokens.
+PROMPT_OVERHEAD_CHARS = 2000
+SUMMARY_PROMPT_CHARS = 500
+
+
+class SimulatedLLMError(RuntimeError):
+    pass
+
+
+class SimulatedRateLimitError(RuntimeError):
+    pass
+
+
+def _env_float(name: str, default: str) -> float:
+    return float(os.getenv(name, default))
+
+
+def _seeded_rng() -> random.Random:
+    seed = os.getenv("AI_SIM_SEED")
+    return random.Random(int(seed)) if seed else random.Random()
+
+
+_rng = _seeded_rng()
+_window: deque[float] = deque()
+_window_lock = threading.Lock()
+
+
+def _sleep(ms: float) -> None:
+    scaled = ms * _env_float("AI_SIM_TIME_SCALE", "1") / 1000
+    if scaled > 0:
+        time.sleep(scaled)
+
+
+def _tokens(chars: int) -> int:
+    return max(1, chars // 4)
+
+
+def sample_latency_ms(input_tokens: int, output_tokens: int) -> float:
+    """Base latency from AI_SIM_LATENCY_DIST plus per-token time for the prompt and the answer."""
+    distribution = os.getenv("AI_SIM_LATENCY_DIST", "lognormal").lower()
+    base = _env_float("AI_SIM_LATENCY_MS", "1000")
+    spread = _env_float("AI_SIM_LATENCY_SPREAD", "0.3")
+    if distribution == "fixed":
+        latency = base
+    elif distribution == "uniform":
+        latency = base * _rng.uniform(1 - spread, 1 + spread)
+    elif distribution == "normal":
+        latency = _rng.gauss(base, base * spread)
+    else:
+        # AI_SIM_LATENCY_MS is the median; the long right tail matches real provider latencies.
+        latency = base * _rng.lognormvariate(0, spread)
+    latency += input_tokens * _env_float("AI_SIM_MS_PER_INPUT_TOKEN", "0.1")
+    latency += output_tokens * _env_float("AI_SIM_MS_PER_OUTPUT_TOKEN", "40")
+    return max(latency, 0.0)
+
+
+def _redis_window_admit(rpm: int) -> bool | None:
+    """Shared window across worker processes; None when Redis is not used or unavailable."""
+    from app.queue import get_redis_url, is_inline_mode
+
+    if is_inline_mode():
+        return None
+    try:
+        from redis import Redis
+
+        redis = Redis.from_url(get_redis_url(), socket_timeout=0.5)
+        now = time.time()
+        key = "llm_sim:rpm"
+        pipe = redis.pipeline()
+        pipe.zremrangebyscore(key, 0, now - 60)
+        pipe.zcard(key)
+        _, count = pipe.execute()
+        if count >= rpm:
+            return False
+        pipe = redis.pipeline()
+        pipe.zadd(key, {f"{now}:{os.getpid()}:{_rng.random()}": now})
+        pipe.expire(key, 120)
+        pipe.execute()
+        return True
+    except Exception:
+        return None
+
+
+def _admit() -> bool:
+    """False when this call would get a 429 from the emulated provider."""
+    if _rng.random() < _env_float("AI_SIM_RATE_LIMIT_RATE", "0"):
+        return False
+    rpm = int(os.getenv("AI_SIM_RATE_LIMIT_RPM", "0"))
+    if rpm <= 0:
+        return True
+    admitted = _redis_window_admit(rpm)
+    if admitted is not None:
+        return admitted
+    now = time.monotonic()
+    with _window_lock:
+        while _window and _window[0] <= now - 60:
+            _window.popleft()
+        if len(_window) >= rpm:
+            return False
+        _window.append(now)
+        return True
+
+
+def _call(input_tokens: int, output_tokens: int) -> None:
+    """Wait like a provider call would, raising the simulated timeout, failure or 429."""
+    max_retries = int(os.getenv("AI_SIM_MAX_RETRIES", "2"))
+    for attempt in range(max_retries + 1):
+        if _admit():
+            break
+        _sleep(50)
+        if attempt == max_retries:
+            raise SimulatedRateLimitError("simulated_rate_limit")
+        # Exponential backoff with jitter, as the OpenAI client does on 429.
+        _sleep(min(500 * 2**attempt, 8000) * _rng.uniform(0.75, 1.0))
+    roll = _rng.random()
+    timeout_rate = _env_float("AI_SIM_TIMEOUT_RATE", "0")
+    if roll < timeout_rate:
+        _sleep(_env_float("AI_SIM_TIMEOUT_SECONDS", "30") * 1000)
+        raise TimeoutError("simulated_llm_timeout")
+    latency = sample_latency_ms(input_tokens, output_tokens)
+    if roll < timeout_rate + _env_float("AI_SIM_FAILURE_RATE", "0"):
+        _sleep(latency * _rng.random())
+        raise SimulatedLLMError("simulated_llm_failure")
+    _sleep(latency)
+
+
+def _doc_type(text: str, filename: str) -> str:
+    haystack = f"{filename}\n{text}".lower()
+    for doc_type, keywords in DOC_TYPE_KEYWORDS:
+        if any(keyword in haystack for keyword in keywords):
+            return doc_type
+    return "other"
+
+
+def simulated_payload(text: str, filename: str) -> dict[str, Any]:
+    """Extraction result computed from the text alone (same input, same output)."""
+    fields: dict[str, Any] = {}
+    if match := RENT_RE.search(text):
+        fields["rent_amount"] = match.group(0)
+    if match := ADMIN_FEE_RE.search(text):
+        fields["admin_fee_percent"] = match.group(1).replace(",", ".")
+    cpfs = CPF_RE.findall(text)
+    for key, value in zip(("landlord_cpf", "tenant_cpf", "guarantor_cpf"), cpfs):
+        fields[key] = value
+    dates = DATE_RE.findall(text)
+    for key, value in zip(("start_date", "end_date"), dates):
+        fields[key] = value
+    if match := PAYMENT_DAY_RE.search(text):
+        fields["payment_day"] = int(match.group(1))
+    if match := TERM_RE.search(text):
+        fields["term_months"] = int(match.group(1))
+    if cpfs:
+        fields["sensitive_topics"] = ["cpf"]
+
+    words = text.split()
+    summary = " ".join(words[:50]) if words else "no_text"
+    alerts = [] if words else ["no_text_extracted"]
+    digest = hashlib.sha256(f"{filename}\0{text}".encode()).digest()
+    return {
+        "doc_type": _doc_type(text, filename),
+        "fields": fields,
+        "summary": summary,
+        "alerts": alerts,
+        "confidence": round(0.6 + digest[0] / 255 * 0.35, 2),
+    }
+
+
+def simulate_extraction(text: str, filename: str, usage: dict | None = None) -> dict[str, Any]:
+    payload = simulated_payload(text, filename)
+    call_usage = {
+        "input_tokens": _tokens(len(text) + PROMPT_OVERHEAD_CHARS),
+        "output_tokens": _tokens(len(json.dumps(payload, ensure_ascii=False))),
+    }
+    started = time.perf_counter()
+    try:
+        _call(call_usage["input_tokens"], call_usage["output_tokens"])
+    except Exception:
+        observe_llm("extract", SIM_MODEL, "error", time.perf_counter() - started, None)
+        raise
+    observe_llm("extract", SIM_MODEL, "ok", time.perf_counter() - started, call_usage)
+    if usage is not None:
+        for key, value in call_usage.items():
+            usage[key] = usage.get(key, 0) + value
+    return payload
+
+
+def simulate_summary(payload: dict[str, Any]) -> str:
+    tag = payload.get("tag") or payload.get("label") or "Property"
+    address = payload.get("property_address") or "address not provided"
+    summary = f"{tag} located at {address}."
+    started = time.perf_counter()
+    try:
+        _call(
+            _tokens(len(json.dumps(payload, ensure_ascii=False)) + SUMMARY_PROMPT_CHARS),
+            _tokens(len(summary)),
+        )
+    except Exception:
+        observe_llm("summarize", SIM_MODEL, "error", time.perf_counter() - started, None)
+        return ""
+    observe_llm("summarize", SIM_MODEL, "ok", time.perf_counter() - started, None)
+    return summary
@@ -2,18 +2,21 @@ import hashlib
 import os
 import secrets
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
+import anyio
 import re
 from typing import List
 
 from fastapi import Depends, FastAPI, File, Form, HTTPException, Request, Response, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
-from fastapi.responses import FileResponse, HTMLResponse, Response
-from fastapi.staticfiles import StaticFiles
-from sqlalchemy import delete, or_, select, update
+from fastapi.responses import FileResponse, Response
+from sqlalchemy import String, delete, func, literal, literal_column, select, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.auth import (
@@ -24,12 +27,41 @@ from app.auth import (
     session_expiry,
     verify_password,
 )
-from app.deps import get_current_user, get_db, get_optional_user, require_admin
+from app.compression import (
+    CachedStaticFiles,
+    CompressionMiddleware,
+    etag_matches,
+    load_static_assets,
+    weak_etag,
+)
+from app.db import async_engine, async_read_engine, engine, read_engine, replica
+from app.deps import (
+    get_async_db,
+    get_async_read_db,
+    get_current_user,
+    get_current_user_async,
+    get_db,
+    get_optional_user,
+    get_read_db,
+    require_admin,
+    require_admin_async,
+)
+from app.fieldsets import fieldset_statement, json_array, parse_fields
+from app.idempotency import IdempotencyMiddleware
+from app.instrumentation import RequestTimingMiddleware
+from app.metrics import (
+    mark_process_dead,
+    observe_pools,
+    observe_request,
+    render as render_metrics,
+)
 from app.models import (
     ActivityLog,
     DomainEvent,
     Document,
     DocumentExtraction,
+    DocumentExtractionText,
+    DocumentProcessingTiming,
     Property,
     PropertyContract,
     Session as UserSession,
@@ -37,10 +69,16 @@ from app.models import (
     WorkOrder,
     WorkOrderInterest,
     WorkOrderProof,
+    WorkOrderPortalSnapshot,
     WorkOrderQuote,
     WorkOrderToken,
+    document_update,
 )
+from app import portal_cache, ratelimit
+from app.pool import pool_stats
 from app.queue import is_inline_mode, try_enqueue
+from app.replica import ReadPrimaryAfterWriteMiddleware
+from app.responses import default_response_class, is_fast_json, json_rows_response
 from app.schemas import (
     DocumentOut,
     DocumentProcessResponse,
@@ -55,18 +93,40 @@ from app.schemas import (
     UserCreate,
     UserOut,
     UserUpdate,
+    PropertyDetail,
     PropertyImportResponse,
+    ProcessingTimingGroup,
+    ProcessingTimingsResponse,
+    StageTiming,
     WorkOrderCreate,
     WorkOrderOut,
     WorkOrderCreateResponse,
+    WorkOrderDetail,
+    WorkOrderInterestOut,
+    WorkOrderListItem,
+    WorkOrderProofOut,
+    WorkOrderQuoteOut,
+    WorkOrderTokenOut,
     WorkOrderQuoteCreate,
     WorkOrderInterestCreate,
     WorkOrderApproveQuote,
     WorkOrderPortalView,
     ActivityLogOut,
     DomainEventOut,
+    SearchResponse,
+    DocumentSearchResponse,
+)
+from app.search import (
+    SEARCH_TYPES,
+    document_vector,
+    matches,
+    owned_property_ids,
+    prefix_tsquery,
+    search_documents,
+    unified_search,
 )
 from app.storage import get_upload_dir
+from app.textstore import load_extraction_text, save_extraction_text
 from app.worker import process_document_job
 from app.ai import (
     extract_text,
@@ -76,14 +136,27 @@ from app.ai import (
     quick_extract_contract_fields,
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Each uvicorn worker retires its own live gauges; uvicorn has no parent-side exit hook.
+    mark_process_dead(os.getpid())
+
+
 app = FastAPI(
     title="rentED API",
+    lifespan=lifespan,
     version="0.1.0",
+    default_response_class=default_response_class(),
     docs_url=None,
     redoc_url=None,
     openapi_url="/openapi.json",
 )
 
+# Innermost, so replayed responses still get CORS headers and compression for the retrying client.
+app.add_middleware(IdempotencyMiddleware)
+# Inside CORS, so 429s carry Access-Control-Allow-Origin and preflights are answered before it.
+app.add_middleware(ratelimit.RateLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -98,7 +171,37 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+app.add_middleware(CompressionMiddleware)
+if read_engine is not engine:
+    app.add_middleware(ReadPrimaryAfterWriteMiddleware)
+
+DB_ENGINES = {"primary": engine, "primary_async": async_engine.sync_engine}
+if read_engine is not engine:
+    DB_ENGINES.update({"replica": read_engine, "replica_async": async_read_engine.sync_engine})
+
+
+def _observe_request(scope, status: int, seconds: float, stats) -> None:
+    # Unmatched paths share one label so scanners cannot blow up the series count.
+    route = getattr(scope.get("route"), "path", None) or "unmatched"
+    observe_request(scope["method"], route, status, seconds, stats)
+
+
+app.add_middleware(RequestTimingMiddleware, observe=_observe_request)
+
+STATIC_DIR = Path(__file__).parent / "static"
+# Served from memory, precompressed once at startup.
+STATIC_ASSETS = load_static_assets(
+    STATIC_DIR,
+    {
+        "docs.html": "text/html; charset=utf-8",
+        "docs.css": "text/css; charset=utf-8",
+        "favicon.svg": "image/svg+xml",
+    },
+)
+
+app.mount(
+    "/static", CachedStaticFiles(directory="app/static", assets=STATIC_ASSETS), name="static"
+)
 
 ALLOWED_ROLES = {
     "admin",
@@ -110,6 +213,10 @@ ALLOWED_ROLES = {
 
 PORTAL_TOKEN_SECRET = os.environ.get("PORTAL_TOKEN_SECRET", "dev-secret")
 PORTAL_TOKEN_TTL_HOURS = int(os.environ.get("PORTAL_TOKEN_TTL_HOURS", "336"))
+# 0 keeps "no-cache": browsers and proxies store the view but revalidate it with its ETag.
+PORTAL_VIEW_MAX_AGE = int(os.environ.get("PORTAL_VIEW_MAX_AGE", "0"))
+PROPERTY_SECTIONS = ("contract", "documents", "work_orders")
+PROCESSING_STAGES = ("queue_wait", "extract", "prepare", "llm", "persist", "total")
 
 
 def _valid_cell_number(value: str) -> bool:
@@ -170,6 +277,11 @@ def _portal_token_expires_at() -> datetime:
     return datetime.now(timezone.utc) + timedelta(hours=PORTAL_TOKEN_TTL_HOURS)
 
 
+def _extras_text(column, key: str):
+    # Render the key inline so the expression matches the ``(extras ->> 'key')`` indexes.
+    return column.op("->>", return_type=String)(literal(key, literal_execute=True))
+
+
 def _latest_proof(db: Session, work_order_id: int) -> WorkOrderProof | None:
     return (
         db.execute(
@@ -196,25 +308,42 @@ def _delete_work_order(db: Session, work_order_id: int) -> None:
     db.execute(delete(WorkOrder).where(WorkOrder.id == work_order_id))
 
 
-def _get_portal_token(db: Session, token: str) -> WorkOrderToken:
+async def _get_portal_token(db: AsyncSession, token: str) -> WorkOrderToken:
     token_hash = _hash_portal_token(token)
-    row = db.execute(
+    await _reject_known_invalid_token(token_hash)
+    row = (await db.execute(
         select(WorkOrderToken).where(WorkOrderToken.token_hash == token_hash)
-    ).scalar_one_or_none()
+    )).scalar_one_or_none()
+    if row is None:
+        await ratelimit.remember_invalid_token(token_hash)
+    return _check_portal_token(row)
+
+
+async def _reject_known_invalid_token(token_hash: str) -> None:
+    # Tokens are random and never reissued, so an unknown hash stays unknown.
+    if await ratelimit.is_invalid_token(token_hash):
+        raise HTTPException(status_code=404, detail="invalid_token")
+
+
+def _check_portal_token(row: WorkOrderToken | None) -> WorkOrderToken:
     if row is None:
         raise HTTPException(status_code=404, detail="invalid_token")
     if not row.is_active:
         raise HTTPException(status_code=403, detail="token_inactive")
-    if row.expires_at < datetime.now(timezone.utc):
-        raise HTTPException(status_code=403, detail="token_expired")
+    _check_portal_token_expiry(row.expires_at)
     return row
 
 
+def _check_portal_token_expiry(expires_at: datetime) -> None:
+    if expires_at < datetime.now(timezone.utc):
+        raise HTTPException(status_code=403, detail="token_expired")
+
+
 def _work_order_summary(work_order: WorkOrder, prop: Property | None) -> dict:
     extras = dict(work_order.extras or {})
     if prop:
-        extras["property_tag"] = prop.extras.get("tag") or prop.extras.get("label")
-        extras["property_address"] = prop.extras.get("property_address")
+        extras["property_tag"] = prop.tag
+        extras["property_address"] = prop.property_address
     return {
         "id": work_order.id,
         "property_id": work_order.property_id,
@@ -232,6 +361,75 @@ def _work_order_summary(work_order: WorkOrder, prop: Property | None) -> dict:
     }
 
 
+def _work_order_list_query():
+    """Work order list projection joined with the property columns it displays."""
+    return select(
+        WorkOrder.id,
+        WorkOrder.property_id,
+        WorkOrder.type,
+        WorkOrder.status,
+        WorkOrder.title,
+        WorkOrder.offer_amount,
+        WorkOrder.approved_amount,
+        WorkOrder.assigned_interest_id,
+        WorkOrder.created_at,
+        WorkOrder.updated_at,
+        Property.tag.label("property_tag"),
+        Property.property_address.label("property_address"),
+    ).join(Property, Property.id == WorkOrder.property_id)
+
+
+def _work_order_list_items(rows) -> list[dict]:
+    items = []
+    for row in rows:
+        item = dict(row)
+        item["extras"] = {
+            "property_tag": item.pop("property_tag"),
+            "property_address": item.pop("property_address"),
+        }
+        items.append(item)
+    return items
+
+
+def _work_order_children(model, schema):
+    """Correlated jsonb_agg of a work order child table, limited to the schema's fields."""
+    pairs = []
+    for key in schema.model_fields:
+        pairs.extend([literal(key), getattr(model, key)])
+    rows = func.jsonb_agg(aggregate_order_by(func.jsonb_build_object(*pairs), model.id))
+    return (
+        select(func.coalesce(rows, literal_column("'[]'::jsonb")))
+        .where(model.work_order_id == WorkOrder.id)
+        .scalar_subquery()
+    )
+
+
+async def _fieldset_response(
+    db: AsyncSession, stmt, fields: str, schema, model, extras=None, extras_columns=None
+) -> Response:
+    """Serve ``?fields=`` for a list endpoint: same shape, only the requested keys."""
+    columns = {name: getattr(model, name) for name in schema.model_fields if name != "extras"}
+    fieldset = parse_fields(fields, columns, extras=extras, extras_columns=extras_columns)
+    if fieldset is None:
+        raise HTTPException(status_code=422, detail="invalid_fields")
+    rows = (await db.execute(fieldset_statement(stmt, fieldset))).scalars().all()
+    return Response(content=json_array(rows), media_type="application/json")
+
+
+def _etag_response(
+    request: Request,
+    body: str,
+    etag: str | None = None,
+    cache_control: str = "private, no-cache",
+) -> Response:
+    """Serve a JSON body with a weak ETag, answering 304 when the client copy is current."""
+    etag = etag or weak_etag(body.encode("utf-8"))
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 def _portal_allowed_action(token_row: WorkOrderToken, work_order: WorkOrder) -> str:
     if work_order.status in {"closed", "canceled"}:
         return "read_only"
@@ -255,6 +453,84 @@ def _portal_allowed_action(token_row: WorkOrderToken, work_order: WorkOrder) ->
     return "read_only"
 
 
+def _render_portal_view(db: Session, token_row: WorkOrderToken) -> str | None:
+    work_order = db.get(WorkOrder, token_row.work_order_id)
+    if work_order is None:
+        return None
+    prop = db.get(Property, work_order.property_id)
+    view = _work_order_summary(work_order, prop)
+    view["property_address_full"] = prop.property_address if prop else None
+
+    quote = None
+    if token_row.quote_id:
+        q = db.get(WorkOrderQuote, token_row.quote_id)
+        if q:
+            quote = {
+                "id": q.id,
+                "provider_name": q.provider_name,
+                "provider_phone": q.provider_phone,
+                "lines": q.lines,
+                "total_amount": float(q.total_amount),
+                "status": q.status,
+            }
+    interest = None
+    if token_row.interest_id:
+        i = db.get(WorkOrderInterest, token_row.interest_id)
+        if i:
+            interest = {
+                "id": i.id,
+                "provider_name": i.provider_name,
+                "provider_phone": i.provider_phone,
+                "status": i.status,
+            }
+    return WorkOrderPortalView(
+        work_order=view,
+        allowed_action=_portal_allowed_action(token_row, work_order),
+        quote=quote,
+        interest=interest,
+    ).model_dump_json()
+
+
+def _store_portal_snapshot(db: Session, token_row: WorkOrderToken) -> tuple[str, str] | None:
+    """Render and upsert a token's portal view; the version only moves when the body changes."""
+    body = _render_portal_view(db, token_row)
+    if body is None:
+        return None
+    etag = weak_etag(body.encode("utf-8"))
+    stmt = pg_insert(WorkOrderPortalSnapshot).values(
+        token_id=token_row.id,
+        work_order_id=token_row.work_order_id,
+        body=body,
+        etag=etag,
+        updated_at=datetime.now(timezone.utc),
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[WorkOrderPortalSnapshot.token_id],
+            set_={
+                "body": stmt.excluded.body,
+                "etag": stmt.excluded.etag,
+                "version": WorkOrderPortalSnapshot.version + 1,
+                "updated_at": stmt.excluded.updated_at,
+            },
+            where=WorkOrderPortalSnapshot.etag != stmt.excluded.etag,
+        )
+    )
+    return body, etag
+
+
+def _refresh_portal_snapshots(db: Session, work_order_id: int) -> None:
+    """Re-render the portal views of a work order's active tokens before the change commits."""
+    db.flush()
+    tokens = db.execute(
+        select(WorkOrderToken).where(
+            WorkOrderToken.work_order_id == work_order_id, WorkOrderToken.is_active.is_(True)
+        )
+    ).scalars().all()
+    for token_row in tokens:
+        _store_portal_snapshot(db, token_row)
+
+
 def _upload_photo(file: UploadFile) -> dict:
     upload_dir = get_upload_dir()
     suffix = ""
@@ -459,16 +735,21 @@ def healthcheck() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    observe_pools(DB_ENGINES)
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 @app.get("/docs", include_in_schema=False)
-def custom_docs() -> HTMLResponse:
-    docs_path = Path(__file__).parent / "static" / "docs.html"
-    return HTMLResponse(docs_path.read_text(encoding="utf-8"))
+def custom_docs(request: Request) -> Response:
+    return STATIC_ASSETS["docs.html"].response(request.headers)
 
 
 @app.get("/favicon.ico", include_in_schema=False)
-def favicon() -> FileResponse:
-    icon_path = Path(__file__).parent / "static" / "favicon.svg"
-    return FileResponse(icon_path, media_type="image/svg+xml")
+def favicon(request: Request) -> Response:
+    return STATIC_ASSETS["favicon.svg"].response(request.headers)
 
 
 @app.get("/swagger", include_in_schema=False)
@@ -552,8 +833,15 @@ def me(user: User | None = Depends(get_optional_user)) -> AuthMeResponse:
 
 
 @app.get("/users", response_model=list[UserOut])
-def list_users(_: User = Depends(require_admin), db: Session = Depends(get_db)) -> list[UserOut]:
-    return db.execute(select(User)).scalars().all()
+async def list_users(
+    fields: str | None = None,
+    _: User = Depends(require_admin_async),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> list[UserOut]:
+    stmt = select(User)
+    if fields:
+        return await _fieldset_response(db, stmt, fields, UserOut, User, extras=User.extras)
+    return (await db.execute(stmt)).scalars().all()
 
 
 @app.get("/real-estates", response_model=list[UserOut])
@@ -672,20 +960,40 @@ def update_user(
 
 
 @app.get("/properties", response_model=list[PropertyOut])
-def list_properties(
-    user: User = Depends(get_current_user), db: Session = Depends(get_db)
+async def list_properties(
+    tag: str | None = None,
+    fields: str | None = None,
+    user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_read_db),
 ) -> list[PropertyOut]:
     stmt = select(Property)
     if user.role != "admin":
         stmt = stmt.where(Property.owner_user_id == user.id)
-    return db.execute(stmt).scalars().all()
+    if tag:
+        stmt = stmt.where(Property.tag == tag)
+    if fields:
+        return await _fieldset_response(
+            db,
+            stmt,
+            fields,
+            PropertyOut,
+            Property,
+            extras=Property.extras,
+            extras_columns={"tag": Property.tag, "property_address": Property.property_address},
+        )
+    if is_fast_json():
+        rows = (await db.execute(
+            stmt.with_only_columns(Property.id, Property.owner_user_id, Property.extras)
+        )).mappings().all()
+        return json_rows_response([dict(row) for row in rows])
+    return (await db.execute(stmt)).scalars().all()
 
 
 @app.get("/properties/{property_id}/summary")
 def property_summary(
     property_id: int,
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> dict:
     prop = db.get(Property, property_id)
     if prop is None:
@@ -697,6 +1005,68 @@ def property_summary(
     return {"summary": summary}
 
 
+@app.get("/properties/{property_id}", response_model=PropertyDetail)
+def get_property(
+    property_id: int,
+    include: str | None = None,
+    documents_limit: int = 20,
+    documents_offset: int = 0,
+    work_orders_limit: int = 20,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+) -> PropertyDetail:
+    sections = set(PROPERTY_SECTIONS)
+    if include is not None:
+        sections = {item.strip() for item in include.split(",") if item.strip()}
+        if not sections <= set(PROPERTY_SECTIONS):
+            raise HTTPException(status_code=422, detail="invalid_include")
+    for limit in (documents_limit, work_orders_limit):
+        if limit < 1 or limit > 100:
+            raise HTTPException(status_code=422, detail="invalid_limit")
+    if documents_offset < 0:
+        raise HTTPException(status_code=422, detail="invalid_offset")
+    prop = db.get(Property, property_id)
+    if prop is None:
+        raise HTTPException(status_code=404, detail="not_found")
+    if user.role != "admin" and prop.owner_user_id != user.id:
+        raise HTTPException(status_code=403, detail="forbidden_owner")
+
+    detail = PropertyDetail(property=PropertyOut.model_validate(prop, from_attributes=True))
+    if "contract" in sections:
+        contract = db.execute(
+            select(PropertyContract).where(PropertyContract.property_id == property_id)
+        ).scalar_one_or_none()
+        if contract is not None:
+            detail.contract = {
+                column.key: getattr(contract, column.key)
+                for column in PropertyContract.__mapper__.column_attrs
+            }
+    if "documents" in sections:
+        docs = db.execute(
+            select(Document)
+            .where(Document.property_id == property_id)
+            .order_by(Document.id.desc())
+            .limit(documents_limit + 1)
+            .offset(documents_offset)
+        ).scalars().all()
+        detail.documents = [
+            DocumentOut.model_validate(doc, from_attributes=True) for doc in docs[:documents_limit]
+        ]
+        detail.documents_has_more = len(docs) > documents_limit
+    if "work_orders" in sections:
+        rows = db.execute(
+            _work_order_list_query()
+            .where(WorkOrder.property_id == property_id)
+            .order_by(WorkOrder.id.desc())
+            .limit(work_orders_limit + 1)
+        ).mappings().all()
+        detail.work_orders = [
+            WorkOrderListItem(**item) for item in _work_order_list_items(rows[:work_orders_limit])
+        ]
+        detail.work_orders_has_more = len(rows) > work_orders_limit
+    return detail
+
+
 @app.post("/properties", response_model=PropertyOut, status_code=201)
 def create_property(
     payload: PropertyCreate, user: User = Depends(get_current_user), db: Session = Depends(get_db)
@@ -800,15 +1170,21 @@ def update_property(
         _sync_property_contract(db, prop, extras)
     else:
         _sync_property_contract(db, prop, prop.extras or {})
-    db.commit()
-    db.refresh(prop)
     _log_activity(
         db,
         "property_updated",
         {"property_id": prop.id, "owner_user_id": prop.owner_user_id},
         user_id=user.id,
     )
+    # Portal views show the property tag and address; they commit together with the change.
+    work_order_ids = (
+        db.execute(select(WorkOrder.id).where(WorkOrder.property_id == prop.id)).scalars().all()
+    )
+    for work_order_id in work_order_ids:
+        _refresh_portal_snapshots(db, work_order_id)
     db.commit()
+    db.refresh(prop)
+    portal_cache.invalidate(*work_order_ids)
     return prop
 
 
@@ -837,6 +1213,14 @@ def delete_property(
         .all()
     )
     if doc_ids:
+        extraction_ids = select(DocumentExtraction.id).where(
+            DocumentExtraction.document_id.in_(doc_ids)
+        )
+        db.execute(
+            delete(DocumentExtractionText).where(
+                DocumentExtractionText.extraction_id.in_(extraction_ids)
+            )
+        )
         db.execute(
             delete(DocumentExtraction).where(DocumentExtraction.document_id.in_(doc_ids))
         )
@@ -855,6 +1239,7 @@ def delete_property(
         db.execute(delete(WorkOrder).where(WorkOrder.id.in_(work_order_ids)))
     db.delete(prop)
     db.commit()
+    portal_cache.invalidate(*work_order_ids)
     return Response(status_code=204)
 
 
@@ -993,47 +1378,132 @@ def upload_property_photos(
 
 
 @app.get("/documents", response_model=list[DocumentOut])
-def list_documents(
+async def list_documents(
     property_id: int | None = None,
     status: str | None = None,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    kind: str | None = None,
+    fields: str | None = None,
+    user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_read_db),
 ) -> list[DocumentOut]:
     stmt = select(Document)
     if property_id is not None:
-        prop = db.get(Property, property_id)
+        prop = await db.get(Property, property_id)
         if prop is None:
             raise HTTPException(status_code=404, detail="property_not_found")
         if user.role != "admin" and prop.owner_user_id != user.id:
             raise HTTPException(status_code=403, detail="forbidden_owner")
         stmt = stmt.where(Document.property_id == property_id)
     elif user.role != "admin":
-        owned_ids = (
-            db.execute(select(Property.id).where(Property.owner_user_id == user.id))
-            .scalars()
-            .all()
-        )
-        if not owned_ids:
-            return []
-        stmt = stmt.where(Document.property_id.in_(owned_ids))
+        stmt = stmt.where(Document.property_id.in_(owned_property_ids(user)))
     if status:
-        stmt = stmt.where(Document.extras["status"].astext == status)
-    docs = db.execute(stmt).scalars().all()
-    for doc in docs:
+        stmt = stmt.where(Document.status == status)
+    if kind:
+        stmt = stmt.where(_extras_text(Document.extras, "kind") == kind)
+    if fields:
+        owner_name = (
+            select(User.name)
+            .join(Property, Property.owner_user_id == User.id)
+            .where(Property.id == Document.property_id)
+            .scalar_subquery()
+        )
+        property_tag = (
+            select(Property.tag).where(Property.id == Document.property_id).scalar_subquery()
+        )
+        return await _fieldset_response(
+            db,
+            stmt,
+            fields,
+            DocumentOut,
+            Document,
+            extras=Document.extras,
+            extras_columns={
+                "status": Document.status,
+                "name": Document.name,
+                "path": Document.path,
+                "doc_type": Document.doc_type,
+                "owner_name": owner_name,
+                "property_tag": property_tag,
+            },
+        )
+    rows = (
+        await db.execute(
+            stmt.add_columns(
+                Property.id.label("joined_property_id"),
+                Property.tag.label("property_tag"),
+                User.name.label("owner_name"),
+            )
+            .outerjoin(Property, Property.id == Document.property_id)
+            .outerjoin(User, User.id == Property.owner_user_id)
+        )
+    ).all()
+    docs = []
+    for row in rows:
+        doc = row.Document
         extras = dict(doc.extras or {})
-        prop = db.get(Property, doc.property_id) if doc.property_id else None
-        if prop:
-            owner = db.get(User, prop.owner_user_id)
-            extras["owner_name"] = owner.name if owner else None
-            extras["property_tag"] = prop.extras.get("tag") or prop.extras.get("label")
+        if row.joined_property_id is not None:
+            extras["owner_name"] = row.owner_name
+            extras["property_tag"] = row.property_tag
         doc.extras = extras
+        docs.append(doc)
+    if is_fast_json():
+        return json_rows_response(
+            [{"id": doc.id, "property_id": doc.property_id, "extras": doc.extras} for doc in docs]
+        )
     return docs
 
 
+@app.get("/search", response_model=SearchResponse)
+def search(
+    q: str,
+    types: str | None = None,
+    limit: int = 20,
+    offset: int = 0,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+) -> SearchResponse:
+    if limit < 1 or limit > 100:
+        raise HTTPException(status_code=422, detail="invalid_limit")
+    if offset < 0:
+        raise HTTPException(status_code=422, detail="invalid_offset")
+    selected = list(SEARCH_TYPES)
+    if types:
+        selected = [item.strip() for item in types.split(",") if item.strip()]
+    if any(item not in SEARCH_TYPES for item in selected):
+        raise HTTPException(status_code=422, detail="invalid_search_type")
+    hits, has_more = unified_search(db, user, q, selected, limit, offset)
+    return SearchResponse(query=q, hits=hits, limit=limit, offset=offset, has_more=has_more)
+
+
+@app.get("/documents/search", response_model=DocumentSearchResponse)
+def search_document_text(
+    q: str,
+    property_id: int | None = None,
+    limit: int = 20,
+    offset: int = 0,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+) -> DocumentSearchResponse:
+    if limit < 1 or limit > 100:
+        raise HTTPException(status_code=422, detail="invalid_limit")
+    if offset < 0:
+        raise HTTPException(status_code=422, detail="invalid_offset")
+    if property_id is not None:
+        prop = db.get(Property, property_id)
+        if prop is None:
+            raise HTTPException(status_code=404, detail="property_not_found")
+        if user.role != "admin" and prop.owner_user_id != user.id:
+            raise HTTPException(status_code=403, detail="forbidden_owner")
+    hits, has_more = search_documents(db, user, q, property_id, limit, offset)
+    return DocumentSearchResponse(
+        query=q, hits=hits, limit=limit, offset=offset, has_more=has_more
+    )
+
+
 @app.get("/activity-log", response_model=list[ActivityLogOut])
 def list_activity_log(
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> list[ActivityLogOut]:
     stmt = select(ActivityLog).order_by(ActivityLog.id.desc()).limit(200)
     if user.role != "admin":
@@ -1044,7 +1514,7 @@ def list_activity_log(
 @app.get("/event-logs", response_model=list[DomainEventOut])
 def list_domain_events(
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> list[DomainEventOut]:
     stmt = select(DomainEvent).order_by(DomainEvent.id.desc()).limit(200)
     if user.role != "admin":
@@ -1052,6 +1522,68 @@ def list_domain_events(
     return db.execute(stmt).scalars().all()
 
 
+@app.get("/admin/db-pool")
+def db_pool_status(_: User = Depends(require_admin)) -> dict:
+    pools = {name: pool_stats(db_engine) for name, db_engine in DB_ENGINES.items()}
+    if read_engine is not engine:
+        pools["replica_routing"] = replica.status()
+    return pools
+
+
+@app.get("/admin/processing-timings", response_model=ProcessingTimingsResponse)
+def processing_timings(
+    hours: int = 24,
+    _: User = Depends(require_admin),
+    db: Session = Depends(get_read_db),
+) -> ProcessingTimingsResponse:
+    if hours < 1 or hours > 24 * 30:
+        raise HTTPException(status_code=422, detail="invalid_window")
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    timing = DocumentProcessingTiming
+    percentiles = []
+    for stage in PROCESSING_STAGES:
+        column = getattr(timing, f"{stage}_ms")
+        percentiles.extend(
+            [
+                func.percentile_cont(0.5).within_group(column).label(f"{stage}_p50"),
+                func.percentile_cont(0.95).within_group(column).label(f"{stage}_p95"),
+            ]
+        )
+    # ROLLUP adds the all-types row; grouping() tells it apart from a null doc_type.
+    rows = db.execute(
+        select(
+            timing.doc_type,
+            func.grouping(timing.doc_type).label("is_total"),
+            func.count().label("jobs"),
+            func.coalesce(func.sum(timing.input_tokens), 0).label("input_tokens"),
+            func.coalesce(func.sum(timing.output_tokens), 0).label("output_tokens"),
+            func.coalesce(func.sum(timing.cost_usd), 0).label("cost_usd"),
+            *percentiles,
+        )
+        .where(timing.created_at >= since)
+        .group_by(func.rollup(timing.doc_type))
+        .order_by(literal_column("is_total").desc(), func.count().desc())
+    ).mappings().all()
+    groups = [
+        ProcessingTimingGroup(
+            doc_type="all" if row["is_total"] else row["doc_type"] or "unknown",
+            jobs=row["jobs"],
+            input_tokens=row["input_tokens"],
+            output_tokens=row["output_tokens"],
+            cost_usd=float(row["cost_usd"]),
+            stages={
+                stage: StageTiming(
+                    p50_ms=row[f"{stage}_p50"], p95_ms=row[f"{stage}_p95"]
+                )
+                for stage in PROCESSING_STAGES
+            },
+        )
+        for row in rows
+        if row["jobs"]
+    ]
+    return ProcessingTimingsResponse(hours=hours, since=since, groups=groups)
+
+
 @app.get("/documents/{document_id}/download", include_in_schema=False)
 def download_document(
     document_id: int,
@@ -1066,23 +1598,30 @@ def download_document(
         raise HTTPException(status_code=404, detail="property_not_found")
     if user.role != "admin" and prop.owner_user_id != user.id:
         raise HTTPException(status_code=403, detail="forbidden_owner")
-    file_path = doc.extras.get("path") if doc.extras else None
-    if not file_path or not Path(file_path).exists():
+    if not doc.path or not Path(doc.path).exists():
         raise HTTPException(status_code=404, detail="file_missing")
-    filename = doc.extras.get("name") if doc.extras else None
-    return FileResponse(file_path, filename=filename)
+    return FileResponse(doc.path, filename=doc.name)
 
 
 @app.get("/documents/{document_id}/extraction", response_model=DocumentExtractionOut)
 def get_document_extraction(
-    document_id: int, _: User = Depends(get_current_user), db: Session = Depends(get_db)
+    document_id: int,
+    include_text: bool = False,
+    _: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ) -> DocumentExtractionOut:
     extraction = db.execute(
         select(DocumentExtraction).where(DocumentExtraction.document_id == document_id)
     ).scalar_one_or_none()
     if extraction is None:
         raise HTTPException(status_code=404, detail="not_found")
-    return extraction
+    if not include_text:
+        return extraction
+    return DocumentExtractionOut(
+        id=extraction.id,
+        document_id=extraction.document_id,
+        extras={**(extraction.extras or {}), "text": load_extraction_text(db, extraction.id)},
+    )
 
 
 @app.put("/documents/{document_id}/review", response_model=DocumentOut)
@@ -1100,10 +1639,15 @@ def review_document(
     ).scalar_one_or_none()
     if extraction is None:
         raise HTTPException(status_code=404, detail="extraction_not_found")
-    extraction.extras = payload.extraction
-    extras = dict(doc.extras or {})
-    extras["status"] = "confirmed"
-    doc.extras = extras
+    extras = dict(payload.extraction)
+    # Raw text lives in the compressed store; only touch it when the reviewer sent a change.
+    new_text = extras.pop("text", None)
+    if new_text is not None and new_text != load_extraction_text(db, extraction.id):
+        save_extraction_text(db, extraction.id, new_text)
+        extras["text_chars"] = len(new_text)
+        extraction.search_vector = document_vector(doc.name, new_text)
+    extraction.extras = extras
+    db.execute(document_update(document_id, status="confirmed"))
     _log_activity(
         db,
         "document_review_confirmed",
@@ -1121,9 +1665,7 @@ def process_document(
     doc = db.get(Document, document_id)
     if doc is None:
         raise HTTPException(status_code=404, detail="not_found")
-    extras = dict(doc.extras or {})
-    extras["status"] = "queued"
-    doc.extras = extras
+    db.execute(document_update(document_id, status="queued"))
     db.commit()
     try:
         if is_inline_mode():
@@ -1136,10 +1678,10 @@ def process_document(
     _log_activity(
         db,
         "document_process_requested",
-        {"document_id": document_id, "status": doc.extras.get("status", "")},
+        {"document_id": document_id, "status": doc.status or ""},
     )
     db.commit()
-    return DocumentProcessResponse(id=doc.id, status=doc.extras.get("status", ""))
+    return DocumentProcessResponse(id=doc.id, status=doc.status or "")
 
 
 @app.post("/work-orders", response_model=WorkOrderCreateResponse, status_code=201)
@@ -1192,6 +1734,7 @@ def create_work_order(
         {"work_order_id": work_order.id, "property_id": work_order.property_id},
         user_id=user.id,
     )
+    _refresh_portal_snapshots(db, work_order.id)
     db.commit()
     db.refresh(token)
 
@@ -1202,16 +1745,17 @@ def create_work_order(
     )
 
 
-@app.get("/work-orders", response_model=list[WorkOrderOut])
-def list_work_orders(
+@app.get("/work-orders", response_model=list[WorkOrderListItem])
+async def list_work_orders(
     property_id: int | None = None,
     status: str | None = None,
     type: str | None = None,
     search: str | None = None,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> list[WorkOrderOut]:
-    stmt = select(WorkOrder)
+    fields: str | None = None,
+    user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> list[WorkOrderListItem]:
+    stmt = _work_order_list_query()
     if property_id is not None:
         stmt = stmt.where(WorkOrder.property_id == property_id)
     if status:
@@ -1219,87 +1763,66 @@ def list_work_orders(
     if type:
         stmt = stmt.where(WorkOrder.type == type)
     if search:
-        stmt = stmt.where(
-            or_(
-                WorkOrder.title.ilike(f"%{search}%"),
-                WorkOrder.description.ilike(f"%{search}%"),
-            )
-        )
-    if user.role != "admin":
-        owned_ids = (
-            db.execute(select(Property.id).where(Property.owner_user_id == user.id))
-            .scalars()
-            .all()
-        )
-        if not owned_ids:
+        search_query = prefix_tsquery(search)
+        if search_query is None:
+            # Nothing searchable (e.g. only punctuation) matches no work order.
             return []
-        stmt = stmt.where(WorkOrder.property_id.in_(owned_ids))
+        stmt = stmt.where(matches(WorkOrder.search_vector, search_query))
+    if user.role != "admin":
+        stmt = stmt.where(Property.owner_user_id == user.id)
 
-    work_orders = db.execute(stmt.order_by(WorkOrder.id.desc())).scalars().all()
-    for item in work_orders:
-        prop = db.get(Property, item.property_id)
-        extras = dict(item.extras or {})
-        if prop:
-            extras["property_tag"] = prop.extras.get("tag") or prop.extras.get("label")
-            extras["property_address"] = prop.extras.get("property_address")
-        item.extras = extras
-    return work_orders
+    stmt = stmt.order_by(WorkOrder.id.desc())
+    if fields:
+        return await _fieldset_response(
+            db,
+            stmt,
+            fields,
+            WorkOrderListItem,
+            WorkOrder,
+            extras_columns={
+                "property_tag": Property.tag,
+                "property_address": Property.property_address,
+            },
+        )
+    rows = (await db.execute(stmt)).mappings().all()
+    if is_fast_json():
+        return json_rows_response(_work_order_list_items(rows))
+    return _work_order_list_items(rows)
 
 
-@app.get("/work-orders/{work_order_id}")
-def get_work_order(
+@app.get("/work-orders/{work_order_id}", response_model=WorkOrderDetail)
+async def get_work_order(
     work_order_id: int,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> dict:
-    work_order = db.get(WorkOrder, work_order_id)
-    if work_order is None:
+    request: Request,
+    user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> Response:
+    row = (await db.execute(
+        select(
+            WorkOrder,
+            Property,
+            _work_order_children(WorkOrderQuote, WorkOrderQuoteOut).label("quotes"),
+            _work_order_children(WorkOrderInterest, WorkOrderInterestOut).label("interests"),
+            _work_order_children(WorkOrderProof, WorkOrderProofOut).label("proofs"),
+            _work_order_children(WorkOrderToken, WorkOrderTokenOut).label("tokens"),
+        )
+        .outerjoin(Property, Property.id == WorkOrder.property_id)
+        .where(WorkOrder.id == work_order_id)
+    )).one_or_none()
+    if row is None:
         raise HTTPException(status_code=404, detail="not_found")
-    prop = db.get(Property, work_order.property_id)
+    work_order, prop = row.WorkOrder, row.Property
     if user.role != "admin" and prop and prop.owner_user_id != user.id:
         raise HTTPException(status_code=403, detail="forbidden_owner")
-    summary = _work_order_summary(work_order, prop)
-
-    quotes = db.execute(
-        select(WorkOrderQuote).where(WorkOrderQuote.work_order_id == work_order_id)
-    ).scalars().all()
-    interests = db.execute(
-        select(WorkOrderInterest).where(WorkOrderInterest.work_order_id == work_order_id)
-    ).scalars().all()
-    proofs = db.execute(
-        select(WorkOrderProof).where(WorkOrderProof.work_order_id == work_order_id)
-    ).scalars().all()
-    tokens = db.execute(
-        select(WorkOrderToken).where(WorkOrderToken.work_order_id == work_order_id)
-    ).scalars().all()
-
-    def _serialize_row(row) -> dict:
-        data = row.__dict__.copy()
-        data.pop("_sa_instance_state", None)
-        for key, value in data.items():
-            if isinstance(value, datetime):
-                data[key] = value.isoformat()
-        return data
 
-    return {
-        "work_order": summary,
-        "quotes": [_serialize_row(q) for q in quotes],
-        "interests": [_serialize_row(i) for i in interests],
-        "proofs": [_serialize_row(p) for p in proofs],
-        "tokens": [
-            {
-                "id": t.id,
-                "scope": t.scope,
-                "expires_at": t.expires_at.isoformat(),
-                "quote_id": t.quote_id,
-                "interest_id": t.interest_id,
-                "is_active": t.is_active,
-                "used_at": t.used_at.isoformat() if t.used_at else None,
-                "created_at": t.created_at.isoformat(),
-            }
-            for t in tokens
-        ],
-    }
+    detail = WorkOrderDetail(
+        work_order=_work_order_summary(work_order, prop),
+        quotes=row.quotes,
+        interests=row.interests,
+        proofs=row.proofs,
+        tokens=row.tokens,
+    )
+    return _etag_response(request, detail.model_dump_json())
 
 
 @app.post("/work-orders/{work_order_id}/approve-quote/{quote_id}")
@@ -1333,7 +1856,9 @@ def approve_work_order_quote(
         "quote_approved",
         {"work_order_id": work_order_id, "quote_id": quote_id},
     )
+    _refresh_portal_snapshots(db, work_order_id)
     db.commit()
+    portal_cache.invalidate(work_order_id)
     return {"status": "ok"}
 
 
@@ -1390,7 +1915,9 @@ def select_work_order_interest(
         "provider_selected",
         {"work_order_id": work_order_id, "interest_id": interest_id},
     )
+    _refresh_portal_snapshots(db, work_order_id)
     db.commit()
+    portal_cache.invalidate(work_order_id)
     return {"status": "ok", "portal_link": f"/p/wo/{token_value}"}
 
 
@@ -1414,7 +1941,9 @@ def request_work_order_rework(
         "work_order_rework_requested",
         {"work_order_id": work_order_id, "proof_id": proof.id},
     )
+    _refresh_portal_snapshots(db, work_order_id)
     db.commit()
+    portal_cache.invalidate(work_order_id)
     return {"status": "ok"}
 
 
@@ -1445,7 +1974,9 @@ def approve_work_order_proof(
         {"work_order_id": work_order_id, "proof_id": proof.id},
         user_id=user.id,
     )
+    _refresh_portal_snapshots(db, work_order_id)
     db.commit()
+    portal_cache.invalidate(work_order_id)
     return {"status": "ok"}
 
 
@@ -1470,7 +2001,9 @@ def cancel_work_order(
         "work_order_canceled",
         {"work_order_id": work_order_id},
     )
+    _refresh_portal_snapshots(db, work_order_id)
     db.commit()
+    portal_cache.invalidate(work_order_id)
     return {"status": "ok"}
 
 
@@ -1491,58 +2024,54 @@ def delete_work_order(
         user_id=user.id,
     )
     db.commit()
+    portal_cache.invalidate(work_order_id)
     return {"status": "deleted", "id": work_order_id}
 
 
 @app.get("/portal/work-orders/{token}", response_model=WorkOrderPortalView)
-def get_portal_work_order(token: str, db: Session = Depends(get_db)) -> WorkOrderPortalView:
-    token_row = _get_portal_token(db, token)
-    work_order = db.get(WorkOrder, token_row.work_order_id)
-    if work_order is None:
-        raise HTTPException(status_code=404, detail="not_found")
-    prop = db.get(Property, work_order.property_id)
-    allowed_action = _portal_allowed_action(token_row, work_order)
-    view = _work_order_summary(work_order, prop)
-    view["property_address_full"] = prop.extras.get("property_address") if prop else None
-
-    quote = None
-    if token_row.quote_id:
-        q = db.get(WorkOrderQuote, token_row.quote_id)
-        if q:
-            quote = {
-                "id": q.id,
-                "provider_name": q.provider_name,
-                "provider_phone": q.provider_phone,
-                "lines": q.lines,
-                "total_amount": float(q.total_amount),
-                "status": q.status,
-            }
-    interest = None
-    if token_row.interest_id:
-        i = db.get(WorkOrderInterest, token_row.interest_id)
-        if i:
-            interest = {
-                "id": i.id,
-                "provider_name": i.provider_name,
-                "provider_phone": i.provider_phone,
-                "status": i.status,
-            }
-    return WorkOrderPortalView(
-        work_order=view,
-        allowed_action=allowed_action,
-        quote=quote,
-        interest=interest,
-    )
+async def get_portal_work_order(
+    token: str, request: Request, db: AsyncSession = Depends(get_async_db)
+) -> Response:
+    token_hash = _hash_portal_token(token)
+    cached = await portal_cache.load(token_hash)
+    if cached is not None:
+        _check_portal_token_expiry(datetime.fromisoformat(cached["expires_at"]))
+    else:
+        await _reject_known_invalid_token(token_hash)
+        row = (await db.execute(
+            select(WorkOrderToken, WorkOrderPortalSnapshot.body, WorkOrderPortalSnapshot.etag)
+            .outerjoin(
+                WorkOrderPortalSnapshot, WorkOrderPortalSnapshot.token_id == WorkOrderToken.id
+            )
+            .where(WorkOrderToken.token_hash == token_hash)
+        )).one_or_none()
+        if row is None:
+            await ratelimit.remember_invalid_token(token_hash)
+        token_row = _check_portal_token(row.WorkOrderToken if row else None)
+        body, etag = row.body, row.etag
+        if body is None:
+            snapshot = await db.run_sync(_store_portal_snapshot, token_row)
+            if snapshot is None:
+                raise HTTPException(status_code=404, detail="not_found")
+            await db.commit()
+            body, etag = snapshot
+        # Only active tokens are cached; deactivating one always invalidates its work order.
+        cached = {"expires_at": token_row.expires_at.isoformat(), "body": body, "etag": etag}
+        await portal_cache.store(token_hash, token_row.work_order_id, cached)
+    cache_control = "public, no-cache"
+    if PORTAL_VIEW_MAX_AGE > 0:
+        cache_control = f"public, max-age={PORTAL_VIEW_MAX_AGE}, must-revalidate"
+    return _etag_response(request, cached["body"], cached["etag"], cache_control)
 
 
 @app.post("/portal/work-orders/{token}/quote")
-def submit_portal_quote(
+async def submit_portal_quote(
     token: str,
     payload: WorkOrderQuoteCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> dict:
-    token_row = _get_portal_token(db, token)
-    work_order = db.get(WorkOrder, token_row.work_order_id)
+    token_row = await _get_portal_token(db, token)
+    work_order = await db.get(WorkOrder, token_row.work_order_id)
     if work_order is None:
         raise HTTPException(status_code=404, detail="not_found")
     if token_row.scope != "quote_portal" or work_order.type != "quote":
@@ -1563,8 +2092,8 @@ def submit_portal_quote(
         updated_at=now,
     )
     db.add(quote)
-    db.commit()
-    db.refresh(quote)
+    await db.commit()
+    await db.refresh(quote)
     token_row.quote_id = quote.id
     work_order.status = "quote_submitted"
     work_order.updated_at = now
@@ -1575,18 +2104,20 @@ def submit_portal_quote(
         actor_type="portal",
         token_id=token_row.id,
     )
-    db.commit()
+    await db.run_sync(_refresh_portal_snapshots, work_order.id)
+    await db.commit()
+    await portal_cache.ainvalidate(work_order.id)
     return {"status": "ok"}
 
 
 @app.post("/portal/work-orders/{token}/interest")
-def submit_portal_interest(
+async def submit_portal_interest(
     token: str,
     payload: WorkOrderInterestCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> dict:
-    token_row = _get_portal_token(db, token)
-    work_order = db.get(WorkOrder, token_row.work_order_id)
+    token_row = await _get_portal_token(db, token)
+    work_order = await db.get(WorkOrder, token_row.work_order_id)
     if work_order is None:
         raise HTTPException(status_code=404, detail="not_found")
     if token_row.scope != "fixed_interest" or work_order.type != "fixed":
@@ -1603,8 +2134,8 @@ def submit_portal_interest(
         updated_at=now,
     )
     db.add(interest)
-    db.commit()
-    db.refresh(interest)
+    await db.commit()
+    await db.refresh(interest)
     token_row.interest_id = interest.id
     _log_activity(
         db,
@@ -1613,12 +2144,14 @@ def submit_portal_interest(
         actor_type="portal",
         token_id=token_row.id,
     )
-    db.commit()
+    await db.run_sync(_refresh_portal_snapshots, work_order.id)
+    await db.commit()
+    await portal_cache.ainvalidate(work_order.id)
     return {"status": "ok"}
 
 
 @app.post("/portal/work-orders/{token}/submit-proof")
-def submit_portal_proof(
+async def submit_portal_proof(
     token: str,
     provider_name: str = Form(...),
     provider_phone: str = Form(...),
@@ -1626,10 +2159,10 @@ def submit_portal_proof(
     pix_key_value: str = Form(...),
     pix_receiver_name: str = Form(...),
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> dict:
-    token_row = _get_portal_token(db, token)
-    work_order = db.get(WorkOrder, token_row.work_order_id)
+    token_row = await _get_portal_token(db, token)
+    work_order = await db.get(WorkOrder, token_row.work_order_id)
     if work_order is None:
         raise HTTPException(status_code=404, detail="not_found")
     if work_order.status not in {
@@ -1650,8 +2183,7 @@ def submit_portal_proof(
         suffix = "." + file.filename.split(".")[-1]
     file_id = f"proof_{uuid.uuid4().hex}{suffix}"
     file_path = upload_dir / file_id
-    with file_path.open("wb") as handle:
-        handle.write(file.file.read())
+    await anyio.Path(file_path).write_bytes(await file.read())
 
     doc = Document(
         property_id=work_order.property_id,
@@ -1663,8 +2195,8 @@ def submit_portal_proof(
         },
     )
     db.add(doc)
-    db.commit()
-    db.refresh(doc)
+    await db.commit()
+    await db.refresh(doc)
 
     now = datetime.now(timezone.utc)
     proof = WorkOrderProof(
@@ -1689,5 +2221,7 @@ def submit_portal_proof(
         actor_type="portal",
         token_id=token_row.id,
     )
-    db.commit()
+    await db.run_sync(_refresh_portal_snapshots, work_order.id)
+    await db.commit()
+    await portal_cache.ainvalidate(work_order.id)
     return {"status": "ok"}
@@ -0,0 +1,192 @@
+import os
+import shutil
+import threading
+from pathlib import Path
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+# With PROMETHEUS_MULTIPROC_DIR set (several uvicorn workers, RQ work horses) every process writes
+# its samples there and a scrape aggregates them; otherwise the default in-process registry is used.
+MULTIPROC_ENV = "PROMETHEUS_MULTIPROC_DIR"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent in SQL per request.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements per request.",
+    ["method", "route"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 250),
+)
+DB_POOL = Gauge(
+    "db_pool_connections",
+    "Connection pool state per engine (checked_out, checked_in, overflow).",
+    ["engine", "state"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts",
+    "Pool checkouts, checkout timeouts and invalidated idle connections per engine.",
+    ["engine", "kind"],
+)
+JOB_STAGE_SECONDS = Histogram(
+    "document_job_stage_seconds",
+    "process_document_job duration per stage.",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+JOB_TOTAL = Counter(
+    "document_jobs_total",
+    "Processed documents by outcome.",
+    ["outcome"],
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_duration_seconds",
+    "LLM call latency.",
+    ["operation", "model", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "LLM tokens reported by the provider.",
+    ["operation", "model", "kind"],
+)
+PORTAL_CACHE_LOOKUPS = Counter(
+    "portal_cache_lookups_total",
+    "Portal token cache lookups by result (hit, miss, error).",
+    ["result"],
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections_total",
+    "Requests answered 429 by the rate limiter, by rule.",
+    ["rule"],
+)
+IDEMPOTENCY_REQUESTS = Counter(
+    "idempotency_requests_total",
+    "Requests with an Idempotency-Key by result (stored, replayed, in_progress, mismatch).",
+    ["result"],
+)
+
+
+# Pool counts already added to DB_POOL_CHECKOUTS, per (engine, kind).
+_pool_counts: dict[tuple[str, str], int] = {}
+_pool_counts_lock = threading.Lock()
+
+
+def is_multiprocess() -> bool:
+    return bool(os.getenv(MULTIPROC_ENV))
+
+
+def reset_multiprocess_dir() -> None:
+    """Clear stale samples; call once before the first process of a deployment starts."""
+    directory = os.getenv(MULTIPROC_ENV)
+    if not directory:
+        return
+    shutil.rmtree(directory, ignore_errors=True)
+    Path(directory).mkdir(parents=True, exist_ok=True)
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop the live gauges of an exiting process so they stop counting in livesum."""
+    if is_multiprocess():
+        multiprocess.mark_process_dead(pid)
+
+
+class QueueDepthCollector:
+    """RQ queue depth, read from Redis at scrape time."""
+
+    def collect(self):
+        from app.queue import get_queue, is_inline_mode
+
+        if is_inline_mode():
+            return
+        depth = GaugeMetricFamily("rq_queue_jobs", "Jobs per RQ registry.", labels=["queue", "state"])
+        try:
+            queue = get_queue()
+            depth.add_metric([queue.name, "queued"], queue.count)
+            depth.add_metric([queue.name, "started"], queue.started_job_registry.count)
+            depth.add_metric([queue.name, "failed"], queue.failed_job_registry.count)
+        except Exception:
+            return
+        yield depth
+
+
+def scrape_registry() -> CollectorRegistry:
+    if not is_multiprocess():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(QueueDepthCollector())
+    return registry
+
+
+if is_multiprocess():
+    # One-off processes (scripts, tests) may start before anything created the directory.
+    Path(os.environ[MULTIPROC_ENV]).mkdir(parents=True, exist_ok=True)
+else:
+    REGISTRY.register(QueueDepthCollector())
+
+
+def render() -> tuple[bytes, str]:
+    return generate_latest(scrape_registry()), CONTENT_TYPE_LATEST
+
+
+def serve_side_port(port: int) -> None:
+    """Expose metrics for a process without an HTTP app (the RQ worker)."""
+    start_http_server(port, registry=scrape_registry())
+
+
+def observe_request(method: str, route: str, status: int, seconds: float, stats) -> None:
+    HTTP_REQUEST_SECONDS.labels(method, route, str(status)).observe(seconds)
+    HTTP_REQUEST_DB_SECONDS.labels(method, route).observe(stats.db_ms / 1000)
+    HTTP_REQUEST_QUERIES.labels(method, route).observe(stats.queries)
+
+
+def observe_pools(engines: dict) -> None:
+    """Refresh pool gauges and advance the checkout counters; called when /metrics is scraped.
+
+    With several API workers each one updates its pool series when it answers a scrape.
+    """
+    from app.pool import pool_stats
+
+    for name, engine in engines.items():
+        stats = pool_stats(engine)
+        for state in ("checked_out", "checked_in", "overflow"):
+            if state in stats:
+                DB_POOL.labels(name, state).set(stats[state])
+        with _pool_counts_lock:
+            for kind in ("checkouts", "timeouts", "invalidated"):
+                if kind not in stats:
+                    continue
+                # The pool keeps cumulative counts; the counter only takes the increase.
+                seen = _pool_counts.get((name, kind), 0)
+                DB_POOL_CHECKOUTS.labels(name, kind).inc(max(stats[kind] - seen, 0))
+                _pool_counts[(name, kind)] = stats[kind]
+
+
+def observe_llm(operation: str, model: str, outcome: str, seconds: float, usage: dict | None) -> None:
+    LLM_REQUEST_SECONDS.labels(operation, model, outcome).observe(seconds)
+    for kind in ("input_tokens", "output_tokens"):
+        if usage and usage.get(kind):
+            LLM_TOKENS.labels(operation, model, kind.removesuffix("_tokens")).inc(usage[kind])
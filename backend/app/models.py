@@ -1,5 +1,22 @@
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, Numeric, String
-from sqlalchemy.dialects.postgresql import JSONB
+from typing import Any
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Computed,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    LargeBinary,
+    Numeric,
+    String,
+    Text,
+    cast,
+    update,
+)
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, validates
 from sqlalchemy.sql import text
 
 from app.db import Base
@@ -25,8 +42,29 @@ class Property(Base):
     id = Column(Integer, primary_key=True)
     # TODO: confirm whether properties must belong to a user.
     owner_user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    # TODO: define core property fields (e.g., address) beyond extras.
+    # Promoted from extras; kept in sync by the extras validator while both are written.
+    tag = Column(String(160), nullable=True, index=True)
+    property_address = Column(String(255), nullable=True)
+    is_rented = Column(Boolean, nullable=True)
+    desired_rent_value = Column(Integer, nullable=True)
+    current_rent_value = Column(Integer, nullable=True)
     extras = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('portuguese', coalesce(tag, '')), 'A') || "
+                "setweight(to_tsvector('portuguese', coalesce(property_address, '')), 'B')",
+                persisted=True,
+            ),
+        )
+    )
+
+    @validates("extras")
+    def _mirror_extras(self, _key: str, extras: dict | None) -> dict | None:
+        for column, value in property_columns(extras or {}).items():
+            setattr(self, column, value)
+        return extras
 
 
 class PropertyContract(Base):
@@ -112,9 +150,21 @@ class Document(Base):
     id = Column(Integer, primary_key=True)
     # TODO: confirm whether documents must belong to a property.
     property_id = Column(Integer, ForeignKey("properties.id"), nullable=False)
-    # TODO: define core document fields (e.g., type/storage) beyond extras.
+    # Promoted from extras; kept in sync by the extras validator while both are written.
+    status = Column(String(40), nullable=True, index=True)
+    name = Column(String(255), nullable=True)
+    path = Column(String(512), nullable=True)
+    doc_type = Column(String(40), nullable=True)
+    confidence = Column(Float, nullable=True)
+    extraction_id = Column(Integer, nullable=True)
     extras = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
 
+    @validates("extras")
+    def _mirror_extras(self, _key: str, extras: dict | None) -> dict | None:
+        for column, value in document_columns(extras or {}).items():
+            setattr(self, column, value)
+        return extras
+
 
 class DocumentExtraction(Base):
     __tablename__ = "document_extractions"
@@ -124,6 +174,43 @@ class DocumentExtraction(Base):
     document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
     # TODO: define core extraction fields beyond extras.
     extras = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+    # Document name + extracted text, written by the worker alongside the extraction.
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
+
+
+class DocumentExtractionText(Base):
+    __tablename__ = "document_extraction_texts"
+
+    # Raw extracted text, compressed and kept out of the extraction row; loaded on demand.
+    extraction_id = Column(Integer, ForeignKey("document_extractions.id"), primary_key=True)
+    encoding = Column(String(10), nullable=False)
+    char_count = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+
+
+class DocumentProcessingTiming(Base):
+    __tablename__ = "document_processing_timings"
+
+    # One row per process_document_job run; stage durations are null when a stage did not run.
+    id = Column(Integer, primary_key=True)
+    document_id = Column(
+        Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False
+    )
+    extraction_id = Column(
+        Integer, ForeignKey("document_extractions.id", ondelete="SET NULL"), nullable=True
+    )
+    doc_type = Column(String(40), nullable=True)
+    outcome = Column(String(40), nullable=False)
+    queue_wait_ms = Column(Float, nullable=True)
+    extract_ms = Column(Float, nullable=True)
+    prepare_ms = Column(Float, nullable=True)
+    llm_ms = Column(Float, nullable=True)
+    persist_ms = Column(Float, nullable=True)
+    total_ms = Column(Float, nullable=False)
+    input_tokens = Column(Integer, nullable=False, server_default=text("0"))
+    output_tokens = Column(Integer, nullable=False, server_default=text("0"))
+    cost_usd = Column(Numeric(12, 6), nullable=False, server_default=text("0"))
+    created_at = Column(DateTime(timezone=True), nullable=False, index=True)
 
 
 class WorkOrder(Base):
@@ -142,6 +229,16 @@ class WorkOrder(Base):
     created_at = Column(DateTime(timezone=True), nullable=False)
     updated_at = Column(DateTime(timezone=True), nullable=False)
     extras = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('portuguese', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('portuguese', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+        )
+    )
 
 
 class WorkOrderQuote(Base):
@@ -201,6 +298,23 @@ class WorkOrderToken(Base):
     created_at = Column(DateTime(timezone=True), nullable=False)
 
 
+class WorkOrderPortalSnapshot(Base):
+    __tablename__ = "work_order_portal_snapshots"
+
+    # Rendered portal view JSON per token, rebuilt in the transaction that changes the work order;
+    # version counts the rebuilds that changed the body.
+    token_id = Column(
+        Integer, ForeignKey("work_order_tokens.id", ondelete="CASCADE"), primary_key=True
+    )
+    work_order_id = Column(
+        Integer, ForeignKey("work_orders.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    version = Column(Integer, nullable=False, server_default=text("1"))
+    body = Column(Text, nullable=False)
+    etag = Column(String(64), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+
 class Expense(Base):
     __tablename__ = "expenses"
 
@@ -242,3 +356,56 @@ class Session(Base):
     created_at = Column(DateTime(timezone=True), nullable=False)
     expires_at = Column(DateTime(timezone=True), nullable=False)
     revoked_at = Column(DateTime(timezone=True), nullable=True)
+
+
+def _int_or_none(value: Any) -> int | None:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return int(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _float_or_none(value: Any) -> float | None:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def property_columns(extras: dict) -> dict:
+    return {
+        "tag": extras.get("tag") or extras.get("label"),
+        "property_address": extras.get("property_address"),
+        "is_rented": bool(extras.get("is_rented")),
+        "desired_rent_value": _int_or_none(extras.get("desired_rent_value")),
+        "current_rent_value": _int_or_none(extras.get("current_rent_value")),
+    }
+
+
+def document_columns(extras: dict) -> dict:
+    return {
+        "status": extras.get("status"),
+        "name": extras.get("name"),
+        "path": extras.get("path"),
+        "doc_type": extras.get("doc_type"),
+        "confidence": _float_or_none(extras.get("confidence")),
+        "extraction_id": _int_or_none(extras.get("extraction_id")),
+    }
+
+
+def document_update(document_id: int, **fields: Any):
+    """UPDATE the promoted columns and merge the same keys into extras server-side."""
+    columns = {key: value for key, value in fields.items() if key in DOCUMENT_COLUMNS}
+    return (
+        update(Document)
+        .where(Document.id == document_id)
+        .values(**columns, extras=Document.extras.op("||")(cast(fields, JSONB)))
+        .execution_options(synchronize_session=False)
+    )
+
+
+DOCUMENT_COLUMNS = frozenset(document_columns({}))
@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+def pool_options() -> dict:
+    """Engine pool settings from the environment (same defaults as SQLAlchemy, plus recycle)."""
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+
+
+def validate_idle_seconds() -> float:
+    return float(os.getenv("DB_POOL_VALIDATE_IDLE_SECONDS", "30"))
+
+
+class CheckoutStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.validations = 0
+        self.invalidated = 0
+
+    def record_wait(self, wait_ms: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+
+    def increment(self, name: str) -> None:
+        """Bump ``timeouts``, ``validations`` or ``invalidated`` under the stats lock."""
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_mean": round(self.wait_ms_total / self.checkouts, 3)
+                if self.checkouts
+                else 0.0,
+                "wait_ms_max": round(self.wait_ms_max, 3),
+                "validations": self.validations,
+                "invalidated": self.invalidated,
+            }
+
+
+class _TimedPoolMixin:
+    """Time every checkout, including waits for a free connection and new connects."""
+
+    stats: CheckoutStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats.increment("timeouts")
+            raise
+        finally:
+            self.stats.record_wait((time.perf_counter() - start) * 1000)
+
+    def recreate(self):
+        # Invalidation/dispose builds a fresh pool; keep counting into the same stats.
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = CheckoutStats()
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = CheckoutStats()
+
+
+def install_idle_validation(engine, idle_seconds: float | None = None) -> None:
+    """Ping a connection on checkout only when it sat idle in the pool for too long.
+
+    Replaces ``pool_pre_ping``, which pays a round trip on every checkout.
+    """
+    idle_seconds = validate_idle_seconds() if idle_seconds is None else idle_seconds
+    dialect = engine.dialect
+
+    @event.listens_for(engine, "checkin")
+    def _mark_idle(dbapi_connection, connection_record) -> None:
+        connection_record.info["idle_since"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _validate(dbapi_connection, connection_record, connection_proxy) -> None:
+        idle_since = connection_record.info.get("idle_since")
+        if idle_since is None or time.monotonic() - idle_since < idle_seconds:
+            return
+        stats = getattr(engine.pool, "stats", None)
+        if stats is not None:
+            stats.increment("validations")
+        try:
+            alive = dialect.do_ping(dbapi_connection)
+        except Exception:
+            alive = False
+        if not alive:
+            if stats is not None:
+                stats.increment("invalidated")
+            # The pool discards this connection and retries the checkout with a fresh one.
+            raise exc.DisconnectionError("idle connection failed validation")
+
+
+def pool_stats(engine) -> dict:
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+            }
+        )
+    if hasattr(pool, "stats"):
+        stats.update(pool.stats.snapshot())
+    return stats
@@ -0,0 +1,183 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Any
+
+import anyio
+
+from app.metrics import PORTAL_CACHE_LOOKUPS
+
+# Resolved portal tokens keyed by token hash: the rendered portal view plus the token expiry, so
+# repeated portal reads skip the database. Entries are dropped per work order after every admin or
+# portal action that changes the work order, its tokens, quotes, interests or property; the TTL
+# bounds staleness when an invalidation is lost or races a read that started before the commit.
+# PORTAL_CACHE_BACKEND is redis (shared by all API processes), memory (one process) or off.
+KEY_PREFIX = "portal_cache"
+MEMORY_MAX_ENTRIES = 10_000
+
+logger = logging.getLogger("app.portal_cache")
+
+
+def _ttl_seconds() -> int:
+    return int(os.getenv("PORTAL_CACHE_TTL_SECONDS", "30"))
+
+
+class MemoryPortalCache:
+    blocking = False
+
+    def __init__(self, max_entries: int = MEMORY_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, int, dict]] = OrderedDict()
+        self._by_work_order: dict[int, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _drop(self, token_hash: str) -> None:
+        _, work_order_id, _ = self._entries.pop(token_hash)
+        hashes = self._by_work_order.get(work_order_id)
+        if hashes is not None:
+            hashes.discard(token_hash)
+            if not hashes:
+                del self._by_work_order[work_order_id]
+
+    def get(self, token_hash: str) -> dict | None:
+        with self._lock:
+            item = self._entries.get(token_hash)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                self._drop(token_hash)
+                return None
+            self._entries.move_to_end(token_hash)
+            return item[2]
+
+    def set(self, token_hash: str, work_order_id: int, entry: dict, ttl: int) -> None:
+        with self._lock:
+            if token_hash in self._entries:
+                self._drop(token_hash)
+            self._entries[token_hash] = (time.monotonic() + ttl, work_order_id, entry)
+            self._by_work_order.setdefault(work_order_id, set()).add(token_hash)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, work_order_ids: tuple[int, ...]) -> None:
+        with self._lock:
+            for work_order_id in work_order_ids:
+                for token_hash in list(self._by_work_order.get(work_order_id, ())):
+                    self._drop(token_hash)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_work_order.clear()
+
+
+class RedisPortalCache:
+    """Entries in ``portal_cache:token:<hash>`` plus a set of hashes per work order."""
+
+    blocking = True
+
+    def __init__(self, url: str) -> None:
+        from redis import Redis
+
+        self.redis = Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def get(self, token_hash: str) -> dict | None:
+        raw = self.redis.get(f"{KEY_PREFIX}:token:{token_hash}")
+        return json.loads(raw) if raw else None
+
+    def set(self, token_hash: str, work_order_id: int, entry: dict, ttl: int) -> None:
+        members = f"{KEY_PREFIX}:work_order:{work_order_id}"
+        pipe = self.redis.pipeline()
+        pipe.set(f"{KEY_PREFIX}:token:{token_hash}", json.dumps(entry), ex=ttl)
+        pipe.sadd(members, token_hash)
+        pipe.expire(members, ttl)
+        pipe.execute()
+
+    def invalidate(self, work_order_ids: tuple[int, ...]) -> None:
+        for work_order_id in work_order_ids:
+            members = f"{KEY_PREFIX}:work_order:{work_order_id}"
+            hashes = [value.decode() for value in self.redis.smembers(members)]
+            self.redis.delete(members, *(f"{KEY_PREFIX}:token:{value}" for value in hashes))
+
+    def clear(self) -> None:
+        keys = list(self.redis.scan_iter(f"{KEY_PREFIX}:*"))
+        if keys:
+            self.redis.delete(*keys)
+
+
+_cache: MemoryPortalCache | RedisPortalCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_portal_cache() -> MemoryPortalCache | RedisPortalCache | None:
+    """Backend from PORTAL_CACHE_BACKEND; defaults to memory with QUEUE_MODE=inline, else redis."""
+    global _cache
+    from app.queue import get_redis_url, is_inline_mode
+
+    backend = os.getenv(
+        "PORTAL_CACHE_BACKEND", "memory" if is_inline_mode() else "redis"
+    ).lower()
+    if backend == "off" or _ttl_seconds() <= 0:
+        return None
+    with _cache_lock:
+        if backend == "memory" and not isinstance(_cache, MemoryPortalCache):
+            _cache = MemoryPortalCache()
+        elif backend == "redis" and not isinstance(_cache, RedisPortalCache):
+            _cache = RedisPortalCache(get_redis_url())
+        return _cache
+
+
+async def _run(cache, method: str, *args) -> Any:
+    call = partial(getattr(cache, method), *args)
+    if cache.blocking:
+        return await anyio.to_thread.run_sync(call)
+    return call()
+
+
+async def load(token_hash: str) -> dict | None:
+    cache = get_portal_cache()
+    if cache is None:
+        return None
+    try:
+        entry = await _run(cache, "get", token_hash)
+    except Exception as exc:
+        PORTAL_CACHE_LOOKUPS.labels("error").inc()
+        logger.warning("portal_cache_unavailable %s", exc)
+        return None
+    PORTAL_CACHE_LOOKUPS.labels("miss" if entry is None else "hit").inc()
+    return entry
+
+
+async def store(token_hash: str, work_order_id: int, entry: dict) -> None:
+    cache = get_portal_cache()
+    if cache is None:
+        return
+    try:
+        await _run(cache, "set", token_hash, work_order_id, entry, _ttl_seconds())
+    except Exception as exc:
+        logger.warning("portal_cache_unavailable %s", exc)
+
+
+def invalidate(*work_order_ids: int) -> None:
+    """Drop cached portal views of these work orders; call after the change is committed."""
+    cache = get_portal_cache()
+    if cache is None or not work_order_ids:
+        return
+    try:
+        cache.invalidate(work_order_ids)
+    except Exception as exc:
+        logger.warning("portal_cache_invalidate_failed %s %s", work_order_ids, exc)
+
+
+async def ainvalidate(*work_order_ids: int) -> None:
+    cache = get_portal_cache()
+    if cache is None or not work_order_ids:
+        return
+    try:
+        await _run(cache, "invalidate", work_order_ids)
+    except Exception as exc:
+        logger.warning("portal_cache_invalidate_failed %s %s", work_order_ids, exc)
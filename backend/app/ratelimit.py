@@ -0,0 +1,297 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from functools import partial
+from typing import Any
+
+import anyio
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics import RATE_LIMIT_REJECTIONS
+
+# Sliding-window limits for the unauthenticated endpoints, checked before routing so a flood of
+# guessed portal tokens or passwords is answered from memory/Redis without reaching Postgres or
+# bcrypt. Limits are "count/seconds":
+#   RATE_LIMIT_PORTAL_IP       portal requests per client IP
+#   RATE_LIMIT_PORTAL_TOKEN    portal requests per token prefix (one hammered link)
+#   RATE_LIMIT_PORTAL_INVALID  unknown-token (404) answers per IP before the IP is blocked
+#   RATE_LIMIT_LOGIN_FAILURES  failed logins (401) per IP before the IP is blocked
+# Unknown token hashes are also remembered for RATE_LIMIT_INVALID_TOKEN_TTL seconds so retries of
+# the same token skip the lookup. RATE_LIMIT_BACKEND is redis, memory or off.
+KEY_PREFIX = "ratelimit"
+PORTAL_PREFIX = "/portal/work-orders/"
+LOGIN_PATH = "/auth/login"
+TOKEN_PREFIX_CHARS = 8
+MEMORY_MAX_KEYS = 100_000
+DEFAULT_LIMITS = {
+    "portal_ip": "300/60",
+    "portal_token": "120/60",
+    "portal_invalid": "20/600",
+    "login_failures": "10/300",
+}
+
+logger = logging.getLogger("app.ratelimit")
+
+
+def _limit(rule: str) -> tuple[int, float] | None:
+    """(count, window seconds) for a rule, or None when disabled with 0."""
+    value = os.getenv(f"RATE_LIMIT_{rule.upper()}", DEFAULT_LIMITS[rule])
+    count, _, seconds = value.partition("/")
+    if int(count) <= 0:
+        return None
+    return int(count), float(seconds or 60)
+
+
+def _invalid_token_ttl() -> int:
+    return int(os.getenv("RATE_LIMIT_INVALID_TOKEN_TTL", "600"))
+
+
+class MemoryRateLimiter:
+    blocking = False
+
+    def __init__(self, max_keys: int = MEMORY_MAX_KEYS) -> None:
+        self.max_keys = max_keys
+        self._windows: dict[str, deque[float]] = {}
+        self._invalid: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _window(self, key: str, seconds: float, now: float) -> deque[float]:
+        window = self._windows.get(key)
+        if window is None:
+            if len(self._windows) >= self.max_keys:
+                self._sweep(now)
+            window = self._windows[key] = deque()
+        while window and window[0] <= now - seconds:
+            window.popleft()
+        return window
+
+    def _sweep(self, now: float) -> None:
+        # Windows are at most an hour long in practice; drop keys without recent hits.
+        stale = [key for key, hits in self._windows.items() if not hits or hits[-1] <= now - 3600]
+        for key in stale:
+            del self._windows[key]
+        if len(self._windows) >= self.max_keys:
+            self._windows.clear()
+
+    def hit(self, key: str, count: int, seconds: float, record: bool = True) -> float:
+        """0 when allowed (recording the hit if asked), else seconds until a slot frees up."""
+        now = time.monotonic()
+        with self._lock:
+            window = self._window(key, seconds, now)
+            if len(window) >= count:
+                return window[0] + seconds - now
+            if record:
+                window.append(now)
+            return 0.0
+
+    def add(self, key: str, seconds: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._window(key, seconds, now).append(now)
+
+    def is_invalid_token(self, token_hash: str) -> bool:
+        with self._lock:
+            expires = self._invalid.get(token_hash)
+            if expires is None:
+                return False
+            if expires <= time.monotonic():
+                del self._invalid[token_hash]
+                return False
+            return True
+
+    def remember_invalid_token(self, token_hash: str, ttl: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._invalid) >= self.max_keys:
+                self._invalid = {key: exp for key, exp in self._invalid.items() if exp > now}
+                if len(self._invalid) >= self.max_keys:
+                    self._invalid.clear()
+            self._invalid[token_hash] = now + ttl
+
+    def clear(self) -> None:
+        with self._lock:
+            self._windows.clear()
+            self._invalid.clear()
+
+
+# Drops expired hits, then adds this one only if the window has room; returns the wait in ms.
+_HIT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    return math.max(1, math.ceil(tonumber(oldest[2]) + window - now))
+end
+if ARGV[4] == '1' then
+    redis.call('ZADD', KEYS[1], now, ARGV[5])
+    redis.call('PEXPIRE', KEYS[1], math.ceil(window))
+end
+return 0
+"""
+
+
+class RedisRateLimiter:
+    """One sorted set of hit timestamps (ms) per key, shared by every API process."""
+
+    blocking = True
+
+    def __init__(self, url: str) -> None:
+        from redis import Redis
+
+        self.redis = Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._hit = self.redis.register_script(_HIT_SCRIPT)
+
+    def hit(self, key: str, count: int, seconds: float, record: bool = True) -> float:
+        wait_ms = self._hit(
+            keys=[f"{KEY_PREFIX}:{key}"],
+            args=[
+                int(time.time() * 1000), int(seconds * 1000), count, int(record), uuid.uuid4().hex
+            ],
+        )
+        return int(wait_ms) / 1000
+
+    def add(self, key: str, seconds: float) -> None:
+        now = int(time.time() * 1000)
+        pipe = self.redis.pipeline()
+        pipe.zadd(f"{KEY_PREFIX}:{key}", {f"{now}:{uuid.uuid4().hex}": now})
+        pipe.pexpire(f"{KEY_PREFIX}:{key}", int(seconds * 1000))
+        pipe.execute()
+
+    def is_invalid_token(self, token_hash: str) -> bool:
+        return bool(self.redis.exists(f"{KEY_PREFIX}:invalid_token:{token_hash}"))
+
+    def remember_invalid_token(self, token_hash: str, ttl: int) -> None:
+        self.redis.set(f"{KEY_PREFIX}:invalid_token:{token_hash}", 1, ex=ttl)
+
+    def clear(self) -> None:
+        keys = list(self.redis.scan_iter(f"{KEY_PREFIX}:*"))
+        if keys:
+            self.redis.delete(*keys)
+
+
+_limiter: MemoryRateLimiter | RedisRateLimiter | None = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> MemoryRateLimiter | RedisRateLimiter | None:
+    """Backend from RATE_LIMIT_BACKEND; defaults to memory with QUEUE_MODE=inline, else redis."""
+    global _limiter
+    from app.queue import get_redis_url, is_inline_mode
+
+    backend = os.getenv("RATE_LIMIT_BACKEND", "memory" if is_inline_mode() else "redis").lower()
+    if backend == "off":
+        return None
+    with _limiter_lock:
+        if backend == "memory" and not isinstance(_limiter, MemoryRateLimiter):
+            _limiter = MemoryRateLimiter()
+        elif backend == "redis" and not isinstance(_limiter, RedisRateLimiter):
+            _limiter = RedisRateLimiter(get_redis_url())
+        return _limiter
+
+
+async def _run(method: str, *args, default: Any = None) -> Any:
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return default
+    call = partial(getattr(limiter, method), *args)
+    try:
+        if limiter.blocking:
+            return await anyio.to_thread.run_sync(call)
+        return call()
+    except Exception as exc:
+        # Fail open: an unreachable Redis must not take the portal or login down.
+        logger.warning("rate_limit_unavailable %s", exc)
+        return default
+
+
+async def is_invalid_token(token_hash: str) -> bool:
+    return await _run("is_invalid_token", token_hash, default=False)
+
+
+async def remember_invalid_token(token_hash: str) -> None:
+    await _run("remember_invalid_token", token_hash, _invalid_token_ttl())
+
+
+def _client_ip(scope: Scope) -> str:
+    # Behind a proxy, run uvicorn with --proxy-headers so scope["client"] is the real client.
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RateLimitMiddleware:
+    """Answer 429 for over-limit portal and login traffic before it reaches the routes."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    def _checks(self, scope: Scope, ip: str) -> list[tuple[str, str, bool]]:
+        """(rule, key, record) to test for this request, cheapest rejections first."""
+        path = scope["path"]
+        if scope["method"] == "OPTIONS":
+            # CORS preflights must not spend the budget of the request they precede.
+            return []
+        if path.startswith(PORTAL_PREFIX):
+            token = path[len(PORTAL_PREFIX):].split("/", 1)[0]
+            return [
+                ("portal_invalid", f"portal_invalid:{ip}", False),
+                ("portal_ip", f"portal_ip:{ip}", True),
+                ("portal_token", f"portal_token:{token[:TOKEN_PREFIX_CHARS]}", True),
+            ]
+        if path == LOGIN_PATH and scope["method"] == "POST":
+            return [("login_failures", f"login_failures:{ip}", False)]
+        return []
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        ip = _client_ip(scope)
+        checks = self._checks(scope, ip)
+        if not checks:
+            await self.app(scope, receive, send)
+            return
+        for rule, key, record in checks:
+            limit = _limit(rule)
+            if limit is None:
+                continue
+            wait = await _run("hit", key, *limit, record, default=0.0)
+            if wait > 0:
+                RATE_LIMIT_REJECTIONS.labels(rule).inc()
+                await self._reject(send, wait)
+                return
+
+        failure_rule = "login_failures" if scope["path"] == LOGIN_PATH else "portal_invalid"
+        failure_status = 401 if scope["path"] == LOGIN_PATH else 404
+        status = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+        limit = _limit(failure_rule)
+        if status == failure_status and limit is not None:
+            await _run("add", f"{failure_rule}:{ip}", limit[1])
+
+    async def _reject(self, send: Send, wait: float) -> None:
+        body = json.dumps({"detail": "rate_limited"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(max(1, math.ceil(wait))).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
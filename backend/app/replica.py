@@ -0,0 +1,88 @@
+import os
+import threading
+import time
+
+from sqlalchemy import text
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Zero while the replica has replayed everything it received; NULL (not a standby) counts as zero.
+REPLICA_LAG_SQL = text(
+    "SELECT COALESCE(CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END, 0)"
+)
+READ_PRIMARY_COOKIE = "read_primary"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def read_max_lag_seconds() -> float:
+    return float(os.getenv("DB_READ_MAX_LAG_SECONDS", "2"))
+
+
+def read_lag_check_seconds() -> float:
+    return float(os.getenv("DB_READ_LAG_CHECK_SECONDS", "5"))
+
+
+def read_primary_after_write_seconds() -> int:
+    return int(os.getenv("DB_READ_PRIMARY_AFTER_WRITE_SECONDS", "5"))
+
+
+class ReplicaRouter:
+    """Remember the last measured replica lag and whether reads may go to the replica."""
+
+    def __init__(self, max_lag: float | None = None, check_interval: float | None = None) -> None:
+        self.max_lag = read_max_lag_seconds() if max_lag is None else max_lag
+        self.check_interval = read_lag_check_seconds() if check_interval is None else check_interval
+        self.lag: float | None = None
+        self.checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def claim_check(self) -> bool:
+        """True for the one caller that should measure the lag now."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self.checked_at < self.check_interval:
+                return False
+            self.checked_at = now
+            return True
+
+    def record(self, lag: float | None) -> None:
+        self.lag = None if lag is None else float(lag)
+
+    def use_replica(self) -> bool:
+        return self.lag is not None and self.lag <= self.max_lag
+
+    def status(self) -> dict:
+        return {
+            "lag_seconds": self.lag,
+            "max_lag_seconds": self.max_lag,
+            "use_replica": self.use_replica(),
+        }
+
+
+class ReadPrimaryAfterWriteMiddleware:
+    """After a successful write, pin the client's reads to the primary for a few seconds.
+
+    The replica may not have replayed the write yet; this keeps read-your-writes for the
+    client that made it.
+    """
+
+    def __init__(self, app: ASGIApp, seconds: int | None = None) -> None:
+        self.app = app
+        self.seconds = read_primary_after_write_seconds() if seconds is None else seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS or self.seconds <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{READ_PRIMARY_COOKIE}=1; Max-Age={self.seconds}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
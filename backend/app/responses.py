@@ -0,0 +1,45 @@
+import os
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse, Response
+
+
+def _orjson():
+    try:
+        import orjson
+    except Exception:
+        return None
+    return orjson
+
+
+def is_fast_json() -> bool:
+    return os.getenv("JSON_MODE", "standard").lower() == "fast" and _orjson() is not None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dump_json(content: Any) -> bytes:
+    orjson = _orjson()
+    # OPT_UTC_Z writes UTC datetimes with "Z", as Pydantic does on the standard path.
+    return orjson.dumps(
+        content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+    )
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+def default_response_class() -> type[JSONResponse]:
+    return FastJSONResponse if is_fast_json() else JSONResponse
+
+
+def json_rows_response(rows: list[dict]) -> Response:
+    """Serialize rows the server built itself straight to bytes, skipping response_model."""
+    return Response(content=dump_json(rows), media_type="application/json")
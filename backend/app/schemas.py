@@ -158,6 +158,29 @@ class WorkOrderOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class WorkOrderListItem(BaseModel):
+    id: int
+    property_id: int
+    type: str
+    status: str
+    title: str
+    offer_amount: float | None = None
+    approved_amount: float | None = None
+    assigned_interest_id: int | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    extras: Dict[str, Any]
+
+
+class PropertyDetail(BaseModel):
+    property: PropertyOut
+    contract: Dict[str, Any] | None = None
+    documents: list[DocumentOut] | None = None
+    documents_has_more: bool = False
+    work_orders: list[WorkOrderListItem] | None = None
+    work_orders_has_more: bool = False
+
+
 class WorkOrderCreateResponse(BaseModel):
     work_order: WorkOrderOut
     portal_links: Dict[str, str]
@@ -188,6 +211,61 @@ class WorkOrderApproveQuote(BaseModel):
     approved_amount: float
 
 
+class WorkOrderQuoteOut(BaseModel):
+    id: int
+    work_order_id: int
+    provider_name: str
+    provider_phone: str
+    lines: list[dict]
+    total_amount: float
+    status: str
+    created_at: datetime
+    updated_at: datetime
+
+
+class WorkOrderInterestOut(BaseModel):
+    id: int
+    work_order_id: int
+    provider_name: str
+    provider_phone: str
+    status: str
+    created_at: datetime
+    updated_at: datetime
+
+
+class WorkOrderProofOut(BaseModel):
+    id: int
+    work_order_id: int
+    provider_name: str
+    provider_phone: str
+    pix_key_type: str
+    pix_key_value: str
+    pix_receiver_name: str
+    document_id: int
+    status: str
+    created_at: datetime
+    updated_at: datetime
+
+
+class WorkOrderTokenOut(BaseModel):
+    id: int
+    scope: str
+    expires_at: datetime
+    quote_id: int | None = None
+    interest_id: int | None = None
+    is_active: bool
+    used_at: datetime | None = None
+    created_at: datetime
+
+
+class WorkOrderDetail(BaseModel):
+    work_order: WorkOrderOut
+    quotes: list[WorkOrderQuoteOut]
+    interests: list[WorkOrderInterestOut]
+    proofs: list[WorkOrderProofOut]
+    tokens: list[WorkOrderTokenOut]
+
+
 class WorkOrderPortalView(BaseModel):
     work_order: Dict[str, Any]
     allowed_action: str
@@ -216,3 +294,58 @@ class DomainEventOut(BaseModel):
 class DocumentProcessResponse(BaseModel):
     id: int
     status: str
+
+
+class SearchHit(BaseModel):
+    type: str
+    id: int
+    property_id: int | None = None
+    title: str
+    subtitle: str | None = None
+    rank: float
+
+
+class SearchResponse(BaseModel):
+    query: str
+    hits: list[SearchHit]
+    limit: int
+    offset: int
+    has_more: bool
+
+
+class DocumentSearchHit(BaseModel):
+    document_id: int
+    property_id: int
+    name: str | None = None
+    doc_type: str | None = None
+    status: str | None = None
+    rank: float
+    snippet: str
+
+
+class DocumentSearchResponse(BaseModel):
+    query: str
+    hits: list[DocumentSearchHit]
+    limit: int
+    offset: int
+    has_more: bool
+
+
+class StageTiming(BaseModel):
+    p50_ms: float | None = None
+    p95_ms: float | None = None
+
+
+class ProcessingTimingGroup(BaseModel):
+    doc_type: str
+    jobs: int
+    input_tokens: int
+    output_tokens: int
+    cost_usd: float
+    stages: Dict[str, StageTiming]
+
+
+class ProcessingTimingsResponse(BaseModel):
+    hours: int
+    since: datetime
+    groups: list[ProcessingTimingGroup]
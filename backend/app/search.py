@@ -0,0 +1,180 @@
+import re
+
+from sqlalchemy import func, literal, select, text, union_all
+from sqlalchemy.orm import Session
+
+from app.models import Document, DocumentExtraction, Property, User, WorkOrder
+from app.textstore import load_extraction_texts
+
+SEARCH_CONFIG = "portuguese"
+SEARCH_TYPES = ("work_order", "property", "document")
+HEADLINE_OPTIONS = (
+    "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=30, MinWords=12, "
+    "FragmentDelimiter=\" ... \""
+)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def prefix_tsquery(text: str) -> str | None:
+    """Turn free text into a prefix tsquery (``rua:* & flor:*``) safe for to_tsquery."""
+    tokens = _TOKEN_RE.findall(text or "")
+    if not tokens:
+        return None
+    return " & ".join(f"{token}:*" for token in tokens[:8])
+
+
+def ts_query(query: str):
+    return func.to_tsquery(SEARCH_CONFIG, query)
+
+
+def matches(vector, query: str):
+    return vector.op("@@")(ts_query(query))
+
+
+def document_vector(name: str | None, text: str | None):
+    return func.setweight(func.to_tsvector(SEARCH_CONFIG, name or ""), "A").op("||")(
+        func.setweight(func.to_tsvector(SEARCH_CONFIG, text or ""), "B")
+    )
+
+
+def owned_property_ids(user: User):
+    return select(Property.id).where(Property.owner_user_id == user.id)
+
+
+def _work_order_hits(user: User, query: str):
+    stmt = select(
+        literal("work_order").label("type"),
+        WorkOrder.id.label("id"),
+        WorkOrder.property_id.label("property_id"),
+        WorkOrder.title.label("title"),
+        WorkOrder.status.label("subtitle"),
+        func.ts_rank(WorkOrder.search_vector, ts_query(query)).label("rank"),
+    ).where(matches(WorkOrder.search_vector, query))
+    if user.role != "admin":
+        stmt = stmt.where(WorkOrder.property_id.in_(owned_property_ids(user)))
+    return stmt
+
+
+def _property_hits(user: User, query: str):
+    stmt = select(
+        literal("property").label("type"),
+        Property.id.label("id"),
+        Property.id.label("property_id"),
+        func.coalesce(Property.tag, "").label("title"),
+        Property.property_address.label("subtitle"),
+        func.ts_rank(Property.search_vector, ts_query(query)).label("rank"),
+    ).where(matches(Property.search_vector, query))
+    if user.role != "admin":
+        stmt = stmt.where(Property.owner_user_id == user.id)
+    return stmt
+
+
+def _document_hits(user: User, query: str):
+    stmt = (
+        select(
+            literal("document").label("type"),
+            Document.id.label("id"),
+            Document.property_id.label("property_id"),
+            func.coalesce(Document.name, "").label("title"),
+            Document.doc_type.label("subtitle"),
+            func.ts_rank(DocumentExtraction.search_vector, ts_query(query)).label("rank"),
+        )
+        .join(DocumentExtraction, DocumentExtraction.id == Document.extraction_id)
+        .where(matches(DocumentExtraction.search_vector, query))
+    )
+    if user.role != "admin":
+        stmt = stmt.where(Document.property_id.in_(owned_property_ids(user)))
+    return stmt
+
+
+_HIT_BUILDERS = {
+    "work_order": _work_order_hits,
+    "property": _property_hits,
+    "document": _document_hits,
+}
+
+
+def unified_search(
+    db: Session,
+    user: User,
+    text: str,
+    types: list[str],
+    limit: int,
+    offset: int,
+) -> tuple[list[dict], bool]:
+    """Ranked hits across entity types; fetches one extra row to report ``has_more``."""
+    query = prefix_tsquery(text)
+    if query is None or not types:
+        return [], False
+    hits = union_all(*(_HIT_BUILDERS[kind](user, query) for kind in types)).subquery()
+    rows = db.execute(
+        select(hits)
+        .order_by(hits.c.rank.desc(), hits.c.type, hits.c.id.desc())
+        .limit(limit + 1)
+        .offset(offset)
+    ).mappings().all()
+    return [dict(row) for row in rows[:limit]], len(rows) > limit
+
+
+def search_documents(
+    db: Session,
+    user: User,
+    text: str,
+    property_id: int | None,
+    limit: int,
+    offset: int,
+) -> tuple[list[dict], bool]:
+    """Rank documents by extracted text; headlines are computed for the returned page only."""
+    query = prefix_tsquery(text)
+    if query is None:
+        return [], False
+    ranked = (
+        select(
+            Document.id.label("document_id"),
+            Document.property_id.label("property_id"),
+            Document.name.label("name"),
+            Document.doc_type.label("doc_type"),
+            Document.status.label("status"),
+            DocumentExtraction.id.label("extraction_id"),
+            func.ts_rank_cd(DocumentExtraction.search_vector, ts_query(query)).label("rank"),
+        )
+        .join(DocumentExtraction, DocumentExtraction.id == Document.extraction_id)
+        .where(matches(DocumentExtraction.search_vector, query))
+    )
+    if property_id is not None:
+        ranked = ranked.where(Document.property_id == property_id)
+    elif user.role != "admin":
+        ranked = ranked.where(Document.property_id.in_(owned_property_ids(user)))
+    rows = db.execute(
+        ranked.order_by(ranked.selected_columns.rank.desc(), Document.id.desc())
+        .limit(limit + 1)
+        .offset(offset)
+    ).mappings().all()
+    hits = [dict(row) for row in rows[:limit]]
+    texts = load_extraction_texts(db, [hit["extraction_id"] for hit in hits])
+    snippets = _headlines(db, [texts.get(hit["extraction_id"]) or "" for hit in hits], query)
+    for hit, snippet in zip(hits, snippets):
+        hit["snippet"] = snippet
+    return hits, len(rows) > limit
+
+
+def _headlines(db: Session, texts: list[str], query: str) -> list[str]:
+    """ts_headline for a batch of texts in one round trip, preserving input order.
+
+    The uploaded text is HTML-escaped before highlighting, so the only markup in a snippet is the
+    ``<mark>`` pair added here.
+    """
+    if not texts:
+        return []
+    rows = db.execute(
+        text(
+            "SELECT ts_headline(CAST(:config AS regconfig), "
+            "replace(replace(replace(t.body, '&', '&amp;'), '<', '&lt;'), '>', '&gt;'), "
+            "to_tsquery(CAST(:config AS regconfig), :query), :options) "
+            "FROM unnest(CAST(:texts AS text[])) WITH ORDINALITY AS t(body, position) "
+            "ORDER BY t.position"
+        ),
+        {"config": SEARCH_CONFIG, "query": query, "options": HEADLINE_OPTIONS, "texts": texts},
+    ).scalars().all()
+    return list(rows)
@@ -0,0 +1,69 @@
+import gzip
+import os
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import DocumentExtractionText
+
+
+def _zstd():
+    try:
+        import zstandard
+    except Exception:
+        return None
+    return zstandard
+
+
+def text_codec() -> str:
+    codec = os.getenv("EXTRACTION_TEXT_CODEC", "zstd").lower()
+    if codec == "zstd" and _zstd() is None:
+        return "gzip"
+    return codec if codec in {"zstd", "gzip"} else "gzip"
+
+
+def compress_text(text: str) -> tuple[str, bytes]:
+    raw = text.encode("utf-8")
+    codec = text_codec()
+    if codec == "zstd":
+        return codec, _zstd().ZstdCompressor(level=6).compress(raw)
+    return "gzip", gzip.compress(raw, compresslevel=6)
+
+
+def decompress_text(encoding: str, data: bytes) -> str:
+    if encoding == "zstd":
+        zstandard = _zstd()
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed text")
+        raw = zstandard.ZstdDecompressor().decompress(data)
+    else:
+        raw = gzip.decompress(data)
+    return raw.decode("utf-8")
+
+
+def save_extraction_text(session: Session, extraction_id: int, text: str) -> None:
+    encoding, data = compress_text(text or "")
+    row = session.get(DocumentExtractionText, extraction_id)
+    if row is None:
+        row = DocumentExtractionText(extraction_id=extraction_id)
+        session.add(row)
+    row.encoding = encoding
+    row.char_count = len(text or "")
+    row.data = data
+
+
+def load_extraction_texts(session: Session, extraction_ids: list[int]) -> dict[int, str]:
+    if not extraction_ids:
+        return {}
+    rows = session.execute(
+        select(
+            DocumentExtractionText.extraction_id,
+            DocumentExtractionText.encoding,
+            DocumentExtractionText.data,
+        ).where(DocumentExtractionText.extraction_id.in_(extraction_ids))
+    ).all()
+    return {row.extraction_id: decompress_text(row.encoding, row.data) for row in rows}
+
+
+def load_extraction_text(session: Session, extraction_id: int) -> str | None:
+    return load_extraction_texts(session, [extraction_id]).get(extraction_id)
@@ -1,10 +1,20 @@
-import json
 import os
+import time
+from contextlib import contextmanager
 from datetime import datetime, timezone
 
-from app.ai import extract_text, prepare_llm_input, run_llm_extraction
+from app.ai import estimate_llm_cost, extract_text, prepare_llm_input, run_llm_extraction
 from app.db import SessionLocal
-from app.models import ActivityLog, Document, DocumentExtraction
+from app.metrics import JOB_STAGE_SECONDS, JOB_TOTAL, reset_multiprocess_dir, serve_side_port
+from app.models import (
+    ActivityLog,
+    Document,
+    DocumentExtraction,
+    DocumentProcessingTiming,
+    document_update,
+)
+from app.search import document_vector
+from app.textstore import save_extraction_text
 
 
 def _confidence_threshold() -> float:
@@ -26,24 +36,60 @@ def _log_event(session: SessionLocal, event: str, document_id: int, extras: dict
     session.add(ActivityLog(user_id=None, extras=payload))
 
 
+def _record_stage(timings: dict[str, float], name: str, elapsed_ms: float) -> None:
+    timings[name] = round(elapsed_ms, 3)
+    JOB_STAGE_SECONDS.labels(name).observe(elapsed_ms / 1000)
+
+
+@contextmanager
+def _stage(timings: dict[str, float], name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record_stage(timings, name, (time.perf_counter() - started) * 1000)
+
+
+def _queue_wait_ms() -> float | None:
+    from rq import get_current_job
+
+    job = get_current_job()
+    if job is None or job.enqueued_at is None:
+        return None
+    enqueued_at = job.enqueued_at
+    if enqueued_at.tzinfo is None:
+        enqueued_at = enqueued_at.replace(tzinfo=timezone.utc)
+    return max((datetime.now(timezone.utc) - enqueued_at).total_seconds() * 1000, 0.0)
+
+
 def process_document_job(document_id: int) -> None:
     session = SessionLocal()
+    timings: dict[str, float] = {}
+    usage: dict[str, int] = {"input_tokens": 0, "output_tokens": 0}
+    started = time.perf_counter()
+    outcome = "failed"
     try:
+        queue_wait = _queue_wait_ms()
+        if queue_wait is not None:
+            _record_stage(timings, "queue_wait", queue_wait)
         doc = session.get(Document, document_id)
         if doc is None:
+            outcome = "missing"
             return
-        extras = dict(doc.extras or {})
-        file_path = extras.get("path", "")
-        name = extras.get("name", "")
+        file_path = doc.path or ""
+        name = doc.name or ""
         _log_event(session, "document_processing_started", document_id, {})
-        text_result = extract_text(file_path)
+        with _stage(timings, "extract"):
+            text_result = extract_text(file_path)
         llm_result = None
         if not text_result.text:
             text_result.meta["errors"].append("no_text_extracted")
         else:
-            prepared_text, llm_meta = prepare_llm_input(text_result.text)
+            with _stage(timings, "prepare"):
+                prepared_text, llm_meta = prepare_llm_input(text_result.text)
             try:
-                llm_result = run_llm_extraction(prepared_text, name)
+                with _stage(timings, "llm"):
+                    llm_result = run_llm_extraction(prepared_text, name, usage=usage)
             except Exception as exc:
                 error_name = type(exc).__name__
                 text_result.meta["errors"].append(f"llm_failed:{error_name}")
@@ -68,43 +114,76 @@ def process_document_job(document_id: int) -> None:
         if confidence < _confidence_threshold():
             alerts.append("low_confidence")
 
+        cost_usd = estimate_llm_cost(usage)
         ai_meta = {
             "ai_mode": os.getenv("AI_MODE", "live"),
             "model": os.getenv("OPENAI_MODEL", "gpt-4o"),
             "file_name": name,
             **(llm_meta if text_result.text else {}),
+            "timings_ms": dict(timings),
+            "llm_usage": {**usage, "cost_usd": cost_usd},
         }
         extraction_payload = {
             "doc_type": doc_type,
-            "text": text_result.text,
+            "text_chars": len(text_result.text or ""),
             "fields": fields,
             "summary": summary,
             "alerts": alerts,
             "confidence": confidence,
             "meta": {**text_result.meta, **ai_meta},
         }
-        extraction = DocumentExtraction(
-            document_id=document_id,
-            extras=json.loads(json.dumps(extraction_payload)),
-        )
-        session.add(extraction)
-        session.flush()
-
-        extras["status"] = "needs_review"
-        extras["doc_type"] = doc_type
-        extras["extraction_id"] = extraction.id
-        extras["confidence"] = confidence
-        extras["alerts"] = alerts
-        doc.extras = extras
-        _log_event(
-            session,
-            "document_processing_finished",
-            document_id,
-            {"status": "needs_review", "confidence": confidence},
+        with _stage(timings, "persist"):
+            extraction = DocumentExtraction(
+                document_id=document_id,
+                extras=extraction_payload,
+                search_vector=document_vector(name, text_result.text),
+            )
+            session.add(extraction)
+            session.flush()
+            extraction_id = extraction.id
+            save_extraction_text(session, extraction_id, text_result.text)
+
+            session.execute(
+                document_update(
+                    document_id,
+                    status="needs_review",
+                    doc_type=doc_type,
+                    extraction_id=extraction_id,
+                    confidence=confidence,
+                    alerts=alerts,
+                )
+            )
+            _log_event(
+                session,
+                "document_processing_finished",
+                document_id,
+                {"status": "needs_review", "confidence": confidence},
+            )
+            session.commit()
+        outcome = "needs_review" if llm_result is not None else "llm_failed"
+        session.add(
+            DocumentProcessingTiming(
+                document_id=document_id,
+                extraction_id=extraction_id,
+                doc_type=doc_type,
+                outcome=outcome,
+                queue_wait_ms=timings.get("queue_wait"),
+                extract_ms=timings.get("extract"),
+                prepare_ms=timings.get("prepare"),
+                llm_ms=timings.get("llm"),
+                persist_ms=timings.get("persist"),
+                total_ms=(time.perf_counter() - started) * 1000,
+                input_tokens=usage["input_tokens"],
+                output_tokens=usage["output_tokens"],
+                cost_usd=cost_usd,
+                created_at=datetime.now(timezone.utc),
+            )
         )
         session.commit()
     finally:
         session.close()
+        JOB_STAGE_SECONDS.labels("total").observe(time.perf_counter() - started)
+        JOB_TOTAL.labels(outcome).inc()
 
 
 def run_worker() -> None:
@@ -114,6 +193,11 @@ def run_worker() -> None:
     import os
 
     redis_url = os.getenv("REDIS_URL", "redis://redis:6379/0")
+    # Jobs run in forked work horses; PROMETHEUS_MULTIPROC_DIR lets this process serve their samples.
+    reset_multiprocess_dir()
+    metrics_port = os.getenv("WORKER_METRICS_PORT")
+    if metrics_port:
+        serve_side_port(int(metrics_port))
     worker = Worker(["default"], connection=Redis.from_url(redis_url))
     worker.work()
 
@@ -0,0 +1,47 @@
+import argparse
+
+from sqlalchemy import select, update
+
+from app.db import SessionLocal
+from app.models import Document, Property, document_columns, property_columns
+
+
+def _backfill(model, columns_for, batch_size: int) -> int:
+    session = SessionLocal()
+    updated = 0
+    last_id = 0
+    try:
+        while True:
+            rows = session.execute(
+                select(model.id, model.extras)
+                .where(model.id > last_id)
+                .order_by(model.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            session.execute(
+                update(model),
+                [{"id": row.id, **columns_for(row.extras or {})} for row in rows],
+            )
+            session.commit()
+            updated += len(rows)
+            last_id = rows[-1].id
+        return updated
+    finally:
+        session.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Copy promoted extras keys into their typed columns (safe to re-run)."
+    )
+    parser.add_argument("--batch-size", type=int, default=2000)
+    args = parser.parse_args()
+    properties = _backfill(Property, property_columns, args.batch_size)
+    documents = _backfill(Document, document_columns, args.batch_size)
+    print(f"Backfilled {properties} properties and {documents} documents.")
+
+
+if __name__ == "__main__":
+    main()
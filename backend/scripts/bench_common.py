@@ -0,0 +1,118 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable
+
+import httpx
+from sqlalchemy import select
+
+from app.auth import hash_password
+from app.models import User
+
+BENCH_USERNAME = "benchadmin"
+BENCH_PASSWORD = "Bench123!"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples_ms: list[float], cpu_ms: list[float] | None = None) -> dict:
+    summary = {
+        "runs": len(samples_ms),
+        "mean_ms": round(statistics.fmean(samples_ms), 3) if samples_ms else 0.0,
+        "p50_ms": round(percentile(samples_ms, 50), 3),
+        "p95_ms": round(percentile(samples_ms, 95), 3),
+        "p99_ms": round(percentile(samples_ms, 99), 3),
+        "max_ms": round(max(samples_ms), 3) if samples_ms else 0.0,
+    }
+    if cpu_ms:
+        summary["cpu_mean_ms"] = round(statistics.fmean(cpu_ms), 3)
+    return summary
+
+
+def _check_status(result: object) -> None:
+    # Timing 429s or 5xx answers would pass off as a fast endpoint; responses must be 2xx.
+    status = getattr(result, "status_code", None)
+    if status is not None and not 200 <= status < 300:
+        raise RuntimeError(f"benchmark call answered {status}: {getattr(result, 'text', '')[:200]}")
+
+
+def time_calls(fn: Callable[[], object], runs: int, warmup: int = 2) -> dict:
+    for _ in range(warmup):
+        _check_status(fn())
+    samples: list[float] = []
+    cpu: list[float] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        result = fn()
+        cpu.append((time.process_time() - cpu_start) * 1000)
+        samples.append((time.perf_counter() - start) * 1000)
+        _check_status(result)
+    return summarize(samples, cpu)
+
+
+def bench_user(session, username: str = BENCH_USERNAME, role: str = "admin") -> User:
+    user = session.execute(select(User).where(User.username == username)).scalar_one_or_none()
+    if user is None:
+        user = User(
+            username=username,
+            password_hash=hash_password(BENCH_PASSWORD),
+            role=role,
+            name=f"Bench {role.replace('_', ' ').title()}",
+            cell_number="(000) 00000 0000",
+            email=f"{username}@example.com",
+            cpf="00000000000",
+            extras={"bench": True},
+        )
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+    return user
+
+
+def bench_admin(session) -> User:
+    return bench_user(session)
+
+
+def server_timing_queries(resp) -> int | None:
+    """SQL statement count from the ``Server-Timing`` header (``db;desc="N queries"``)."""
+    match = re.search(r'desc="(\d+) queries"', resp.headers.get("server-timing", ""))
+    return int(match.group(1)) if match else None
+
+
+def wait_for_http(url: str, process: subprocess.Popen, seconds: float = 20) -> None:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"server_did_not_start: {url}")
+
+
+def start_server(port: int, env: dict | None = None, workers: int = 1) -> subprocess.Popen:
+    """Run the API under uvicorn in a subprocess and wait until ``/health`` answers.
+
+    The rate limiter is off unless ``env`` enables it: all benchmark traffic comes from one IP.
+    """
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--port", str(port), "--log-level", "warning", "--timeout-keep-alive", "120",
+            "--workers", str(workers),
+        ],
+        env={**os.environ, "RATE_LIMIT_BACKEND": "off", **(env or {})},
+    )
+    wait_for_http(f"http://127.0.0.1:{port}/health", server)
+    return server
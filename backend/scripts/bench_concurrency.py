@@ -0,0 +1,146 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import httpx
+from sqlalchemy import text
+
+from app.db import SessionLocal
+from scripts.bench_common import (
+    BENCH_PASSWORD,
+    BENCH_USERNAME,
+    bench_admin,
+    start_server,
+    summarize,
+)
+
+
+def seed(session, admin_id: int) -> int:
+    property_id = session.execute(
+        text(
+            "INSERT INTO properties (owner_user_id, tag, property_address, extras) "
+            "VALUES (:admin, 'bench-concurrency', 'Rua Concorrencia, 1', "
+            "'{\"tag\": \"bench-concurrency\", \"property_address\": \"Rua Concorrencia, 1\", "
+            "\"bench\": true}'::jsonb) RETURNING id"
+        ),
+        {"admin": admin_id},
+    ).scalar_one()
+    session.commit()
+    return property_id
+
+
+def cleanup(session, property_id: int) -> None:
+    session.execute(
+        text(
+            "DELETE FROM work_order_tokens WHERE work_order_id IN "
+            "(SELECT id FROM work_orders WHERE property_id = :id)"
+        ),
+        {"id": property_id},
+    )
+    session.execute(text("DELETE FROM work_orders WHERE property_id = :id"), {"id": property_id})
+    session.execute(text("DELETE FROM property_contracts WHERE property_id = :id"), {"id": property_id})
+    session.execute(text("DELETE FROM properties WHERE id = :id"), {"id": property_id})
+    session.commit()
+
+
+async def run_level(client: httpx.AsyncClient, path: str, concurrency: int, per_worker: int) -> dict:
+    samples: list[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in range(per_worker):
+            start = time.perf_counter()
+            resp = await client.get(path)
+            samples.append((time.perf_counter() - start) * 1000)
+            if resp.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "rps": round(len(samples) / elapsed, 1),
+        "errors": errors,
+        **summarize(samples),
+    }
+
+
+async def run(base_url: str, paths: dict[str, str], levels: list[int], per_worker: int) -> dict:
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        resp = await client.post(
+            "/auth/login", json={"username": BENCH_USERNAME, "password": BENCH_PASSWORD}
+        )
+        resp.raise_for_status()
+        results = {}
+        for name, path in paths.items():
+            (await client.get(path)).raise_for_status()
+            results[name] = [
+                await run_level(client, path, level, per_worker) for level in levels
+            ]
+        return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Load-test sync (threadpool) and async endpoints at rising concurrency."
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--levels", default="10,50,100,200")
+    parser.add_argument("--requests-per-worker", type=int, default=10)
+    args = parser.parse_args()
+    levels = [int(level) for level in args.levels.split(",")]
+
+    session = SessionLocal()
+    try:
+        admin = bench_admin(session)
+        property_id = seed(session, admin.id)
+    finally:
+        session.close()
+
+    server = start_server(
+        args.port, {"ASYNC_DB_POOL": os.getenv("ASYNC_DB_POOL", "queue")}
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        with httpx.Client(base_url=base_url) as client:
+            client.post(
+                "/auth/login", json={"username": BENCH_USERNAME, "password": BENCH_PASSWORD}
+            ).raise_for_status()
+            created = client.post(
+                "/work-orders",
+                json={
+                    "property_id": property_id,
+                    "type": "quote",
+                    "title": "Bench concurrency",
+                    "description": "Generated for bench_concurrency.",
+                },
+            )
+            created.raise_for_status()
+            body = created.json()
+        token = next(iter(body["portal_links"].values())).rsplit("/", 1)[-1]
+        paths = {
+            # Sync route: bounded by the threadpool (40 threads by default).
+            "sync_property_detail": f"/properties/{property_id}",
+            "async_work_order_detail": f"/work-orders/{body['work_order']['id']}",
+            "async_work_order_list": f"/work-orders?property_id={property_id}",
+            "async_portal": f"/portal/work-orders/{token}",
+        }
+        results = asyncio.run(run(base_url, paths, levels, args.requests_per_worker))
+    finally:
+        server.terminate()
+        server.wait()
+        session = SessionLocal()
+        try:
+            cleanup(session, property_id)
+        finally:
+            session.close()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.auth import hash_password
+from app.db import SessionLocal
+from app.main import app
+from app.responses import is_fast_json
+from scripts.bench_common import (
+    BENCH_PASSWORD,
+    BENCH_USERNAME,
+    bench_admin,
+    server_timing_queries,
+    time_calls,
+)
+
+# Rows per table for each scale; properties are spread over owners of PROPERTIES_PER_OWNER each.
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+PROPERTIES_PER_OWNER = 50
+OWNER_PREFIX = "benchsuite_"
+SEED = 0.42
+RESULTS_DIR = Path("bench-results")
+# Every timed call comes from one client, so the portal token limit (120/60 s) would otherwise
+# turn --runs above ~120 into timed 429s.
+os.environ.setdefault("RATE_LIMIT_BACKEND", "off")
+
+
+def _owner_ids(session) -> list[int]:
+    return session.execute(
+        text("SELECT id FROM users WHERE username LIKE :prefix ORDER BY id"),
+        {"prefix": f"{OWNER_PREFIX}%"},
+    ).scalars().all()
+
+
+def seed(session, admin_id: int, rows: int) -> None:
+    session.execute(text(f"SELECT setseed({SEED})"))
+    owners = max(1, rows // PROPERTIES_PER_OWNER)
+    session.execute(
+        text(
+            "INSERT INTO users (username, password_hash, role, name, cell_number, email, cpf, "
+            "extras) "
+            "SELECT :prefix || g, :password_hash, 'property_owner', 'Bench Owner ' || g, "
+            "'(000) 00000 0000', :prefix || g || '@example.com', lpad(g::text, 11, '0'), "
+            "'{\"bench\": true}'::jsonb FROM generate_series(1, :count) g"
+        ),
+        {"prefix": OWNER_PREFIX, "password_hash": hash_password(BENCH_PASSWORD), "count": owners},
+    )
+    owner_ids = _owner_ids(session)
+    first_owner = owner_ids[0]
+    # Ids are contiguous within one INSERT ... SELECT, so children are spread with arithmetic.
+    first_property = session.execute(
+        text(
+            "INSERT INTO properties (owner_user_id, tag, property_address, is_rented, "
+            "current_rent_value, extras) "
+            "SELECT :first_owner + (g % :owners), 'bench-suite ' || g, "
+            "'Rua Benchmark, ' || g || ' - Centro', g % 2 = 0, 1000 + (random() * 4000)::int, "
+            "jsonb_build_object('tag', 'bench-suite ' || g, "
+            "'property_address', 'Rua Benchmark, ' || g || ' - Centro', 'bench', true) "
+            "FROM generate_series(1, :count) g RETURNING id"
+        ),
+        {"first_owner": first_owner, "owners": owners, "count": rows},
+    ).scalars().all()[0]
+    session.execute(
+        text(
+            "INSERT INTO documents (property_id, status, name, doc_type, confidence, extras) "
+            "SELECT :first_property + (g % :count), "
+            "(ARRAY['uploaded', 'processing', 'needs_review', 'processed'])[1 + g % 4], "
+            "'documento_' || g || '.pdf', "
+            "(ARRAY['contract', 'id', 'proof_of_address', 'other'])[1 + g % 4], "
+            "round(random()::numeric, 2), "
+            "jsonb_build_object('status', (ARRAY['uploaded', 'processing', 'needs_review', "
+            "'processed'])[1 + g % 4], 'bench', true) "
+            "FROM generate_series(1, :count) g"
+        ),
+        {"first_property": first_property, "count": rows},
+    )
+    first_work_order = session.execute(
+        text(
+            "INSERT INTO work_orders (property_id, type, status, title, description, offer_amount, "
+            "created_by_user_id, created_at, updated_at, extras) "
+            "SELECT :first_property + (g % :count), "
+            "CASE WHEN g % 3 = 0 THEN 'fixed' ELSE 'quote' END, "
+            "(ARRAY['quote_requested', 'quote_submitted', 'in_progress', 'closed'])[1 + g % 4], "
+            "'Bench work order ' || g, 'Generated for the endpoint benchmark suite.', "
+            "CASE WHEN g % 3 = 0 THEN 150 + (random() * 850)::int END, :admin, "
+            "now() - (g || ' minutes')::interval, now(), '{\"bench\": true}'::jsonb "
+            "FROM generate_series(1, :count) g RETURNING id"
+        ),
+        {"first_property": first_property, "count": rows, "admin": admin_id},
+    ).scalars().all()[0]
+    session.execute(
+        text(
+            "INSERT INTO domain_events (event_type, entity_type, entity_id, actor_type, actor_id, "
+            "payload, created_at) "
+            "SELECT (ARRAY['work_order_created', 'quote_submitted', 'quote_approved', "
+            "'proof_submitted'])[1 + g % 4], 'work_order', :first_work_order + (g % :count), "
+            "'user', :first_owner + (g % :owners), '{\"bench\": true}'::jsonb, "
+            "now() - (g || ' seconds')::interval "
+            "FROM generate_series(1, :count) g"
+        ),
+        {
+            "first_work_order": first_work_order,
+            "first_owner": first_owner,
+            "owners": owners,
+            "count": rows,
+        },
+    )
+    session.commit()
+    session.execute(text("ANALYZE users, properties, documents, work_orders, domain_events"))
+
+
+def cleanup(session) -> None:
+    owner_ids = _owner_ids(session)
+    params = {"owners": owner_ids}
+    prop_ids = "SELECT id FROM properties WHERE owner_user_id = ANY(:owners)"
+    wo_ids = f"SELECT id FROM work_orders WHERE property_id IN ({prop_ids})"
+    session.execute(
+        text("DELETE FROM domain_events WHERE actor_id = ANY(:owners) AND payload ? 'bench'"),
+        params,
+    )
+    session.execute(
+        text(f"DELETE FROM work_order_tokens WHERE work_order_id IN ({wo_ids})"), params
+    )
+    session.execute(text(f"DELETE FROM work_orders WHERE property_id IN ({prop_ids})"), params)
+    session.execute(text(f"DELETE FROM documents WHERE property_id IN ({prop_ids})"), params)
+    session.execute(text("DELETE FROM properties WHERE owner_user_id = ANY(:owners)"), params)
+    session.execute(text("DELETE FROM sessions WHERE user_id = ANY(:owners)"), params)
+    session.execute(text("DELETE FROM users WHERE id = ANY(:owners)"), params)
+    session.commit()
+
+
+def _client(username: str) -> TestClient:
+    client = TestClient(app)
+    resp = client.post("/auth/login", json={"username": username, "password": BENCH_PASSWORD})
+    resp.raise_for_status()
+    return client
+
+
+def _git_commit() -> dict:
+    def git(*args: str) -> str:
+        result = subprocess.run(["git", *args], capture_output=True, text=True, check=False)
+        return result.stdout.strip()
+
+    return {
+        "commit": git("rev-parse", "--short", "HEAD") or None,
+        "dirty": bool(git("status", "--porcelain")),
+    }
+
+
+def _table_counts(session) -> dict:
+    return {
+        table: session.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+        for table in ("properties", "documents", "work_orders", "domain_events")
+    }
+
+
+def scenarios(
+    admin_client: TestClient,
+    owner_client: TestClient,
+    portal_path: str,
+    work_order_id: int,
+    admin_lists: bool,
+) -> dict:
+    calls = {
+        "owner_properties": (owner_client, "/properties"),
+        "owner_documents": (owner_client, "/documents"),
+        "owner_work_orders": (owner_client, "/work-orders"),
+        "owner_event_logs": (owner_client, "/event-logs"),
+        "admin_event_logs": (admin_client, "/event-logs"),
+        "admin_work_order_detail": (admin_client, f"/work-orders/{work_order_id}"),
+        "portal_work_order": (TestClient(app), portal_path),
+    }
+    if admin_lists:
+        # Unpaginated: these return every row at the chosen scale.
+        calls["admin_properties"] = (admin_client, "/properties")
+        calls["admin_documents"] = (admin_client, "/documents")
+        calls["admin_work_orders"] = (admin_client, "/work-orders")
+    return calls
+
+
+def compare(baseline: dict, current: dict, threshold_pct: float) -> list[str]:
+    regressions = []
+    for name, result in current["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        change = 0.0
+        if before["p50_ms"]:
+            change = (result["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100
+        print(
+            f"{name:28} p50 {before['p50_ms']:9.2f} -> {result['p50_ms']:9.2f} ms "
+            f"({change:+6.1f}%)  queries {before['queries']} -> {result['queries']}"
+        )
+        if change > threshold_pct or (result["queries"] or 0) > (before["queries"] or 0):
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Seed a reproducible dataset and time the list, detail and portal endpoints."
+    )
+    parser.add_argument("--scale", choices=sorted(SCALES), default="10k")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--cleanup", action="store_true")
+    parser.add_argument(
+        "--admin-lists",
+        action="store_true",
+        help="Also time the admin lists, which return every row.",
+    )
+    parser.add_argument(
+        "--output", help="Result file (default: bench-results/endpoints-<scale>-<commit>.json)."
+    )
+    parser.add_argument("--compare", help="Earlier result file; exits 1 on a regression.")
+    parser.add_argument(
+        "--threshold", type=float, default=20.0, help="Allowed p50 slowdown in percent."
+    )
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        admin = bench_admin(session)
+        if args.cleanup:
+            cleanup(session)
+            print("Removed benchmark rows.")
+            return
+        if not args.skip_seed:
+            if _owner_ids(session):
+                cleanup(session)
+            seed(session, admin.id, SCALES[args.scale])
+        owner_ids = _owner_ids(session)
+        if not owner_ids:
+            parser.error("no seeded rows; run without --skip-seed first")
+        owner = session.execute(
+            text("SELECT username FROM users WHERE id = :id"), {"id": owner_ids[0]}
+        ).scalar_one()
+        property_id, work_order_id = session.execute(
+            text(
+                "SELECT p.id, max(w.id) FROM properties p "
+                "JOIN work_orders w ON w.property_id = p.id "
+                "WHERE p.owner_user_id = :owner GROUP BY p.id ORDER BY p.id LIMIT 1"
+            ),
+            {"owner": owner_ids[0]},
+        ).one()
+        counts = _table_counts(session)
+    finally:
+        session.close()
+
+    admin_client = _client(BENCH_USERNAME)
+    owner_client = _client(owner)
+    created = admin_client.post(
+        "/work-orders",
+        json={
+            "property_id": property_id,
+            "type": "quote",
+            "title": "Bench portal",
+            "description": "Portal benchmark work order.",
+        },
+    )
+    created.raise_for_status()
+    token = created.json()["portal_links"]["portal"].rsplit("/", 1)[-1]
+
+    endpoints = {}
+    for name, (client, path) in scenarios(
+        admin_client, owner_client, f"/portal/work-orders/{token}", work_order_id, args.admin_lists
+    ).items():
+        resp = client.get(path)
+        resp.raise_for_status()
+        body = resp.json()
+        endpoints[name] = {
+            "path": path,
+            "rows": len(body) if isinstance(body, list) else 1,
+            "bytes": len(resp.content),
+            "queries": server_timing_queries(resp),
+            **time_calls(lambda: client.get(path), runs=args.runs),
+        }
+
+    git = _git_commit()
+    result = {
+        "meta": {
+            **git,
+            "scale": args.scale,
+            "rows": counts,
+            "runs": args.runs,
+            "json_mode": "fast" if is_fast_json() else "standard",
+            "python": sys.version.split()[0],
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "endpoints": endpoints,
+    }
+    output = Path(
+        args.output or RESULTS_DIR / f"endpoints-{args.scale}-{git['commit'] or 'unknown'}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(json.dumps(result, indent=2))
+    print(f"Wrote {output}")
+
+    if args.compare:
+        regressions = compare(json.loads(Path(args.compare).read_text()), result, args.threshold)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
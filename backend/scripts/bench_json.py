@@ -0,0 +1,118 @@
+import argparse
+import json
+import os
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.db import SessionLocal
+from app.main import app
+from scripts.bench_common import BENCH_PASSWORD, bench_user, time_calls
+
+BENCH_OWNER = "benchjson"
+CONTRACT_KEYS = [
+    "landlord_name", "landlord_cpf", "landlord_address", "tenant_name", "tenant_cpf",
+    "tenant_address", "guarantor_name", "administrator_name", "payment_method",
+    "indexation_type", "start_date", "end_date", "late_fee_percent", "tolerance_rule",
+]
+
+
+def seed(session, owner_id: int, properties: int, photos: int) -> None:
+    contract = ", ".join(f"'{key}', '{key} value ' || g" for key in CONTRACT_KEYS)
+    session.execute(
+        text(
+            "WITH props AS ("
+            "INSERT INTO properties (owner_user_id, tag, property_address, extras) "
+            "SELECT :owner, 'bench-json ' || g, 'Rua Json, ' || g, "
+            "jsonb_build_object('tag', 'bench-json ' || g, 'property_address', 'Rua Json, ' || g, "
+            "'bedrooms', 2, 'bathrooms', 1, 'is_rented', true, 'bench', true, "
+            "'photos', (SELECT jsonb_agg(jsonb_build_object("
+            "'url', '/uploads/properties/' || g || '/photo-' || n || '.jpg', "
+            "'name', 'photo-' || n || '.jpg', 'size', 245000 + n)) "
+            "FROM generate_series(1, :photos) n)) || jsonb_build_object(" + contract + ") "
+            "FROM generate_series(1, :count) g RETURNING id) "
+            "INSERT INTO documents (property_id, status, name, extras) "
+            "SELECT id, 'confirmed', 'contrato.pdf', jsonb_build_object("
+            "'status', 'confirmed', 'name', 'contrato.pdf', 'kind', 'contract', 'bench', true, "
+            "'fields', jsonb_build_object(" + contract.replace("|| g", "|| id") + ")) "
+            "FROM props"
+        ),
+        {"owner": owner_id, "count": properties, "photos": photos},
+    )
+    session.execute(
+        text(
+            "INSERT INTO work_orders (property_id, type, status, title, description, "
+            "offer_amount, created_by_user_id, created_at, updated_at, extras) "
+            "SELECT p.id, 'fixed', 'offer_open', 'Bench order ' || n, "
+            "'Generated for bench_json.', 150 + n, :owner, now(), now(), '{\"bench\": true}'::jsonb "
+            "FROM properties p CROSS JOIN generate_series(1, 3) n WHERE p.owner_user_id = :owner"
+        ),
+        {"owner": owner_id},
+    )
+    session.commit()
+    session.execute(text("ANALYZE properties, documents, work_orders"))
+
+
+def cleanup(session, owner_id: int) -> None:
+    prop_ids = "SELECT id FROM properties WHERE owner_user_id = :owner"
+    session.execute(
+        text(f"DELETE FROM documents WHERE property_id IN ({prop_ids})"), {"owner": owner_id}
+    )
+    session.execute(
+        text(f"DELETE FROM work_orders WHERE property_id IN ({prop_ids})"), {"owner": owner_id}
+    )
+    session.execute(text("DELETE FROM properties WHERE owner_user_id = :owner"), {"owner": owner_id})
+    session.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare standard and fast (orjson) JSON encoding on list endpoints."
+    )
+    parser.add_argument("--properties", type=int, default=2_000)
+    parser.add_argument("--photos", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--cleanup", action="store_true")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        # A property owner only sees the benchmark portfolio.
+        owner = bench_user(session, BENCH_OWNER, "property_owner")
+        if args.cleanup:
+            cleanup(session, owner.id)
+            print("Removed benchmark rows.")
+            return
+        if not args.skip_seed:
+            seed(session, owner.id, args.properties, args.photos)
+    finally:
+        session.close()
+
+    client = TestClient(app)
+    client.post(
+        "/auth/login", json={"username": BENCH_OWNER, "password": BENCH_PASSWORD}
+    ).raise_for_status()
+    previous = os.environ.get("JSON_MODE")
+    results = {}
+    try:
+        for path in ["/properties", "/documents", "/work-orders"]:
+            results[path] = {}
+            for mode in ["standard", "fast"]:
+                os.environ["JSON_MODE"] = mode
+                resp = client.get(path)
+                resp.raise_for_status()
+                results[path][mode] = {
+                    "bytes": len(resp.content),
+                    **time_calls(lambda: client.get(path), runs=args.runs),
+                }
+    finally:
+        if previous is None:
+            os.environ.pop("JSON_MODE", None)
+        else:
+            os.environ["JSON_MODE"] = previous
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import argparse
+import json
+
+from sqlalchemy import text
+
+from app.db import SessionLocal
+from app.search import SEARCH_TYPES, prefix_tsquery, search_documents, unified_search
+from app.textstore import compress_text
+from scripts.bench_common import bench_admin, time_calls
+
+WORDS = [
+    "vazamento", "pintura", "telhado", "infiltracao", "eletrica", "hidraulica", "portao",
+    "janela", "fechadura", "chuveiro", "azulejo", "piso", "garagem", "cozinha", "banheiro",
+    "jardim", "piscina", "reforma", "limpeza", "vistoria", "multa", "rescisao", "fiador",
+    "caucao", "reajuste", "condominio", "iptu", "locatario", "locador", "aluguel",
+]
+
+QUERIES = ["vaza", "pintura telhado", "rua flores", "multa rescisao", "fiador caucao", "zzzz"]
+
+
+def _words_sql(count: int) -> str:
+    array = "ARRAY[" + ",".join(f"'{word}'" for word in WORDS) + "]"
+    picks = " || ' ' || ".join(
+        f"({array})[1 + floor(random() * {len(WORDS)})::int]" for _ in range(count)
+    )
+    return f"({picks})"
+
+
+def seed(session, owner_id: int, work_orders: int, properties: int, documents: int) -> None:
+    session.execute(text("SELECT setseed(0.42)"))
+    first_ids = session.execute(
+        text(
+            "INSERT INTO properties (owner_user_id, extras) "
+            "SELECT :owner, jsonb_build_object("
+            "'tag', 'bench-search ' || " + _words_sql(2) + ", "
+            "'property_address', 'Rua das Flores, ' || g || ' - ' || " + _words_sql(1) + ", "
+            "'bench', true) FROM generate_series(1, :count) g RETURNING id"
+        ),
+        {"owner": owner_id, "count": properties},
+    ).scalars().all()
+    first_id = min(first_ids)
+    session.execute(
+        text(
+            "UPDATE properties SET tag = extras ->> 'tag', "
+            "property_address = extras ->> 'property_address' "
+            "WHERE owner_user_id = :owner AND tag IS NULL"
+        ),
+        {"owner": owner_id},
+    )
+    session.execute(
+        text(
+            "INSERT INTO work_orders (property_id, type, status, title, description, "
+            "created_by_user_id, created_at, updated_at, extras) "
+            "SELECT p.id, 'quote', 'quote_requested', " + _words_sql(3) + ", "
+            + _words_sql(12) + ", :owner, now(), now(), '{\"bench\": true}'::jsonb "
+            "FROM generate_series(1, :count) g "
+            "JOIN properties p ON p.id = :first_id + (g % :properties)"
+        ),
+        {"owner": owner_id, "count": work_orders, "properties": properties, "first_id": first_id},
+    )
+    session.execute(
+        text(
+            "CREATE TEMP TABLE bench_texts ON COMMIT DROP AS "
+            "SELECT g, " + _words_sql(60) + " AS body FROM generate_series(1, :count) g"
+        ),
+        {"count": documents},
+    )
+    session.execute(
+        text(
+            "WITH docs AS ("
+            "INSERT INTO documents (property_id, extras, status, name) "
+            "SELECT p.id, jsonb_build_object('status', 'needs_review', 'bench', true, 'g', g), "
+            "'needs_review', 'contrato_' || g || '.pdf' "
+            "FROM generate_series(1, :count) g "
+            "JOIN properties p ON p.id = :first_id + (g % :properties) RETURNING id, name, extras), "
+            "ext AS ("
+            "INSERT INTO document_extractions (document_id, extras, search_vector) "
+            "SELECT docs.id, jsonb_build_object('text_chars', length(t.body), 'g', t.g), "
+            "setweight(to_tsvector('portuguese', docs.name), 'A') || "
+            "setweight(to_tsvector('portuguese', t.body), 'B') "
+            "FROM docs JOIN bench_texts t ON t.g = (docs.extras ->> 'g')::int "
+            "RETURNING id, document_id) "
+            "UPDATE documents d SET extraction_id = ext.id FROM ext WHERE d.id = ext.document_id"
+        ),
+        {"count": documents, "properties": properties, "first_id": first_id},
+    )
+    # Compression happens client-side, like the worker does; stream the texts in batches.
+    last_id = 0
+    while True:
+        rows = session.execute(
+            text(
+                "SELECT e.id, t.body FROM document_extractions e "
+                "JOIN bench_texts t ON t.g = (e.extras ->> 'g')::int "
+                "WHERE e.id > :last_id AND e.extras ? 'g' ORDER BY e.id LIMIT 5000"
+            ),
+            {"last_id": last_id},
+        ).all()
+        if not rows:
+            break
+        batch = []
+        for row in rows:
+            encoding, data = compress_text(row.body)
+            batch.append(
+                {"id": row.id, "encoding": encoding, "chars": len(row.body), "data": data}
+            )
+        session.execute(
+            text(
+                "INSERT INTO document_extraction_texts (extraction_id, encoding, char_count, data) "
+                "VALUES (:id, :encoding, :chars, :data)"
+            ),
+            batch,
+        )
+        last_id = rows[-1].id
+    session.execute(text("UPDATE document_extractions SET extras = extras - 'g' WHERE extras ? 'g'"))
+    session.execute(text("UPDATE documents SET extras = extras - 'g' WHERE extras ? 'g'"))
+    session.commit()
+    session.execute(
+        text(
+            "ANALYZE properties, work_orders, documents, document_extractions, "
+            "document_extraction_texts"
+        )
+    )
+
+
+def cleanup(session, owner_id: int) -> None:
+    prop_ids = "SELECT id FROM properties WHERE owner_user_id = :owner"
+    session.execute(
+        text(
+            "DELETE FROM document_extraction_texts WHERE extraction_id IN "
+            "(SELECT id FROM document_extractions WHERE document_id IN "
+            f"(SELECT id FROM documents WHERE property_id IN ({prop_ids})))"
+        ),
+        {"owner": owner_id},
+    )
+    session.execute(
+        text(
+            "DELETE FROM document_extractions WHERE document_id IN "
+            f"(SELECT id FROM documents WHERE property_id IN ({prop_ids}))"
+        ),
+        {"owner": owner_id},
+    )
+    session.execute(
+        text(f"DELETE FROM documents WHERE property_id IN ({prop_ids})"), {"owner": owner_id}
+    )
+    session.execute(
+        text(f"DELETE FROM work_orders WHERE property_id IN ({prop_ids})"), {"owner": owner_id}
+    )
+    session.execute(text("DELETE FROM properties WHERE owner_user_id = :owner"), {"owner": owner_id})
+    session.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark GET /search and GET /documents/search queries at scale."
+    )
+    parser.add_argument("--work-orders", type=int, default=1_000_000)
+    parser.add_argument("--properties", type=int, default=50_000)
+    parser.add_argument("--documents", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--cleanup", action="store_true")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        admin = bench_admin(session)
+        if args.cleanup:
+            cleanup(session, admin.id)
+            print("Removed benchmark rows.")
+            return
+        if not args.skip_seed:
+            seed(session, admin.id, args.work_orders, args.properties, args.documents)
+        results = {}
+        document_results = {}
+        for query in QUERIES:
+            results[query] = time_calls(
+                lambda: unified_search(session, admin, query, list(SEARCH_TYPES), 20, 0),
+                runs=args.runs,
+            )
+            document_results[query] = time_calls(
+                lambda: search_documents(session, admin, query, None, 20, 0),
+                runs=args.runs,
+            )
+        plan = session.execute(
+            text(
+                "EXPLAIN (ANALYZE, BUFFERS) SELECT id FROM work_orders "
+                "WHERE search_vector @@ to_tsquery('portuguese', :q) LIMIT 20"
+            ),
+            {"q": prefix_tsquery(QUERIES[0])},
+        ).scalars().all()
+        print(
+            json.dumps(
+                {
+                    "search": results,
+                    "documents_search": document_results,
+                    "work_order_plan": plan,
+                },
+                indent=2,
+            )
+        )
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import argparse
+import json
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.db import SessionLocal
+from app.main import app
+from scripts.bench_common import (
+    BENCH_PASSWORD,
+    BENCH_USERNAME,
+    bench_admin,
+    bench_user,
+    time_calls,
+)
+
+BENCH_OWNER = "benchowner"
+
+
+def seed(session, admin_id: int, owner_id: int, work_orders: int, properties: int) -> None:
+    # Every tenth property belongs to the non-admin owner so the owner filter is exercised.
+    first_ids = session.execute(
+        text(
+            "INSERT INTO properties (owner_user_id, tag, property_address, extras) "
+            "SELECT CASE WHEN g % 10 = 0 THEN :owner ELSE :admin END, "
+            "'bench-wo ' || g, 'Rua Bench, ' || g, "
+            "jsonb_build_object('tag', 'bench-wo ' || g, 'property_address', 'Rua Bench, ' || g, "
+            "'bench', true) "
+            "FROM generate_series(1, :count) g RETURNING id"
+        ),
+        {"owner": owner_id, "admin": admin_id, "count": properties},
+    ).scalars().all()
+    first_id = min(first_ids)
+    session.execute(
+        text(
+            "INSERT INTO work_orders (property_id, type, status, title, description, "
+            "created_by_user_id, created_at, updated_at, extras) "
+            "SELECT :first_id + (g % :properties), "
+            "CASE WHEN g % 3 = 0 THEN 'fixed' ELSE 'quote' END, "
+            "(ARRAY['quote_requested', 'quote_submitted', 'in_progress', 'closed'])[1 + g % 4], "
+            "'Bench work order ' || g, 'Generated for the work order list benchmark.', "
+            ":admin, now(), now(), '{\"bench\": true}'::jsonb "
+            "FROM generate_series(1, :count) g"
+        ),
+        {"admin": admin_id, "count": work_orders, "properties": properties, "first_id": first_id},
+    )
+    session.commit()
+    session.execute(text("ANALYZE properties, work_orders"))
+
+
+def cleanup(session, user_ids: list[int]) -> None:
+    prop_ids = "SELECT id FROM properties WHERE owner_user_id = ANY(:owners)"
+    session.execute(
+        text(f"DELETE FROM work_orders WHERE property_id IN ({prop_ids})"), {"owners": user_ids}
+    )
+    session.execute(
+        text("DELETE FROM properties WHERE owner_user_id = ANY(:owners)"), {"owners": user_ids}
+    )
+    session.commit()
+
+
+def _client(username: str) -> TestClient:
+    client = TestClient(app)
+    resp = client.post("/auth/login", json={"username": username, "password": BENCH_PASSWORD})
+    resp.raise_for_status()
+    return client
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark GET /work-orders at scale.")
+    parser.add_argument("--work-orders", type=int, default=100_000)
+    parser.add_argument("--properties", type=int, default=5_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--cleanup", action="store_true")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        admin = bench_admin(session)
+        owner = bench_user(session, BENCH_OWNER, "property_owner")
+        if args.cleanup:
+            cleanup(session, [admin.id, owner.id])
+            print("Removed benchmark rows.")
+            return
+        if not args.skip_seed:
+            seed(session, admin.id, owner.id, args.work_orders, args.properties)
+        property_id = session.execute(
+            text("SELECT min(id) FROM properties WHERE owner_user_id = :owner"),
+            {"owner": owner.id},
+        ).scalar()
+        plan = session.execute(
+            text(
+                "EXPLAIN (ANALYZE, BUFFERS) SELECT w.id, w.title, p.tag, p.property_address "
+                "FROM work_orders w JOIN properties p ON p.id = w.property_id "
+                "WHERE p.owner_user_id = :owner ORDER BY w.id DESC"
+            ),
+            {"owner": owner.id},
+        ).scalars().all()
+    finally:
+        session.close()
+
+    admin_client = _client(BENCH_USERNAME)
+    owner_client = _client(BENCH_OWNER)
+    scenarios = {
+        "admin_all": lambda: admin_client.get("/work-orders"),
+        "admin_status": lambda: admin_client.get("/work-orders", params={"status": "in_progress"}),
+        "owner_all": lambda: owner_client.get("/work-orders"),
+        "owner_property": lambda: owner_client.get(
+            "/work-orders", params={"property_id": property_id}
+        ),
+    }
+    results = {}
+    for name, call in scenarios.items():
+        resp = call()
+        resp.raise_for_status()
+        results[name] = {"rows": len(resp.json()), **time_calls(call, runs=args.runs)}
+    print(json.dumps({"list_work_orders": results, "owner_plan": plan}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,438 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+from sqlalchemy import text
+
+from app.db import SessionLocal
+from scripts.bench_common import (
+    BENCH_PASSWORD,
+    BENCH_USERNAME,
+    bench_admin,
+    start_server,
+    summarize,
+    wait_for_http,
+)
+
+DEFAULT_MIX = (
+    "login=1,list_properties=6,create_work_order=2,portal_quote=2,portal_interest=2,"
+    "portal_proof=1,document_upload=1"
+)
+CONTRACT_TEXT = (
+    "CONTRATO DE LOCACAO RESIDENCIAL. Locador: Joao da Silva. Locatario: Maria Souza. "
+    "O aluguel mensal e de R$ 2.500,00 com vencimento no dia 5. Taxa de administracao de 10%. "
+    "Prazo de 30 meses, reajuste anual pelo IGP-M.\n"
+) * 20
+PROOF_BYTES = b"%PDF-1.4 load test proof\n"
+# All virtual users share one client IP. Against a --base-url stack that is not started here, run
+# the API with RATE_LIMIT_BACKEND=off or raise RATE_LIMIT_PORTAL_IP / RATE_LIMIT_PORTAL_TOKEN above
+# the expected portal request rate, or the report measures 429 rejections instead of the portal.
+
+
+def seed(session, admin_id: int) -> int:
+    property_id = session.execute(
+        text(
+            "INSERT INTO properties (owner_user_id, tag, property_address, extras) "
+            "VALUES (:admin, 'load-test', 'Rua Carga, 1', "
+            "'{\"tag\": \"load-test\", \"property_address\": \"Rua Carga, 1\", "
+            "\"bench\": true}'::jsonb) RETURNING id"
+        ),
+        {"admin": admin_id},
+    ).scalar_one()
+    session.commit()
+    return property_id
+
+
+def cleanup(session, property_id: int) -> None:
+    params = {"id": property_id}
+    work_orders = "SELECT id FROM work_orders WHERE property_id = :id"
+    documents = "SELECT id FROM documents WHERE property_id = :id"
+    statements = [
+        "UPDATE work_orders SET assigned_interest_id = NULL WHERE property_id = :id",
+        f"DELETE FROM work_order_tokens WHERE work_order_id IN ({work_orders})",
+        f"DELETE FROM work_order_proofs WHERE work_order_id IN ({work_orders})",
+        f"DELETE FROM work_order_quotes WHERE work_order_id IN ({work_orders})",
+        f"DELETE FROM work_order_interests WHERE work_order_id IN ({work_orders})",
+        "DELETE FROM work_orders WHERE property_id = :id",
+        "DELETE FROM document_extraction_texts WHERE extraction_id IN "
+        f"(SELECT id FROM document_extractions WHERE document_id IN ({documents}))",
+        f"DELETE FROM document_processing_timings WHERE document_id IN ({documents})",
+        f"DELETE FROM document_extractions WHERE document_id IN ({documents})",
+        "DELETE FROM documents WHERE property_id = :id",
+        "DELETE FROM property_contracts WHERE property_id = :id",
+        "DELETE FROM properties WHERE id = :id",
+    ]
+    for statement in statements:
+        session.execute(text(statement), params)
+    session.commit()
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise SystemExit(f"unknown scenario: {name}")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+class Stats:
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, name: str, elapsed_ms: float, status: str) -> None:
+        self.samples[name].append(elapsed_ms)
+        self.statuses[name][status] += 1
+
+    def report(self, elapsed_s: float) -> dict:
+        scenarios = {}
+        total_requests = total_errors = 0
+        for name in sorted(self.samples):
+            statuses = dict(self.statuses[name])
+            requests = len(self.samples[name])
+            errors = sum(
+                count for status, count in statuses.items() if not status.startswith(("2", "3"))
+            )
+            total_requests += requests
+            total_errors += errors
+            scenarios[name] = {
+                "rps": round(requests / elapsed_s, 2),
+                "errors": errors,
+                "error_rate": round(errors / requests, 4) if requests else 0.0,
+                "statuses": statuses,
+                **summarize(self.samples[name]),
+            }
+        return {
+            "elapsed_s": round(elapsed_s, 1),
+            "requests": total_requests,
+            "rps": round(total_requests / elapsed_s, 2),
+            "error_rate": round(total_errors / total_requests, 4) if total_requests else 0.0,
+            "scenarios": scenarios,
+        }
+
+
+class LoadTest:
+    """Shared state of one run: timing, the seeded property and pools of portal tokens."""
+
+    def __init__(self, property_id: int, stats: Stats) -> None:
+        self.property_id = property_id
+        self.stats = stats
+        self.quote_tokens: list[str] = []
+        self.interest_tokens: list[str] = []
+        self.execution_tokens: list[str] = []
+
+    async def request(
+        self, client: httpx.AsyncClient, name: str | None, method: str, url: str, **kwargs
+    ) -> httpx.Response | None:
+        """Send one request, timing it under ``name``; setup calls pass ``None``."""
+        started = time.perf_counter()
+        try:
+            resp = await client.request(method, url, **kwargs)
+            status = str(resp.status_code)
+        except httpx.HTTPError as exc:
+            resp, status = None, type(exc).__name__
+        if name is not None:
+            self.stats.record(name, (time.perf_counter() - started) * 1000, status)
+        return resp if resp is not None and resp.status_code < 400 else None
+
+    async def create_work_order(
+        self, admin: httpx.AsyncClient, kind: str, name: str | None
+    ) -> dict | None:
+        payload = {
+            "property_id": self.property_id,
+            "type": kind,
+            "title": f"Load test {kind}",
+            "description": "Generated by scripts/load_test.py.",
+        }
+        if kind == "fixed":
+            payload["offer_amount"] = 450
+        resp = await self.request(admin, name, "POST", "/work-orders", json=payload)
+        if resp is None:
+            return None
+        body = resp.json()
+        token = body["portal_links"]["portal"].rsplit("/", 1)[-1]
+        (self.quote_tokens if kind == "quote" else self.interest_tokens).append(token)
+        return {"id": body["work_order"]["id"], "token": token}
+
+    async def execution_token(
+        self, admin: httpx.AsyncClient, portal: httpx.AsyncClient
+    ) -> str | None:
+        # Fixed offer -> provider interest -> admin selects it -> execution (proof) token.
+        created = await self.create_work_order(admin, "fixed", None)
+        if created is None:
+            return None
+        self.interest_tokens.remove(created["token"])
+        if await self.submit_interest(portal, created["token"], None) is None:
+            return None
+        detail = await self.request(admin, None, "GET", f"/work-orders/{created['id']}")
+        if detail is None or not detail.json()["interests"]:
+            return None
+        interest_id = detail.json()["interests"][0]["id"]
+        selected = await self.request(
+            admin, None, "POST", f"/work-orders/{created['id']}/select-interest/{interest_id}"
+        )
+        return selected.json()["portal_link"].rsplit("/", 1)[-1] if selected else None
+
+    async def submit_interest(
+        self, portal: httpx.AsyncClient, token: str, name: str | None
+    ) -> httpx.Response | None:
+        return await self.request(
+            portal,
+            name,
+            "POST",
+            f"/portal/work-orders/{token}/interest",
+            json={"provider_name": "Prestador Carga", "provider_phone": "(019) 99999 0000"},
+        )
+
+    async def prepare(self, admin: httpx.AsyncClient, portal: httpx.AsyncClient, size: int) -> None:
+        for _ in range(size):
+            await self.create_work_order(admin, "quote", None)
+            await self.create_work_order(admin, "fixed", None)
+            token = await self.execution_token(admin, portal)
+            if token:
+                self.execution_tokens.append(token)
+
+
+async def scenario_login(test: LoadTest, admin, portal) -> None:
+    await test.request(
+        portal,
+        "login",
+        "POST",
+        "/auth/login",
+        json={"username": BENCH_USERNAME, "password": BENCH_PASSWORD},
+    )
+
+
+async def scenario_list_properties(test: LoadTest, admin, portal) -> None:
+    await test.request(admin, "list_properties", "GET", "/properties")
+
+
+async def scenario_create_work_order(test: LoadTest, admin, portal) -> None:
+    await test.create_work_order(admin, random.choice(["quote", "fixed"]), "create_work_order")
+
+
+async def scenario_portal_quote(test: LoadTest, admin, portal) -> None:
+    if not test.quote_tokens and await test.create_work_order(admin, "quote", None) is None:
+        return
+    token = test.quote_tokens.pop()
+    await test.request(portal, "portal_view", "GET", f"/portal/work-orders/{token}")
+    await test.request(
+        portal,
+        "portal_quote",
+        "POST",
+        f"/portal/work-orders/{token}/quote",
+        json={
+            "provider_name": "Prestador Carga",
+            "provider_phone": "(019) 99999 0000",
+            "lines": [{"description": "Mao de obra", "amount": 300}],
+            "total_amount": 300,
+        },
+    )
+
+
+async def scenario_portal_interest(test: LoadTest, admin, portal) -> None:
+    if not test.interest_tokens and await test.create_work_order(admin, "fixed", None) is None:
+        return
+    token = test.interest_tokens.pop()
+    await test.request(portal, "portal_view", "GET", f"/portal/work-orders/{token}")
+    await test.submit_interest(portal, token, "portal_interest")
+
+
+async def scenario_portal_proof(test: LoadTest, admin, portal) -> None:
+    token = test.execution_tokens.pop() if test.execution_tokens else None
+    token = token or await test.execution_token(admin, portal)
+    if token is None:
+        return
+    await test.request(
+        portal,
+        "portal_proof",
+        "POST",
+        f"/portal/work-orders/{token}/submit-proof",
+        data={
+            "provider_name": "Prestador Carga",
+            "provider_phone": "(019) 99999 0000",
+            "pix_key_type": "email",
+            "pix_key_value": "prestador@example.com",
+            "pix_receiver_name": "Prestador Carga",
+        },
+        files={"file": ("comprovante.pdf", PROOF_BYTES, "application/pdf")},
+    )
+
+
+async def scenario_document_upload(test: LoadTest, admin, portal) -> None:
+    resp = await test.request(
+        admin,
+        "document_upload",
+        "POST",
+        "/documents/upload",
+        params={"property_id": test.property_id},
+        files={"file": ("contrato.txt", CONTRACT_TEXT.encode(), "text/plain")},
+    )
+    if resp is not None:
+        # Runs the LLM extraction inline with QUEUE_MODE=inline, otherwise only enqueues it.
+        document_id = resp.json()["id"]
+        await test.request(admin, "document_process", "POST", f"/documents/{document_id}/process")
+
+
+SCENARIOS = {
+    "login": scenario_login,
+    "list_properties": scenario_list_properties,
+    "create_work_order": scenario_create_work_order,
+    "portal_quote": scenario_portal_quote,
+    "portal_interest": scenario_portal_interest,
+    "portal_proof": scenario_portal_proof,
+    "document_upload": scenario_document_upload,
+}
+
+
+async def virtual_user(
+    test: LoadTest,
+    base_url: str,
+    weights: dict[str, float],
+    deadline: float,
+    think_ms: float,
+    timeout: float,
+) -> None:
+    async with (
+        httpx.AsyncClient(base_url=base_url, timeout=timeout) as admin,
+        httpx.AsyncClient(base_url=base_url, timeout=timeout) as portal,
+    ):
+        (await admin.post(
+            "/auth/login", json={"username": BENCH_USERNAME, "password": BENCH_PASSWORD}
+        )).raise_for_status()
+        names, values = list(weights), list(weights.values())
+        while time.monotonic() < deadline:
+            scenario = random.choices(names, values)[0]
+            await SCENARIOS[scenario](test, admin, portal)
+            if think_ms:
+                await asyncio.sleep(random.expovariate(1 / think_ms) / 1000)
+
+
+async def run(args, property_id: int, base_url: str) -> dict:
+    stats = Stats()
+    test = LoadTest(property_id, stats)
+    async with (
+        httpx.AsyncClient(base_url=base_url, timeout=args.timeout) as admin,
+        httpx.AsyncClient(base_url=base_url, timeout=args.timeout) as portal,
+    ):
+        (await admin.post(
+            "/auth/login", json={"username": BENCH_USERNAME, "password": BENCH_PASSWORD}
+        )).raise_for_status()
+        await test.prepare(admin, portal, args.portal_pool)
+    started = time.monotonic()
+    deadline = started + args.duration
+    await asyncio.gather(
+        *(
+            virtual_user(
+                test, base_url, parse_mix(args.mix), deadline, args.think_ms, args.timeout
+            )
+            for _ in range(args.users)
+        )
+    )
+    return stats.report(time.monotonic() - started)
+
+
+def start_mock_llm(port: int, latency_ms: float, jitter_ms: float) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "scripts.mock_llm_server", "--port", str(port),
+            "--latency-ms", str(latency_ms), "--jitter-ms", str(jitter_ms),
+        ],
+        stdout=subprocess.DEVNULL,
+    )
+    wait_for_http(f"http://127.0.0.1:{port}/v1/health", server)
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Replay a mix of admin and portal traffic against one API node."
+    )
+    parser.add_argument(
+        "--base-url",
+        default="http://127.0.0.1:8000",
+        help="API to load; its portal rate limits must be off or raised (RATE_LIMIT_*).",
+    )
+    parser.add_argument(
+        "--start-stack",
+        action="store_true",
+        help="Start the mock LLM server and uvicorn locally instead of using --base-url.",
+    )
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--llm-port", type=int, default=8090)
+    parser.add_argument("--llm-latency-ms", type=float, default=2000)
+    parser.add_argument("--llm-jitter-ms", type=float, default=500)
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users.")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of measured load.")
+    parser.add_argument("--think-ms", type=float, default=0, help="Mean pause between actions.")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario=weight pairs.")
+    parser.add_argument("--portal-pool", type=int, default=20, help="Tokens prepared per pool.")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Also write the JSON report here.")
+    parser.add_argument("--keep-data", action="store_true")
+    args = parser.parse_args()
+    parse_mix(args.mix)
+    random.seed(args.seed)
+
+    session = SessionLocal()
+    try:
+        admin = bench_admin(session)
+        property_id = seed(session, admin.id)
+    finally:
+        session.close()
+
+    processes = []
+    base_url = args.base_url
+    try:
+        if args.start_stack:
+            processes.append(start_mock_llm(args.llm_port, args.llm_latency_ms, args.llm_jitter_ms))
+            env = {
+                "AI_MODE": "live",
+                "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY") or "mock",
+                "OPENAI_BASE_URL": f"http://127.0.0.1:{args.llm_port}/v1",
+            }
+            processes.append(start_server(args.port, env, args.workers))
+            base_url = f"http://127.0.0.1:{args.port}"
+        report = asyncio.run(run(args, property_id, base_url))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+        if not args.keep_data:
+            session = SessionLocal()
+            try:
+                cleanup(session, property_id)
+            finally:
+                session.close()
+
+    report = {
+        "config": {
+            "users": args.users,
+            "duration_s": args.duration,
+            "think_ms": args.think_ms,
+            "mix": parse_mix(args.mix),
+            "llm_latency_ms": args.llm_latency_ms if args.start_stack else None,
+            "workers": args.workers if args.start_stack else None,
+            "queue_mode": os.getenv("QUEUE_MODE", "rq"),
+        },
+        **report,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.llm_sim import simulated_payload
+
+# Stand-in for the OpenAI chat completions API. Point the app at it with
+# AI_MODE=live OPENAI_API_KEY=mock OPENAI_BASE_URL=http://127.0.0.1:8090/v1.
+#
+# Answers are deterministic: JSON mode, json_schema and tool calls get the extraction that
+# AI_MODE=simulated derives from the "Text:" part of the prompt; plain calls get a summary.
+# Faults are scripted with --faults (applied to the next requests, in order) and --fault-rates
+# (random), or at runtime with POST /_control/faults; GET /_control/stats counts the outcomes.
+FAULTS = ("429", "500", "503", "timeout", "disconnect", "malformed", "invalid_schema")
+PROMPT_RE = re.compile(r"Filename:\s*(?P<filename>.*?)\n\nText:\n(?P<text>.*)", re.DOTALL)
+
+
+def _tokens(text: str) -> int:
+    # Rough OpenAI ratio of ~4 characters per token.
+    return max(1, len(text) // 4)
+
+
+def parse_faults(value: str) -> list[str]:
+    faults = [fault.strip() for fault in value.split(",") if fault.strip()]
+    unknown = set(faults) - set(FAULTS) - {"ok"}
+    if unknown:
+        raise ValueError(f"unknown faults: {', '.join(sorted(unknown))}")
+    return faults
+
+
+def parse_fault_rates(value: str) -> dict[str, float]:
+    rates = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        fault, _, rate = item.partition("=")
+        parse_faults(fault)
+        rates[fault.strip()] = float(rate)
+    return rates
+
+
+class MockLLMState:
+    """Latency, fault script and outcome counters shared by the handler threads."""
+
+    def __init__(
+        self,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        timeout_s: float = 60,
+        seed: int | None = None,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.timeout_s = timeout_s
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.sequence: deque[str] = deque()
+        self.rates: dict[str, float] = {}
+        self.outcomes: Counter[str] = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def set_faults(self, sequence: list[str] | None = None, rates: dict | None = None) -> None:
+        with self.lock:
+            self.sequence = deque(sequence or [])
+            self.rates = dict(rates or {})
+
+    def next_fault(self) -> str:
+        with self.lock:
+            if self.sequence:
+                return self.sequence.popleft()
+            roll = self.rng.random()
+            for fault, rate in self.rates.items():
+                if roll < rate:
+                    return fault
+                roll -= rate
+            return "ok"
+
+    def delay_s(self) -> float:
+        with self.lock:
+            delay = self.latency_ms
+            if self.jitter_ms:
+                delay = max(0.0, self.rng.gauss(self.latency_ms, self.jitter_ms))
+        return delay / 1000
+
+    def begin(self) -> None:
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def end(self, outcome: str) -> None:
+        with self.lock:
+            self.in_flight -= 1
+            self.outcomes[outcome] += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "requests": sum(self.outcomes.values()),
+                "outcomes": dict(self.outcomes),
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "pending_faults": list(self.sequence),
+            }
+
+    def reset(self) -> None:
+        with self.lock:
+            self.outcomes.clear()
+            self.max_in_flight = self.in_flight
+            self.sequence.clear()
+            self.rates = {}
+
+
+def _extraction_input(messages: list[dict]) -> tuple[str, str]:
+    content = str(messages[-1].get("content") or "") if messages else ""
+    match = PROMPT_RE.search(content)
+    if match is None:
+        return "", content
+    return match.group("filename").strip(), match.group("text")
+
+
+def _summary(messages: list[dict]) -> str:
+    content = str(messages[-1].get("content") or "") if messages else ""
+    try:
+        payload = json.loads(content.split("\n", 1)[1])
+    except (IndexError, ValueError):
+        payload = {}
+    tag = payload.get("tag") or payload.get("label") or "Property"
+    address = payload.get("property_address") or "address not provided"
+    return f"{tag} located at {address}."
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    server_version = "MockLLM/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    @property
+    def state(self) -> MockLLMState:
+        return self.server.state
+
+    def _send_json(self, status: int, body: dict, headers: dict | None = None) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self) -> None:
+        path = self.path.rstrip("/")
+        if path.endswith("/health"):
+            self._send_json(200, {"status": "ok"})
+        elif path.endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "mock", "object": "model"}]})
+        elif path == "/_control/stats":
+            self._send_json(200, self.state.stats())
+        else:
+            self._send_json(404, {"error": {"message": "not_found"}})
+
+    def do_POST(self) -> None:
+        path = self.path.rstrip("/")
+        if path == "/_control/faults":
+            body = self._read_json()
+            try:
+                sequence = parse_faults(",".join(body.get("sequence", [])))
+                rates = parse_fault_rates(
+                    ",".join(f"{key}={value}" for key, value in body.get("rates", {}).items())
+                )
+            except ValueError as exc:
+                self._send_json(422, {"error": {"message": str(exc)}})
+                return
+            self.state.set_faults(sequence, rates)
+            self._send_json(200, self.state.stats())
+        elif path == "/_control/reset":
+            self._read_json()
+            self.state.reset()
+            self._send_json(200, self.state.stats())
+        elif path.endswith("/chat/completions"):
+            self.state.begin()
+            outcome = "error"
+            try:
+                outcome = self._chat_completion(self._read_json())
+            finally:
+                self.state.end(outcome)
+        else:
+            self._send_json(404, {"error": {"message": "not_found"}})
+
+    def _error(self, status: int, message: str, code: str) -> None:
+        # retry-after-ms keeps the OpenAI client's retry wait short.
+        self._send_json(
+            status,
+            {"error": {"message": message, "type": code, "code": code}},
+            {"retry-after-ms": "10"},
+        )
+
+    def _chat_completion(self, request: dict) -> str:
+        if request.get("stream"):
+            self._error(400, "Streaming is not supported by the mock server.", "invalid_request")
+            return "unsupported"
+        fault = self.state.next_fault()
+        time.sleep(self.state.delay_s())
+        if fault == "429":
+            self._error(429, "Rate limit reached for requests.", "rate_limit_exceeded")
+            return fault
+        if fault in {"500", "503"}:
+            self._error(int(fault), "The server had an error processing your request.", "server_error")
+            return fault
+        if fault == "disconnect":
+            self.close_connection = True
+            return fault
+        if fault == "timeout":
+            time.sleep(self.state.timeout_s)
+
+        messages = request.get("messages", [])
+        filename, text = _extraction_input(messages)
+        extraction = simulated_payload(text, filename)
+        if fault == "malformed":
+            extraction_json = json.dumps(extraction)[:-10]
+        elif fault == "invalid_schema":
+            extraction_json = json.dumps({"result": extraction["summary"]})
+        else:
+            extraction_json = json.dumps(extraction)
+
+        message: dict = {"role": "assistant", "content": None}
+        finish_reason = "stop"
+        tools = request.get("tools") or []
+        if tools:
+            message["tool_calls"] = [
+                {
+                    "id": f"call_{uuid.uuid4().hex[:24]}",
+                    "type": "function",
+                    "function": {"name": tools[0]["function"]["name"], "arguments": extraction_json},
+                }
+            ]
+            finish_reason = "tool_calls"
+            output = extraction_json
+        elif request.get("response_format", {}).get("type") in {"json_object", "json_schema"}:
+            message["content"] = output = extraction_json
+        else:
+            message["content"] = output = _summary(messages)
+
+        prompt = "".join(str(item.get("content") or "") for item in messages)
+        self._send_json(
+            200,
+            {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "mock"),
+                "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                "usage": {
+                    "prompt_tokens": _tokens(prompt),
+                    "completion_tokens": _tokens(output),
+                    "total_tokens": _tokens(prompt) + _tokens(output),
+                },
+            },
+        )
+        return fault
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], state: MockLLMState) -> None:
+        super().__init__(address, MockLLMHandler)
+        self.state = state
+
+
+def make_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency_ms: float = 0,
+    jitter_ms: float = 0,
+    faults: list[str] | None = None,
+    fault_rates: dict[str, float] | None = None,
+    timeout_s: float = 60,
+    seed: int | None = None,
+) -> MockLLMServer:
+    """Build the server; port 0 picks a free port (``server.server_port``)."""
+    state = MockLLMState(latency_ms, jitter_ms, timeout_s, seed)
+    state.set_faults(faults, fault_rates)
+    return MockLLMServer((host, port), state)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible chat completions server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=2000, help="Mean response delay.")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Std deviation of the delay.")
+    parser.add_argument(
+        "--faults", default="", help=f"Comma-separated faults for the first requests: {FAULTS}."
+    )
+    parser.add_argument(
+        "--fault-rates", default="", help="Random faults afterwards, e.g. 429=0.05,500=0.01."
+    )
+    parser.add_argument("--timeout-s", type=float, default=60, help="Stall of a 'timeout' fault.")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    server = make_server(
+        args.host,
+        args.port,
+        args.latency_ms,
+        args.jitter_ms,
+        parse_faults(args.faults),
+        parse_fault_rates(args.fault_rates),
+        args.timeout_s,
+        args.seed,
+    )
+    print(f"Mock LLM listening on http://{args.host}:{server.server_port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
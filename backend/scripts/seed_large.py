@@ -1,12 +1,18 @@
 import argparse
+import csv
+import io
+import json
 import random
 import string
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
 
+from sqlalchemy import text
+
 from app.auth import hash_password
 from app.db import SessionLocal
-from app.models import Document, Property, User, WorkOrder
+from app.models import Document, Property, User, WorkOrder, document_columns, property_columns
 from app.storage import get_upload_dir
 
 
@@ -90,35 +96,106 @@ def _create_svg(path: Path, label: str) -> None:
     path.write_text(svg, encoding="utf-8")
 
 
-def _create_photo_items(count: int, tag: str) -> list[dict]:
+# A fixed pool of files referenced by every seeded property/document instead of one file per row.
+PHOTOS_PER_TAG = 3
+
+
+def _slug(tag: str) -> str:
+    return tag.lower().replace(" ", "_")
+
+
+@lru_cache(maxsize=None)
+def _photo_pool() -> dict[str, list[dict]]:
     upload_dir = get_upload_dir()
     upload_dir.mkdir(parents=True, exist_ok=True)
-    photos = []
-    for idx in range(count):
-        filename = f"seed_{tag.lower().replace(' ', '_')}_{idx + 1}_{_rand_digits(4)}.svg"
-        file_path = upload_dir / filename
-        _create_svg(file_path, tag)
-        photos.append(
-            {
-                "name": filename,
-                "path": str(file_path),
-                "url": f"/uploads/{filename}",
-                "uploaded_at": datetime.now(timezone.utc).isoformat(),
-            }
-        )
-    return photos
+    pool = {}
+    for tag in PROPERTY_TAGS:
+        photos = []
+        for idx in range(PHOTOS_PER_TAG):
+            filename = f"seed_{_slug(tag)}_{idx + 1}.svg"
+            file_path = upload_dir / filename
+            if not file_path.exists():
+                _create_svg(file_path, tag)
+            photos.append(
+                {
+                    "name": filename,
+                    "path": str(file_path),
+                    "url": f"/uploads/{filename}",
+                    "uploaded_at": "2025-01-01T00:00:00+00:00",
+                }
+            )
+        pool[tag] = photos
+    return pool
 
 
-def _create_document(property_id: int, tag: str) -> Document:
+@lru_cache(maxsize=None)
+def _contract_file() -> Path:
     upload_dir = get_upload_dir()
     upload_dir.mkdir(parents=True, exist_ok=True)
-    filename = f"{tag.lower().replace(' ', '_')}_contract_{_rand_digits(4)}.txt"
-    file_path = upload_dir / filename
-    file_path.write_text("Sample contract file for testing.", encoding="utf-8")
-    return Document(
-        property_id=property_id,
-        extras={"path": str(file_path), "status": "uploaded", "name": filename},
+    file_path = upload_dir / "seed_contract.txt"
+    if not file_path.exists():
+        file_path.write_text("Sample contract file for testing.", encoding="utf-8")
+    return file_path
+
+
+def _create_photo_items(count: int, tag: str) -> list[dict]:
+    return random.sample(_photo_pool()[tag], count)
+
+
+def _document_extras(tag: str) -> dict:
+    file_path = _contract_file()
+    return {
+        "path": str(file_path),
+        "status": "uploaded",
+        "name": f"{_slug(tag)}_contract.txt",
+    }
+
+
+def _create_document(property_id: int, tag: str) -> Document:
+    return Document(property_id=property_id, extras=_document_extras(tag))
+
+
+def _property_extras(owner: dict, p_idx: int) -> dict:
+    tag = random.choice(PROPERTY_TAGS)
+    address = (
+        f"{random.choice(STREETS)}, {random.randint(10, 999)} - "
+        f"{random.choice(CITIES)}/{random.choice(STATES)}"
     )
+    is_rented = random.choice([True, False])
+    rent_value = random.randint(1200, 4500) * 100
+    desired_value = random.randint(1500, 4000) * 100
+    extras = {
+        "tag": tag,
+        "property_address": address,
+        "bedrooms": random.randint(1, 4),
+        "bathrooms": random.randint(1, 3),
+        "parking_spaces": random.randint(0, 3),
+        "is_rented": is_rented,
+        "rent_currency": "BRL",
+        "desired_rent_value": 0 if is_rented else desired_value,
+        "desired_rent_display": "" if is_rented else f"R$ {desired_value / 100:.2f}",
+        "current_rent_value": rent_value if is_rented else 0,
+        "current_rent_display": f"R$ {rent_value / 100:.2f}" if is_rented else "",
+        "rent_amount_value": rent_value if is_rented else desired_value,
+        "rent_amount_display": f"R$ {(rent_value if is_rented else desired_value) / 100:.2f}",
+        "owner_name": owner["name"],
+        "owner_contact": {
+            "email": owner["email"],
+            "cpf": owner["cpf"],
+            "cell_number": owner["cell_number"],
+        },
+        "photos": _create_photo_items(random.randint(1, 3), tag),
+    }
+    if is_rented:
+        extras.update(
+            {
+                "real_estate_name": "MS Imoveis",
+                "tenant_name": f"Tenant {owner['id']}-{p_idx + 1}",
+                "admin_fee_percent": "10",
+                "contract_number": f"CT-{owner['id']}-{p_idx + 1}",
+            }
+        )
+    return extras
 
 
 def seed_large(user_count: int, properties_per_owner: int, seed_admin: bool) -> None:
@@ -167,45 +244,17 @@ def seed_large(user_count: int, properties_per_owner: int, seed_admin: bool) ->
         session.flush()
 
         for owner in owners:
+            owner_info = {
+                "id": owner.id,
+                "name": owner.name,
+                "email": owner.email,
+                "cpf": owner.cpf,
+                "cell_number": owner.cell_number,
+            }
             for p_idx in range(properties_per_owner):
-                tag = random.choice(PROPERTY_TAGS)
-                address = f"{random.choice(STREETS)}, {random.randint(10, 999)} - {random.choice(CITIES)}/{random.choice(STATES)}"
-                is_rented = random.choice([True, False])
-                rent_value = random.randint(1200, 4500) * 100
-                desired_value = random.randint(1500, 4000) * 100
-                photos = _create_photo_items(random.randint(1, 3), tag)
-                extras = {
-                    "tag": tag,
-                    "property_address": address,
-                    "bedrooms": random.randint(1, 4),
-                    "bathrooms": random.randint(1, 3),
-                    "parking_spaces": random.randint(0, 3),
-                    "is_rented": is_rented,
-                    "rent_currency": "BRL",
-                    "desired_rent_value": 0 if is_rented else desired_value,
-                    "desired_rent_display": "" if is_rented else f"R$ {desired_value / 100:.2f}",
-                    "current_rent_value": rent_value if is_rented else 0,
-                    "current_rent_display": f"R$ {rent_value / 100:.2f}" if is_rented else "",
-                    "rent_amount_value": rent_value if is_rented else desired_value,
-                    "rent_amount_display": f"R$ {(rent_value if is_rented else desired_value) / 100:.2f}",
-                    "owner_name": owner.name,
-                    "owner_contact": {
-                        "email": owner.email,
-                        "cpf": owner.cpf,
-                        "cell_number": owner.cell_number,
-                    },
-                    "photos": photos,
-                }
-                if is_rented:
-                    extras.update(
-                        {
-                            "real_estate_name": "MS Imoveis",
-                            "tenant_name": f"Tenant {owner.id}-{p_idx + 1}",
-                            "admin_fee_percent": "10",
-                            "contract_number": f"CT-{owner.id}-{p_idx + 1}",
-                        }
-                    )
-
+                extras = _property_extras(owner_info, p_idx)
+                tag = extras["tag"]
+                is_rented = extras["is_rented"]
                 prop = Property(owner_user_id=owner.id, extras=extras)
                 session.add(prop)
                 session.flush()
@@ -242,13 +291,327 @@ def seed_large(user_count: int, properties_per_owner: int, seed_admin: bool) ->
         session.close()
 
 
+# Bulk mode: rows are generated in Python and streamed with COPY. Ids are reserved from each
+# table's sequence up front so children can reference parents without a round trip per row.
+BULK_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+COPY_NULL = "\\N"
+QUOTE_ITEMS = ["Mao de obra", "Material", "Deslocamento", "Pintura", "Hidraulica", "Eletrica"]
+PROVIDERS = ["Reparos Silva", "Casa & Cia", "Eletrica Souza", "Hidro Fix", "Pinturas Lima"]
+
+
+class CopyWriter:
+    """Buffer rows for one table as CSV and stream them to Postgres with ``COPY``."""
+
+    def __init__(self, cursor, table: str, columns: list[str], batch_size: int) -> None:
+        self.cursor = cursor
+        self.sql = (
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN "
+            f"WITH (FORMAT csv, NULL '{COPY_NULL}')"
+        )
+        self.batch_size = batch_size
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.pending = 0
+        self.written = 0
+
+    @staticmethod
+    def _value(value):
+        if value is None:
+            return COPY_NULL
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, ensure_ascii=False)
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    @property
+    def full(self) -> bool:
+        return self.pending >= self.batch_size
+
+    def add(self, row: tuple) -> None:
+        self.writer.writerow([self._value(value) for value in row])
+        self.pending += 1
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        self.buffer.seek(0)
+        self.cursor.copy_expert(self.sql, self.buffer)
+        self.written += self.pending
+        self.pending = 0
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+
+def _flush_all(writers: dict) -> None:
+    # Writers are declared parents first, so foreign keys resolve batch by batch.
+    for writer in writers.values():
+        writer.flush()
+
+
+def _reserve_ids(cursor, table: str, count: int) -> int:
+    """Advance ``table``'s id sequence by ``count`` and return the first reserved id."""
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", (table,))
+    sequence = cursor.fetchone()[0]
+    cursor.execute("SELECT nextval(%s)", (sequence,))
+    first_id = cursor.fetchone()[0]
+    if count > 1:
+        cursor.execute("SELECT setval(%s, %s)", (sequence, first_id + count - 1))
+    return first_id
+
+
+def _timestamp(max_days: int = 365) -> datetime:
+    return BULK_EPOCH + timedelta(seconds=random.randint(0, max_days * 86400))
+
+
+def _bulk_event(writers: dict, event: str, actor_type: str, actor_id, extras: dict, at) -> None:
+    # Same shape as the rows _log_activity writes.
+    payload = {"event": event, "timestamp": at.isoformat(), "actor_type": actor_type, **extras}
+    entity_id = extras.get("work_order_id") or extras.get("property_id") or 0
+    writers["domain_events"].add(
+        (event, "activity", entity_id, actor_type, actor_id, payload, at)
+    )
+
+
+def _bulk_quotes(writers: dict, work_order_id: int, next_id: int) -> int:
+    for _ in range(random.randint(1, 3)):
+        lines = [
+            {"description": item, "amount": round(random.uniform(50, 800), 2)}
+            for item in random.sample(QUOTE_ITEMS, random.randint(1, 3))
+        ]
+        created_at = _timestamp()
+        writers["work_order_quotes"].add(
+            (
+                next_id,
+                work_order_id,
+                random.choice(PROVIDERS),
+                _phone(),
+                lines,
+                round(sum(line["amount"] for line in lines), 2),
+                "submitted",
+                created_at,
+                created_at,
+            )
+        )
+        _bulk_event(
+            writers,
+            "quote_submitted",
+            "portal",
+            None,
+            {"work_order_id": work_order_id, "quote_id": next_id},
+            created_at,
+        )
+        next_id += 1
+    return next_id
+
+
+def seed_bulk(
+    user_count: int, properties_per_owner: int, seed_admin: bool, batch_size: int
+) -> None:
+    session = SessionLocal()
+    try:
+        connection = session.connection()
+        existing_admin = connection.execute(
+            text("SELECT id FROM users WHERE username = 'admin'")
+        ).scalar()
+        password_hash = hash_password("Test123!")
+        users = [
+            (
+                f"bulk_{ROLE_POOL[idx % len(ROLE_POOL)].replace('_', '')}{idx + 1}",
+                ROLE_POOL[idx % len(ROLE_POOL)],
+                idx,
+            )
+            for idx in range(user_count)
+        ]
+        taken = connection.execute(
+            text("SELECT count(*) FROM users WHERE username = ANY(:names)"),
+            {"names": [username for username, _, _ in users]},
+        ).scalar()
+        if taken:
+            raise SystemExit(f"{taken} bulk users already exist; seed into an empty database.")
+
+        cursor = connection.connection.cursor()
+        writers = {
+            "users": CopyWriter(
+                cursor,
+                "users",
+                ["id", "username", "password_hash", "role", "name", "cell_number", "email",
+                 "cpf", "extras"],
+                batch_size,
+            ),
+            "properties": CopyWriter(
+                cursor,
+                "properties",
+                ["id", "owner_user_id", "tag", "property_address", "is_rented",
+                 "desired_rent_value", "current_rent_value", "extras"],
+                batch_size,
+            ),
+            "documents": CopyWriter(
+                cursor,
+                "documents",
+                ["id", "property_id", "status", "name", "path", "doc_type", "confidence",
+                 "extraction_id", "extras"],
+                batch_size,
+            ),
+            "property_contracts": CopyWriter(
+                cursor,
+                "property_contracts",
+                ["property_id", "document_id", "real_estate_name", "contract_number",
+                 "landlord_name", "landlord_cpf", "tenant_name", "admin_fee_percent",
+                 "rent_amount_cents", "rent_currency", "payment_day", "contract_fields"],
+                batch_size,
+            ),
+            "work_orders": CopyWriter(
+                cursor,
+                "work_orders",
+                ["id", "property_id", "type", "status", "title", "description", "offer_amount",
+                 "created_by_user_id", "created_at", "updated_at", "extras"],
+                batch_size,
+            ),
+            "work_order_quotes": CopyWriter(
+                cursor,
+                "work_order_quotes",
+                ["id", "work_order_id", "provider_name", "provider_phone", "lines",
+                 "total_amount", "status", "created_at", "updated_at"],
+                batch_size,
+            ),
+            "domain_events": CopyWriter(
+                cursor,
+                "domain_events",
+                ["event_type", "entity_type", "entity_id", "actor_type", "actor_id", "payload",
+                 "created_at"],
+                batch_size,
+            ),
+        }
+
+        admin_id = existing_admin
+        new_admin = seed_admin and not existing_admin
+        next_user = _reserve_ids(cursor, "users", user_count + (1 if new_admin else 0))
+        if new_admin:
+            admin_id = next_user
+            writers["users"].add(
+                (admin_id, "admin", hash_password("Admin123!"), "admin", "Admin User", _phone(),
+                 _email("admin"), _cpf(), {})
+            )
+            next_user += 1
+        owners = []
+        for username, role, idx in users:
+            owner = {
+                "id": next_user,
+                "name": f"{role.replace('_', ' ').title()} {idx + 1}",
+                "email": _email(username),
+                "cpf": _cpf(),
+                "cell_number": _phone(),
+            }
+            writers["users"].add(
+                (owner["id"], username, password_hash, role, owner["name"],
+                 owner["cell_number"], owner["email"], owner["cpf"], {})
+            )
+            if role == "property_owner":
+                owners.append(owner)
+            next_user += 1
+            if writers["users"].full:
+                writers["users"].flush()
+        writers["users"].flush()
+
+        # Children are at most one document and one work order per property; unused ids are gaps.
+        property_count = len(owners) * properties_per_owner
+        next_property = _reserve_ids(cursor, "properties", property_count)
+        next_document = _reserve_ids(cursor, "documents", property_count)
+        next_work_order = _reserve_ids(cursor, "work_orders", property_count)
+        next_quote = _reserve_ids(cursor, "work_order_quotes", 3 * property_count)
+        for owner in owners:
+            for p_idx in range(properties_per_owner):
+                extras = _property_extras(owner, p_idx)
+                columns = property_columns(extras)
+                property_id = next_property
+                next_property += 1
+                writers["properties"].add(
+                    (property_id, owner["id"], columns["tag"], columns["property_address"],
+                     columns["is_rented"], columns["desired_rent_value"],
+                     columns["current_rent_value"], extras)
+                )
+                created_at = _timestamp()
+                _bulk_event(
+                    writers,
+                    "property_created",
+                    "admin",
+                    admin_id,
+                    {"property_id": property_id, "owner_user_id": owner["id"]},
+                    created_at,
+                )
+                if extras["is_rented"]:
+                    doc_extras = _document_extras(extras["tag"])
+                    doc_columns = document_columns(doc_extras)
+                    document_id = next_document
+                    next_document += 1
+                    writers["documents"].add(
+                        (document_id, property_id, *doc_columns.values(), doc_extras)
+                    )
+                    writers["property_contracts"].add(
+                        (property_id, document_id, extras["real_estate_name"],
+                         extras["contract_number"], owner["name"], owner["cpf"],
+                         extras["tenant_name"], extras["admin_fee_percent"],
+                         extras["current_rent_value"], "BRL", random.randint(1, 28),
+                         {key: extras[key] for key in ("real_estate_name", "tenant_name",
+                                                        "contract_number")})
+                    )
+                if random.choice([True, False]):
+                    work_order_id = next_work_order
+                    next_work_order += 1
+                    wo_type = random.choice(["quote", "fixed"])
+                    status = "offer_open"
+                    if wo_type == "quote":
+                        status = random.choice(["quote_requested", "quote_submitted"])
+                    wo_created = created_at + timedelta(days=random.randint(0, 30))
+                    writers["work_orders"].add(
+                        (work_order_id, property_id, wo_type, status, "General maintenance",
+                         "Routine inspection and fixes.",
+                         round(random.uniform(300, 1200), 2) if wo_type == "fixed" else None,
+                         admin_id or owner["id"], wo_created, wo_created, {})
+                    )
+                    _bulk_event(
+                        writers,
+                        "work_order_created",
+                        "admin",
+                        admin_id,
+                        {"work_order_id": work_order_id, "property_id": property_id},
+                        wo_created,
+                    )
+                    if status == "quote_submitted":
+                        next_quote = _bulk_quotes(writers, work_order_id, next_quote)
+                if writers["properties"].full:
+                    _flush_all(writers)
+        _flush_all(writers)
+        # Inside the seeding transaction: after commit the cursor's connection is back in the pool
+        # and the statistics would be rolled back with the next implicit transaction.
+        cursor.execute(
+            "ANALYZE users, properties, documents, property_contracts, work_orders, "
+            "work_order_quotes, domain_events"
+        )
+        session.commit()
+        print(", ".join(f"{table}: {writer.written}" for table, writer in writers.items()))
+    finally:
+        session.close()
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Seed large demo dataset.")
     parser.add_argument("--users", type=int, default=12)
     parser.add_argument("--properties", type=int, default=3)
     parser.add_argument("--seed-admin", action="store_true")
+    parser.add_argument(
+        "--bulk", action="store_true", help="Stream rows with COPY (for 100k+ properties)."
+    )
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, help="Random seed for a reproducible dataset.")
     args = parser.parse_args()
-    seed_large(args.users, args.properties, args.seed_admin)
+    if args.seed is not None:
+        random.seed(args.seed)
+    if args.bulk:
+        seed_bulk(args.users, args.properties, args.seed_admin, args.batch_size)
+    else:
+        seed_large(args.users, args.properties, args.seed_admin)
 
 
 if __name__ == "__main__":
@@ -1,30 +1,45 @@
 import os
+import threading
 import uuid
+from collections import deque
 
 os.environ.setdefault("QUEUE_MODE", "inline")
 os.environ.setdefault("AI_MODE", "mock")
 
+import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import delete, select
+from sqlalchemy import delete, func, select, text, update
 
+from app import db as app_db
+from app import deps as app_deps
+from app import idempotency, llm_sim, portal_cache, ratelimit
+from app.ai import run_llm_extraction
 from app.db import SessionLocal
+from app.llm_sim import SimulatedLLMError, SimulatedRateLimitError
 from app.auth import hash_password
-from app.main import app
+from app.main import _extras_text, app
 from app.models import (
     ActivityLog,
     Document,
     DocumentExtraction,
+    DocumentExtractionText,
+    DocumentProcessingTiming,
     Property,
     PropertyContract,
     Session,
     User,
     WorkOrder,
     WorkOrderInterest,
+    WorkOrderPortalSnapshot,
     WorkOrderProof,
     WorkOrderQuote,
     WorkOrderToken,
 )
+from app.replica import ReplicaRouter
+from app.textstore import load_extraction_text
 from app.worker import process_document_job
+from scripts.bench_common import server_timing_queries
+from scripts.mock_llm_server import make_server
 
 
 client = TestClient(app)
@@ -76,6 +91,15 @@ def _cleanup_by_username(username: str) -> None:
                     .all()
                 )
                 if doc_ids:
+                    session.execute(
+                        delete(DocumentExtractionText).where(
+                            DocumentExtractionText.extraction_id.in_(
+                                select(DocumentExtraction.id).where(
+                                    DocumentExtraction.document_id.in_(doc_ids)
+                                )
+                            )
+                        )
+                    )
                     session.execute(
                         delete(DocumentExtraction).where(
                             DocumentExtraction.document_id.in_(doc_ids)
@@ -138,6 +162,43 @@ def test_healthcheck():
     assert resp.json()["status"] == "ok"
 
 
+@pytest.mark.parametrize("encoding", ["gzip", "br"])
+def test_compression_and_conditional_get(encoding):
+    if encoding == "br":
+        pytest.importorskip("brotli")
+    accept = {"Accept-Encoding": encoding}
+    resp = client.get("/openapi.json", headers=accept)
+    assert resp.headers["content-encoding"] == encoding
+    assert resp.json()["info"]["title"] == "rentED API"
+    etag = resp.headers["etag"]
+    resp = client.get("/openapi.json", headers={**accept, "If-None-Match": etag})
+    assert resp.status_code == 304 and resp.content == b""
+    assert "content-encoding" not in client.get("/health", headers=accept).headers
+
+    for path in ("/docs", "/static/docs.css", "/favicon.ico"):
+        resp = client.get(path, headers=accept)
+        assert resp.status_code == 200 and resp.headers["content-encoding"] == encoding
+        resp = client.get(path, headers={**accept, "If-None-Match": resp.headers["etag"]})
+        assert resp.status_code == 304
+    assert "rentED API" in client.get("/docs", headers=accept).text
+
+
+def test_metrics_endpoint():
+    client.get("/health")
+    client.get("/no-such-path")
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    body = resp.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in body
+    assert 'route="unmatched",status="404"' in body
+    assert 'db_pool_connections{engine="primary",state="checked_out"}' in body
+    assert "# TYPE db_pool_checkouts_total counter" in body
+    assert 'db_pool_checkouts_total{engine="primary",kind="checkouts"}' in body
+    assert "# TYPE document_job_stage_seconds histogram" in body
+    assert "# TYPE llm_tokens_total counter" in body
+
+
 def test_auth_required():
     resp = client.get("/properties")
     assert resp.status_code == 401
@@ -159,6 +220,58 @@ def test_login_with_username_password():
     _cleanup_by_username(username)
 
 
+def test_login_failures_rate_limited(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_LOGIN_FAILURES", "2/300")
+    username = f"admin{uuid.uuid4().hex[:8]}"
+    password = "Admin12345!"
+    _create_user("admin", username=username, password=password)
+    ratelimit.get_rate_limiter().clear()
+    try:
+        assert _login(username, "wrong-password").status_code == 401
+        assert _login(username, "wrong-password").status_code == 401
+        # Blocked before the user lookup and bcrypt, even with the right password.
+        resp = _login(username, password)
+        assert resp.status_code == 429 and resp.json()["detail"] == "rate_limited"
+        assert int(resp.headers["retry-after"]) > 0
+        assert server_timing_queries(resp) == 0
+    finally:
+        ratelimit.get_rate_limiter().clear()
+        _cleanup_by_username(username)
+
+
+def test_async_routes_check_sessions(monkeypatch):
+    username = f"admin{uuid.uuid4().hex[:8]}"
+    _create_user("admin", username=username, password="Admin12345!")
+    resp = _login(username, "Admin12345!")
+    assert resp.status_code == 200
+    session_id = client.cookies.get("rented_session")
+    assert client.get("/work-orders").status_code == 200
+    assert client.get("/users?fields=id").status_code == 200
+
+    # The user lookup and the list query share one async session (one pooled connection).
+    opened = []
+    session_factory = app_deps.AsyncSessionLocal
+
+    def counting_factory(**kw):
+        opened.append(kw)
+        return session_factory(**kw)
+
+    monkeypatch.setattr(app_deps, "AsyncSessionLocal", counting_factory)
+    for path in ("/work-orders", "/properties", "/documents", "/users"):
+        opened.clear()
+        assert client.get(path).status_code == 200
+        assert len(opened) == 1
+    monkeypatch.undo()
+
+    client.post("/auth/logout")
+    client.cookies.set("rented_session", session_id)
+    for path in ("/work-orders", "/properties", "/users"):
+        resp = client.get(path)
+        assert resp.status_code == 401 and resp.json()["detail"] == "session_invalid"
+    client.cookies.clear()
+    _cleanup_by_username(username)
+
+
 def test_properties_crud():
     role = "admin"
     username = f"admin{uuid.uuid4().hex[:8]}"
@@ -231,6 +344,350 @@ def test_work_order_create_quote():
     _cleanup_by_username(username)
 
 
+def test_work_order_detail_etag():
+    username = f"admin{uuid.uuid4().hex[:8]}"
+    password = "Admin12345!"
+    user_id = _create_user("admin", username=username, password=password)
+    _login(username, password)
+    prop = _create_property(user_id, "Detail", "Rua Teste, 100")
+    created = client.post(
+        "/work-orders",
+        json={
+            "property_id": prop["id"],
+            "type": "quote",
+            "title": "Detail test",
+            "description": "Check detail payload.",
+        },
+    ).json()
+    work_order_id = created["work_order"]["id"]
+    token = created["portal_links"]["portal"].rsplit("/", 1)[-1]
+    client.post(
+        f"/portal/work-orders/{token}/quote",
+        json={"provider_name": "Ana", "provider_phone": "11999990000", "total_amount": 120.5},
+    )
+
+    resp = client.get(f"/work-orders/{work_order_id}")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["work_order"]["extras"]["property_tag"] == "Detail"
+    assert [quote["total_amount"] for quote in data["quotes"]] == [120.5]
+    assert len(data["tokens"]) == 1 and "token_hash" not in data["tokens"][0]
+    etag = resp.headers["etag"]
+
+    resp = client.get(f"/work-orders/{work_order_id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    client.post(
+        f"/work-orders/{work_order_id}/approve-quote/{data['quotes'][0]['id']}",
+        json={"approved_amount": 120.5},
+    )
+    resp = client.get(f"/work-orders/{work_order_id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json()["work_order"]["status"] == "approved_for_execution"
+    _cleanup_by_username(username)
+
+
+def test_portal_token_cache():
+    username = f"admin{uuid.uuid4().hex[:8]}"
+    password = "Admin12345!"
+    user_id = _create_user("admin", username=username, password=password)
+    _login(username, password)
+    prop = _create_property(user_id, "Cache", "Rua Teste, 101")
+    created = client.post(
+        "/work-orders",
+        json={
+            "property_id": prop["id"],
+            "type": "quote",
+            "title": "Cache test",
+            "description": "Portal reads come from the token cache.",
+        },
+    ).json()
+    work_order_id = created["work_order"]["id"]
+    portal_path = f"/portal/work-orders/{created['portal_links']['portal'].rsplit('/', 1)[-1]}"
+
+    first = client.get(portal_path)
+    assert first.status_code == 200 and first.json()["allowed_action"] == "submit_quote"
+    cached = client.get(portal_path)
+    assert cached.json() == first.json()
+    assert server_timing_queries(cached) == 0
+
+    # Portal writes and admin transitions drop the cached view.
+    client.post(
+        f"{portal_path}/quote",
+        json={"provider_name": "Ana", "provider_phone": "11999990000", "total_amount": 80},
+    )
+    assert client.get(portal_path).json()["quote"]["total_amount"] == 80
+    client.put(f"/properties/{prop['id']}", json={"extras": {**prop["extras"], "tag": "Renamed"}})
+    assert client.get(portal_path).json()["work_order"]["extras"]["property_tag"] == "Renamed"
+    client.post(f"/work-orders/{work_order_id}/cancel")
+    assert client.get(portal_path).json()["detail"] == "token_inactive"
+    _cleanup_by_username(username)
+
+
+def test_portal_view_snapshot_etag():
+    username = f"admin{uuid.uuid4().hex[:8]}"
+    password = "Admin12345!"
+    user_id = _create_user("admin", username=username, password=password)
+    _login(username, password)
+    prop = _create_property(user_id, "Snapshot", "Rua Teste, 102")
+    created = client.post(
+        "/work-orders",
+        json={
+            "property_id": prop["id"],
+            "type": "quote",
+            "title": "Snapshot test",
+            "description": "Portal view is rendered ahead of reads.",
+        },
+    ).json()
+    work_order_id = created["work_order"]["id"]
+    portal_path = f"/portal/work-orders/{created['portal_links']['portal'].rsplit('/', 1)[-1]}"
+
+    def snapshot() -> WorkOrderPortalSnapshot:
+        with SessionLocal() as session:
+            return session.execute(
+                select(WorkOrderPortalSnapshot).where(
+                    WorkOrderPortalSnapshot.work_order_id == work_order_id
+                )
+            ).scalar_one()
+
+    stored = snapshot()
+    assert stored.version == 1
+    portal_cache.get_portal_cache().clear()
+    resp = client.get(portal_path)
+    assert resp.headers["etag"] == stored.etag
+    assert resp.headers["cache-control"] == "public, no-cache"
+    assert server_timing_queries(resp) == 1
+    assert client.get(portal_path, headers={"If-None-Match": stored.etag}).status_code == 304
+
+    client.post(
+        f"{portal_path}/quote",
+        json={"provider_name": "Bia", "provider_phone": "11999990001", "total_amount": 95},
+    )
+    assert snapshot().version == 2
+    resp = client.get(portal_path, headers={"If-None-Match": stored.etag})
+    assert resp.status_code == 200 and resp.json()["allowed_action"] == "submit_quote"
+    assert resp.json()["quote"]["total_amount"] == 95
+    _cleanup_by_username(username)
+
+
+def test_portal_invalid_tokens_rate_limited(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_PORTAL_INVALID", "3/600")
+    ratelimit.get_rate_limiter().clear()
+    try:
+        guessed = f"/portal/work-orders/{uuid.uuid4().hex}"
+        assert server_timing_queries(client.get(guessed)) == 1
+        # The unknown hash is remembered, so a retry skips the token lookup.
+        retry = client.get(guessed)
+        assert retry.json()["detail"] == "invalid_token"
+        assert server_timing_queries(retry) == 0
+        assert client.get(f"/portal/work-orders/{uuid.uuid4().hex}").status_code == 404
+        origin = {"Origin": "http://localhost:3000"}
+        path = f"/portal/work-orders/{uuid.uuid4().hex}/interest"
+        # Preflights are answered by CORS and never count against the limits.
+        preflight = client.options(
+            path, headers={**origin, "Access-Control-Request-Method": "POST"}
+        )
+        assert preflight.status_code == 200
+        resp = client.post(path, json={}, headers=origin)
+        assert resp.status_code == 429 and int(resp.headers["retry-after"]) > 0
+        assert server_timing_queries(resp) == 0
+        # The browser can read the 429 instead of reporting a CORS failure.
+        assert resp.headers["access-control-allow-origin"] == origin["Origin"]
+    finally:
+        ratelimit.get_rate_limiter().clear()
+
+
+def test_idempotent_portal_and_upload_retries():
+    username = f"admin{uuid.uuid4().hex[:8]}"
+    password = "Admin12345!"
+    user_id = _create_user("admin", username=username, password=password)
+    _login(username, password)
+    prop = _create_property(user_id, "Retry", "Rua Teste, 103")
+    created = client.post(
+        "/work-orders",
+        json={
+            "property_id": prop["id"],
+            "type": "fixed",
+            "title": "Retry test",
+            "description": "Double submissions are replayed.",
+            "offer_amount": 200,
+        },
+    ).json()
+    work_order_id = created["work_order"]["id"]
+    portal_path = f"/portal/work-orders/{created['portal_links']['portal'].rsplit('/', 1)[-1]}"
+
+    interest = {"provider_name": "Caio", "provider_phone": "11999990002"}
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+    first = client.post(f"{portal_path}/interest", json=interest, headers=headers)
+    retry = client.post(f"{portal_path}/interest", json=interest, headers=headers)
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json() and retry.headers["idempotency-replayed"] == "true"
+    assert server_timing_queries(retry) == 0
+    changed = client.post(
+        f"{portal_path}/interest", json={**interest, "note": "changed"}, headers=headers
+    )
+    assert changed.status_code == 422 and changed.json()["detail"] == "idempotency_key_reused"
+    client.post(f"{portal_path}/interest", json=interest, headers={"Idempotency-Key": "other"})
+    with SessionLocal() as session:
+        interests = session.execute(
+            select(WorkOrderInterest).where(WorkOrderInterest.work_order_id == work_order_id)
+        ).scalars().all()
+    assert len(interests) == 2
+
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+    uploads = [
+        client.post(
+            "/documents/upload",
+            params={"property_id": prop["id"]},
+            files={"file": ("retry.txt", b"conteudo", "text/plain")},
+            headers=headers,
+        )
+        for _ in range(2)
+    ]
+    # Each attempt gets a fresh multipart boundary; only the parts are compared.
+    assert uploads[0].status_code == uploads[1].status_code == 201
+    assert uploads[0].json()["id"] == uploads[1].json()["id"]
+    other_file = client.post(
+        "/documents/upload",
+        params={"property_id": prop["id"]},
+        files={"file": ("retry.txt", b"outro conteudo", "text/plain")},
+        headers=headers,
+    )
+    assert other_file.status_code == 422
+    with SessionLocal() as session:
+        assert session.execute(
+            select(func.count()).select_from(Document).where(Document.property_id == prop["id"])
+        ).scalar_one() == 1
+
+    store = idempotency.get_idempotency_store()
+    assert store.begin("pending", "a", 60) is None
+    assert store.begin("pending", "b", 60) == {"fingerprint": "a"}
+    store.release("pending")
+    _cleanup_by_username(username)
+
+
+def test_property_detail_sections():
+    username = f"admin{uuid.uuid4().hex[:8]}"
+    password = "Admin12345!"
+    user_id = _create_user("admin", username=username, password=password)
+    _login(username, password)
+    prop = _create_property(user_id, "Sections", "Rua Teste, 7")
+    for title in ("First order", "Second order"):
+        client.post(
+            "/work-orders",
+            json={"property_id": prop["id"], "type": "quote", "title": title, "description": "x" * 5},
+        )
+
+    resp = client.get(f"/properties/{prop['id']}", params={"work_orders_limit": 1})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["property"]["extras"]["tag"] == "Sections"
+    assert data["documents"] == [] and data["contract"]["property_id"] == prop["id"]
+    assert [wo["title"] for wo in data["work_orders"]] == ["Second order"]
+    assert data["work_orders_has_more"] is True
+
+    data = client.get(f"/properties/{prop['id']}", params={"include": "documents"}).json()
+    assert data["documents"] == [] and data["work_orders"] is None
+    assert client.get(f"/properties/{prop['id']}", params={"include": "x"}).status_code == 422
+
+    session = SessionLocal()
+    try:
+        session.add_all(
+            Document(property_id=prop["id"], extras={"status": "uploaded", "name": f"{n}.pdf"})
+            for n in range(3)
+        )
+        session.commit()
+    finally:
+        session.close()
+    pages = [
+        client.get(
+            f"/properties/{prop['id']}",
+            params={"include": "documents", "documents_limit": 2, "documents_offset": offset},
+        ).json()
+        for offset in (0, 2)
+    ]
+    assert [len(page["documents"]) for page in pages] == [2, 1]
+    assert [page["documents_has_more"] for page in pages] == [True, False]
+    resp = client.get(f"/properties/{prop['id']}", params={"documents_offset": -1})
+    assert resp.status_code == 422
+    _cleanup_by_username(username)
+
+
+def test_list_fieldsets():
+    username = f"admin{uuid.uuid4().hex[:8]}"
+    password = "Admin12345!"
+    user_id = _create_user("admin", username=username, password=password)
+    _login(username, password)
+    prop = _create_property(user_id, "Sparse", "Rua Teste, 8")
+    client.post(
+        "/work-orders",
+        json={"property_id": prop["id"], "type": "quote", "title": "Sparse", "description": "x" * 5},
+    )
+
+    resp = client.get("/properties", params={"fields": "id,extras.tag,extras.bedrooms"})
+    assert resp.status_code == 200
+    item = next(row for row in resp.json() if row["id"] == prop["id"])
+    assert item == {"id": prop["id"], "extras": {"tag": "Sparse", "bedrooms": 1}}
+
+    resp = client.get(
+        "/work-orders",
+        params={"property_id": prop["id"], "fields": "id,status,extras.property_tag"},
+    )
+    assert [set(row) for row in resp.json()] == [{"id", "status", "extras"}]
+    assert resp.json()[0]["extras"] == {"property_tag": "Sparse"}
+
+    # Datetimes match the full response, including a value without a fraction.
+    with SessionLocal() as session:
+        session.execute(
+            update(WorkOrder)
+            .where(WorkOrder.property_id == prop["id"])
+            .values(updated_at=text("date_trunc('second', now())"))
+        )
+        session.commit()
+    full = client.get("/work-orders", params={"property_id": prop["id"]}).json()[0]
+    sparse = client.get(
+        "/work-orders", params={"property_id": prop["id"], "fields": "created_at,updated_at"}
+    ).json()[0]
+    assert sparse == {"created_at": full["created_at"], "updated_at": full["updated_at"]}
+    assert sparse["created_at"].endswith("Z") and "." not in sparse["updated_at"]
+
+    users = client.get("/users", params={"fields": "id,username"}).json()
+    assert {"id": user_id, "username": username} in users
+    docs = client.get("/documents", params={"fields": "id,extras.name,extras.owner_name"})
+    assert docs.status_code == 200
+    assert client.get("/documents", params={"fields": "id,extras"}).status_code == 422
+    assert client.get("/users", params={"fields": "password_hash"}).status_code == 422
+    _cleanup_by_username(username)
+
+
+def test_fast_json_lists_match_standard(monkeypatch):
+    username = f"admin{uuid.uuid4().hex[:8]}"
+    password = "Admin12345!"
+    user_id = _create_user("admin", username=username, password=password)
+    _login(username, password)
+    prop = _create_property(user_id, "Fast", "Rua Teste, 9")
+    client.post(
+        "/work-orders",
+        json={
+            "property_id": prop["id"],
+            "type": "fixed",
+            "title": "Fast",
+            "description": "x" * 5,
+            "offer_amount": 99.9,
+        },
+    )
+    paths = ["/properties", "/documents", f"/work-orders?property_id={prop['id']}"]
+    standard = [client.get(path).json() for path in paths]
+    monkeypatch.setenv("JSON_MODE", "fast")
+    fast = [client.get(path).json() for path in paths]
+    assert [len(items) for items in fast] == [len(items) for items in standard]
+    assert fast[0] == standard[0]
+    assert fast[2][0]["offer_amount"] == standard[2][0]["offer_amount"] == 99.9
+    # Datetimes use the same UTC format ("...Z") on both paths.
+    assert fast[2] == standard[2]
+    assert fast[2][0]["created_at"].endswith("Z")
+    _cleanup_by_username(username)
+
+
 def test_work_order_delete():
     role = "admin"
     username = f"admin{uuid.uuid4().hex[:8]}"
@@ -350,10 +807,79 @@ def test_worker_pipeline(tmp_path):
             select(DocumentExtraction).where(DocumentExtraction.document_id == doc_id)
         ).scalar_one_or_none()
         assert extraction is not None
-        assert extraction.extras.get("text") is not None
+        assert "text" not in extraction.extras
+        assert extraction.extras["text_chars"] == len(load_extraction_text(session, extraction.id))
+        meta = extraction.extras["meta"]
+        assert {"extract", "prepare", "llm"} <= set(meta["timings_ms"])
+        assert meta["llm_usage"] == {"input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0}
+        timing = session.execute(
+            select(DocumentProcessingTiming).where(DocumentProcessingTiming.document_id == doc_id)
+        ).scalar_one()
+        assert timing.extraction_id == extraction.id and timing.outcome == "needs_review"
+        assert timing.persist_ms is not None and timing.total_ms >= timing.extract_ms
     finally:
         session.close()
-        _cleanup_by_username(username)
+
+    _login(username, password)
+    resp = client.get("/admin/processing-timings", params={"hours": 1})
+    assert resp.status_code == 200
+    groups = {group["doc_type"]: group for group in resp.json()["groups"]}
+    assert groups["all"]["jobs"] >= 1
+    assert groups["all"]["stages"]["llm"]["p95_ms"] is not None
+    assert client.get("/admin/processing-timings", params={"hours": 0}).status_code == 422
+    _cleanup_by_username(username)
+
+
+def test_simulated_ai_mode(monkeypatch):
+    monkeypatch.setenv("AI_MODE", "simulated")
+    monkeypatch.setenv("AI_SIM_TIME_SCALE", "0")
+    text_body = (
+        "Contrato de locacao. Locador CPF 123.456.789-00, locatario CPF 987.654.321-00. "
+        "Aluguel de R$ 2.500,00 todo dia 5, taxa de administracao de 10%, prazo de 30 meses."
+    )
+    usage = {}
+    result = run_llm_extraction(text_body, "contrato.pdf", usage=usage)
+    assert result == run_llm_extraction(text_body, "contrato.pdf")
+    assert result.doc_type == "contract"
+    assert result.fields["rent_amount"] == "R$ 2.500,00"
+    assert result.fields["tenant_cpf"] == "987.654.321-00"
+    assert result.fields["payment_day"] == 5 and result.fields["term_months"] == 30
+    assert usage["input_tokens"] > 0 and usage["output_tokens"] > 0
+
+    monkeypatch.setenv("AI_SIM_FAILURE_RATE", "1")
+    with pytest.raises(SimulatedLLMError):
+        run_llm_extraction(text_body, "contrato.pdf")
+    monkeypatch.setenv("AI_SIM_FAILURE_RATE", "0")
+    monkeypatch.setenv("AI_SIM_RATE_LIMIT_RPM", "1")
+    monkeypatch.setattr(llm_sim, "_window", deque())
+    run_llm_extraction(text_body, "contrato.pdf")
+    with pytest.raises(SimulatedRateLimitError):
+        run_llm_extraction(text_body, "contrato.pdf")
+
+
+def test_live_ai_against_mock_llm_server(monkeypatch):
+    server = make_server()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("AI_MODE", "live")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_port}/v1")
+    text_body = "Contrato de locacao. Aluguel de R$ 1.800,00 todo dia 10, prazo de 12 meses."
+    try:
+        usage = {}
+        result = run_llm_extraction(text_body, "contrato.pdf", usage=usage)
+        assert result.doc_type == "contract"
+        assert result.fields["rent_amount"] == "R$ 1.800,00"
+        assert usage["input_tokens"] > 0 and usage["output_tokens"] > 0
+
+        # A JSON answer missing the schema keys goes through the JSON-object fallback call,
+        # and a 500 is retried by the client.
+        server.state.set_faults(["invalid_schema", "ok", "500"])
+        assert run_llm_extraction(text_body, "contrato.pdf") == result
+        assert run_llm_extraction(text_body, "contrato.pdf") == result
+        assert server.state.stats()["outcomes"] == {"ok": 3, "invalid_schema": 1, "500": 1}
+    finally:
+        server.shutdown()
+        server.server_close()
 
 
 def test_review_document(tmp_path):
@@ -445,3 +971,253 @@ def test_event_logs_endpoint():
     assert resp.status_code == 200
     assert isinstance(resp.json(), list)
     _cleanup_by_username(admin_username)
+
+
+def _add_property_with_document(owner_id: int) -> None:
+    session = SessionLocal()
+    try:
+        prop = Property(owner_user_id=owner_id, extras={"tag": f"T{uuid.uuid4().hex[:6]}"})
+        session.add(prop)
+        session.flush()
+        session.add(Document(property_id=prop.id, extras={"status": "uploaded", "name": "a.pdf"}))
+        session.commit()
+    finally:
+        session.close()
+
+
+def test_server_timing_counts_queries():
+    username = f"owner{uuid.uuid4().hex[:8]}"
+    owner_id = _create_user("property_owner", username=username, password="Owner12345!")
+    _login(username, "Owner12345!")
+    _add_property_with_document(owner_id)
+
+    def documents_queries() -> int:
+        resp = client.get("/documents")
+        assert resp.status_code == 200
+        timing = resp.headers["server-timing"]
+        assert timing.startswith("app;dur=")
+        return int(timing.split('desc="')[1].split(" ")[0])
+
+    single = documents_queries()
+    for _ in range(3):
+        _add_property_with_document(owner_id)
+    assert len(client.get("/documents").json()) == 4
+    # Owner name and property tag come from the same query, not one lookup per property.
+    assert documents_queries() == single
+    _cleanup_by_username(username)
+
+
+def test_db_pool_stats_and_read_routing(monkeypatch):
+    admin_username = f"admin{uuid.uuid4().hex[:8]}"
+    _create_user("admin", username=admin_username, password="Admin12345!")
+    _login(admin_username, "Admin12345!")
+    primary = client.get("/admin/db-pool").json()["primary"]
+    assert primary["pool"] == "TimedQueuePool"
+    assert primary["checkouts"] > 0 and "wait_ms_max" in primary and "overflow" in primary
+    _cleanup_by_username(admin_username)
+
+    # Against DATABASE_READ_URL when set (a streaming replica), else the primary stands in.
+    replica_engine = app_db._sync_engine(os.getenv("DATABASE_READ_URL") or app_db.DATABASE_URL)
+    router = ReplicaRouter(max_lag=5, check_interval=0)
+    monkeypatch.setattr(app_db, "read_engine", replica_engine)
+    monkeypatch.setattr(app_db, "replica", router)
+    try:
+        assert app_db.read_bind() is replica_engine
+        assert router.lag is not None and router.lag <= 5
+        router.max_lag = -1
+        assert app_db.read_bind() is app_db.engine
+    finally:
+        replica_engine.dispose()
+
+
+def _explain(stmt) -> str:
+    session = SessionLocal()
+    try:
+        session.execute(text("SET LOCAL enable_seqscan = off"))
+        compiled = stmt.compile(
+            dialect=session.get_bind().dialect, compile_kwargs={"literal_binds": True}
+        )
+        rows = session.execute(text(f"EXPLAIN {compiled}")).scalars().all()
+        return "\n".join(rows)
+    finally:
+        session.rollback()
+        session.close()
+
+
+def test_extras_filters_use_expression_indexes():
+    status_plan = _explain(select(Document.id).where(Document.status == "needs_review"))
+    assert "ix_documents_status" in status_plan
+    kind_plan = _explain(
+        select(Document.id).where(_extras_text(Document.extras, "kind") == "work_order_proof")
+    )
+    assert "ix_documents_extras_kind" in kind_plan
+    tag_plan = _explain(select(Property.id).where(Property.tag == "Teste"))
+    assert "ix_properties_tag" in tag_plan
+    containment_plan = _explain(
+        select(Document.id).where(
+            Document.extras.op("@>")(text("""'{"status": "confirmed"}'::jsonb"""))
+        )
+    )
+    assert "ix_documents_extras_gin" in containment_plan
+
+
+def test_promoted_columns_dual_write(tmp_path):
+    username = f"admin{uuid.uuid4().hex[:8]}"
+    user_id = _create_user("admin", username=username)
+    session = SessionLocal()
+    try:
+        prop = Property(
+            owner_user_id=user_id,
+            extras={
+                "tag": "Dual",
+                "property_address": "Rua Dual, 1",
+                "is_rented": True,
+                "current_rent_value": "180000",
+            },
+        )
+        session.add(prop)
+        session.commit()
+        assert prop.tag == "Dual"
+        assert prop.is_rented is True
+        assert prop.current_rent_value == 180000
+
+        file_path = tmp_path / "dual.txt"
+        file_path.write_text("dual-data")
+        doc = Document(
+            property_id=prop.id,
+            extras={"path": str(file_path), "status": "uploaded", "name": "dual.txt"},
+        )
+        session.add(doc)
+        session.commit()
+        doc_id = doc.id
+        assert doc.status == "uploaded"
+        assert doc.path == str(file_path)
+    finally:
+        session.close()
+
+    process_document_job(doc_id)
+
+    session = SessionLocal()
+    try:
+        doc = session.get(Document, doc_id)
+        assert doc.status == "needs_review"
+        assert doc.extras["status"] == "needs_review"
+        assert doc.extraction_id == doc.extras["extraction_id"]
+        assert doc.extras["name"] == "dual.txt"
+    finally:
+        session.close()
+        _cleanup_by_username(username)
+
+
+def _create_property(owner_user_id: int, tag: str, address: str) -> dict:
+    resp = client.post(
+        "/properties",
+        json={
+            "owner_user_id": owner_user_id,
+            "extras": {
+                "tag": tag,
+                "property_address": address,
+                "bedrooms": 1,
+                "bathrooms": 1,
+                "parking_spaces": 0,
+                "is_rented": False,
+                "desired_rent_value": 150000,
+                "rent_currency": "BRL",
+            },
+        },
+    )
+    assert resp.status_code == 201
+    return resp.json()
+
+
+def test_unified_search(tmp_path):
+    username = f"admin{uuid.uuid4().hex[:8]}"
+    password = "Admin12345!"
+    user_id = _create_user("admin", username=username, password=password)
+    _login(username, password)
+    marker = f"zq{uuid.uuid4().hex[:6]}"
+    prop = _create_property(user_id, f"Casa {marker}", f"Rua das Flores {marker}, 10")
+    created = client.post(
+        "/work-orders",
+        json={
+            "property_id": prop["id"],
+            "type": "quote",
+            "title": f"Vazamento {marker} na cozinha",
+            "description": "Trocar o sifao da pia.",
+        },
+    ).json()
+    file_path = tmp_path / "clause.txt"
+    file_path.write_text(f"Clausula de multa rescisoria {marker} em tres alugueis.")
+    with open(file_path, "rb") as handle:
+        doc = client.post(
+            "/documents/upload",
+            params={"property_id": prop["id"]},
+            files={"file": ("clause.txt", handle, "text/plain")},
+        ).json()
+
+    resp = client.get("/search", params={"q": marker[:-1]})
+    assert resp.status_code == 200
+    hits = {(hit["type"], hit["id"]) for hit in resp.json()["hits"]}
+    assert ("property", prop["id"]) in hits
+    assert ("work_order", created["work_order"]["id"]) in hits
+    assert ("document", doc["id"]) in hits
+
+    resp = client.get("/search", params={"q": marker, "types": "work_order", "limit": 1})
+    assert [hit["type"] for hit in resp.json()["hits"]] == ["work_order"]
+    assert client.get("/search", params={"q": marker, "types": "nope"}).status_code == 422
+
+    listed = client.get("/work-orders", params={"search": f"vazamento {marker}"}).json()
+    assert [item["id"] for item in listed] == [created["work_order"]["id"]]
+    assert client.get("/work-orders", params={"search": "-"}).json() == []
+
+    if os.path.exists(doc["extras"]["path"]):
+        os.remove(doc["extras"]["path"])
+    _cleanup_by_username(username)
+
+
+def test_document_text_search_snippets(tmp_path):
+    username = f"admin{uuid.uuid4().hex[:8]}"
+    password = "Admin12345!"
+    user_id = _create_user("admin", username=username, password=password)
+    _login(username, password)
+    marker = f"qx{uuid.uuid4().hex[:6]}"
+    prop = _create_property(user_id, "Busca", "Rua da Busca, 1")
+    file_path = tmp_path / "contrato.txt"
+    file_path.write_text(
+        "O locatario pagara multa equivalente a tres alugueis. "
+        f"Clausula {marker}: o fiador responde solidariamente. "
+        "<img src=x onerror=alert(1)> & <script>alert(1)</script>"
+    )
+    with open(file_path, "rb") as handle:
+        doc = client.post(
+            "/documents/upload",
+            params={"property_id": prop["id"]},
+            files={"file": ("contrato.txt", handle, "text/plain")},
+        ).json()
+
+    resp = client.get("/documents/search", params={"q": f"{marker} fiador"})
+    assert resp.status_code == 200
+    hits = resp.json()["hits"]
+    assert [hit["document_id"] for hit in hits] == [doc["id"]]
+    snippet = hits[0]["snippet"]
+    assert "<mark>" in snippet
+    # Uploaded markup comes back escaped; only the highlight tags are HTML.
+    assert "<img" not in snippet and "<script" not in snippet
+    assert "&lt;img" in snippet and "&amp;" in snippet
+
+    extraction = client.get(f"/documents/{doc['id']}/extraction").json()
+    assert "text" not in extraction["extras"]
+    resp = client.get(f"/documents/{doc['id']}/extraction", params={"include_text": "true"})
+    assert marker in resp.json()["extras"]["text"]
+
+    other = f"owner{uuid.uuid4().hex[:8]}"
+    _create_user("property_owner", username=other, password=password)
+    _login(other, password)
+    assert client.get("/documents/search", params={"q": marker}).json()["hits"] == []
+    resp = client.get("/documents/search", params={"q": marker, "property_id": prop["id"]})
+    assert resp.status_code == 403
+
+    if os.path.exists(doc["extras"]["path"]):
+        os.remove(doc["extras"]["path"])
+    _cleanup_by_username(other)
+    _cleanup_by_username(username)
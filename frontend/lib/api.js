@@ -1,5 +1,11 @@
 export const API_BASE = process.env.NEXT_PUBLIC_API_BASE || "http://localhost:8000";
 
+// Sent as Idempotency-Key so a retried submission is answered with the first response.
+export function newIdempotencyKey() {
+  if (typeof crypto !== "undefined" && crypto.randomUUID) return crypto.randomUUID();
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+}
+
 export async function apiGet(path) {
   const res = await fetch(`${API_BASE}${path}`, { credentials: "include" });
   if (!res.ok) {
@@ -1,6 +1,6 @@
 import { useEffect, useMemo, useState } from "react";
 import { useRouter } from "next/router";
-import { API_BASE } from "../../../lib/api";
+import { API_BASE, newIdempotencyKey } from "../../../lib/api";
 
 const emptyLine = () => ({ kind: "labor", name: "", qty: 1, unit: "", unit_price: "" });
 
@@ -22,6 +22,13 @@ export default function WorkOrderPortal() {
   });
   const [lines, setLines] = useState([emptyLine()]);
   const [file, setFile] = useState(null);
+  // Kept across network failures so a resend is not stored twice; replaced after any answer and
+  // whenever the submission changes, since the API rejects a key reused with a different body.
+  const [idempotencyKey, setIdempotencyKey] = useState(newIdempotencyKey);
+
+  useEffect(() => {
+    setIdempotencyKey(newIdempotencyKey());
+  }, [form, lines, file]);
 
   useEffect(() => {
     if (!token) return;
@@ -77,7 +84,7 @@ export default function WorkOrderPortal() {
     try {
       const res = await fetch(`${API_BASE}/portal/work-orders/${token}/interest`, {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
+        headers: { "Content-Type": "application/json", "Idempotency-Key": idempotencyKey },
         body: JSON.stringify({
           provider_name: form.provider_name,
           provider_phone: form.provider_phone,
@@ -85,6 +92,7 @@ export default function WorkOrderPortal() {
         }),
       });
       if (!res.ok) {
+        if (res.status !== 409) setIdempotencyKey(newIdempotencyKey());
         const data = await res.json().catch(() => ({}));
         throw new Error(data?.detail || "Failed to submit interest.");
       }
@@ -99,7 +107,7 @@ export default function WorkOrderPortal() {
     try {
       const res = await fetch(`${API_BASE}/portal/work-orders/${token}/quote`, {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
+        headers: { "Content-Type": "application/json", "Idempotency-Key": idempotencyKey },
         body: JSON.stringify({
           provider_name: form.provider_name,
           provider_phone: form.provider_phone,
@@ -108,6 +116,7 @@ export default function WorkOrderPortal() {
         }),
       });
       if (!res.ok) {
+        if (res.status !== 409) setIdempotencyKey(newIdempotencyKey());
         const data = await res.json().catch(() => ({}));
         throw new Error(data?.detail || "Failed to submit quote.");
       }
@@ -129,9 +138,11 @@ export default function WorkOrderPortal() {
       if (file) formData.append("file", file);
       const res = await fetch(`${API_BASE}/portal/work-orders/${token}/submit-proof`, {
         method: "POST",
+        headers: { "Idempotency-Key": idempotencyKey },
         body: formData,
       });
       if (!res.ok) {
+        if (res.status !== 409) setIdempotencyKey(newIdempotencyKey());
         const data = await res.json().catch(() => ({}));
         throw new Error(data?.detail || "Failed to submit proof.");
       }
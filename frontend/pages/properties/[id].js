@@ -4,12 +4,14 @@ import TopNav from "../../components/TopNav";
 import { API_BASE, apiGet, apiPost } from "../../lib/api";
 import { requireAuth } from "../../lib/auth";
 
+const DOCUMENTS_PAGE = 50;
+
 export default function PropertyDetail() {
   const router = useRouter();
   const [propertyId, setPropertyId] = useState(null);
   const [property, setProperty] = useState(null);
   const [documents, setDocuments] = useState([]);
-  const [workOrders, setWorkOrders] = useState([]);
+  const [documentsHasMore, setDocumentsHasMore] = useState(false);
   const [workTitle, setWorkTitle] = useState("");
   const [activePhoto, setActivePhoto] = useState(0);
   const [error, setError] = useState("");
@@ -33,19 +35,32 @@ export default function PropertyDetail() {
     if (!id) return;
     setError("");
     try {
-      const [props, docs, wos] = await Promise.all([
-        apiGet("/properties"),
-        apiGet(`/documents?property_id=${id}`),
-        apiGet("/work-orders"),
-      ]);
-      setProperty(props.find((p) => String(p.id) === String(id)) || null);
-      setDocuments(docs);
-      setWorkOrders(wos.filter((w) => String(w.property_id) === String(id)));
+      const detail = await apiGet(
+        `/properties/${id}?include=documents&documents_limit=${DOCUMENTS_PAGE}`
+      );
+      setProperty(detail.property);
+      setDocuments(detail.documents || []);
+      setDocumentsHasMore(Boolean(detail.documents_has_more));
     } catch (err) {
       setError("Failed to load data");
     }
   }
 
+  async function loadMoreDocuments() {
+    if (!propertyId) return;
+    setError("");
+    try {
+      const detail = await apiGet(
+        `/properties/${propertyId}?include=documents&documents_limit=${DOCUMENTS_PAGE}`
+          + `&documents_offset=${documents.length}`
+      );
+      setDocuments((prev) => [...prev, ...(detail.documents || [])]);
+      setDocumentsHasMore(Boolean(detail.documents_has_more));
+    } catch (err) {
+      setError("Failed to load documents");
+    }
+  }
+
   useEffect(() => {
     if (propertyId) loadAll(propertyId);
   }, [propertyId]);
@@ -213,6 +228,11 @@ export default function PropertyDetail() {
               )}
             </div>
           ))}
+          {documentsHasMore && (
+            <button type="button" className="btn-muted" onClick={loadMoreDocuments}>
+              Load more
+            </button>
+          )}
         </div>
         <div className="card">
           <h3>Work Orders</h3>
@@ -174,7 +174,7 @@ export default function PropertiesPage() {
         setCurrentUser(user);
         if (user.role === "admin") {
           try {
-            const data = await apiGet("/users");
+            const data = await apiGet("/users?fields=id,username,name,email,cpf,cell_number");
             setOwners(data);
           } catch (err) {
             setError(err.message || "Failed to load owners");
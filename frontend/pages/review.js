@@ -14,7 +14,7 @@ export default function Review() {
   async function load() {
     const logs = await apiGet("/event-logs");
     setActivityLog(logs);
-    const docs = await apiGet("/documents");
+    const docs = await apiGet("/documents?fields=id,property_id,extras.name,extras.property_tag");
     setDocuments(docs);
   }
 
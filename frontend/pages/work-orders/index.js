@@ -167,7 +167,7 @@ export default function WorkOrders() {
     setError("");
     try {
       const [props, orders] = await Promise.all([
-        apiGet("/properties"),
+        apiGet("/properties?fields=id,extras.tag"),
         apiGet("/work-orders"),
       ]);
       setProperties(props);
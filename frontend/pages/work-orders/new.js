@@ -19,7 +19,7 @@ export default function NewWorkOrder() {
   const [loading, setLoading] = useState(false);
 
   useEffect(() => {
-    apiGet("/properties").then(setProperties).catch(() => setProperties([]));
+    apiGet("/properties?fields=id,extras.tag").then(setProperties).catch(() => setProperties([]));
   }, []);
 
   function updateField(key, value) {